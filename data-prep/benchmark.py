@@ -0,0 +1,184 @@
+# --------------------------------------------------------------
+#   BENCHMARKS — temps i memòria de cada etapa del pipeline
+# --------------------------------------------------------------
+#
+#   Per a cada escala LxSxT (lligues × temporades × equips) genera
+#   dades sintètiques en un directori temporal, hi executa les etapes
+#   de pipeline.STAGES en ordre (en fred, sense cau, i en calent) i
+#   mesura el temps de paret i el pic de memòria (RSS) de cada script.
+#
+#   Els resultats s'afegeixen a benchmarks/history.jsonl i es comparen
+#   amb l'última execució de la mateixa escala per detectar regressions.
+#
+#   Ús (des de data-prep/):
+#       python benchmark.py                       # escales per defecte
+#       python benchmark.py --scales 1x5x20 5x10x20 --threshold 0.2
+#
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from generate_synthetic_data import generate
+from pipeline import BASE_DIR, STAGES, topological_order
+
+HISTORY_FILE = BASE_DIR / "benchmarks" / "history.jsonl"
+
+DEFAULT_SCALES = ["1x5x20", "5x5x20", "5x20x20"]
+
+
+# ------------------------------------------------------------
+# UTILITATS
+# ------------------------------------------------------------
+
+def parse_scale(scale: str) -> tuple[int, int, int]:
+    leagues, seasons, teams = (int(x) for x in scale.lower().split("x"))
+    return leagues, seasons, teams
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_measured(cmd: list[str], cwd: Path) -> tuple[float, float]:
+    """
+    Executa cmd i retorna (segons, pic de RSS en MB) d'aquest procés fill.
+    os.wait4 dona l'ús de recursos del fill concret (Unix).
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"❌ {' '.join(cmd)} ha acabat amb codi {proc.returncode}")
+
+    # ru_maxrss: KB a Linux, bytes a macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return elapsed, usage.ru_maxrss / scale
+
+
+def load_history() -> list[dict]:
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(records: list[dict]) -> None:
+    HISTORY_FILE.parent.mkdir(exist_ok=True)
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+# ------------------------------------------------------------
+# BENCHMARK
+# ------------------------------------------------------------
+
+def bench_scale(scale: str, workers: int = 1) -> list[dict]:
+    """Genera les dades d'una escala i mesura cada etapa en fred i en calent."""
+    leagues, seasons, teams = parse_scale(scale)
+    records = []
+
+    with tempfile.TemporaryDirectory(prefix="laliga-bench-") as tmp:
+        work = Path(tmp) / "data-prep"
+        generate(work / "data_raw", leagues, seasons, teams)
+
+        for phase in ["cold", "warm"]:
+            for name in topological_order(STAGES):
+                stage = STAGES[name]
+                cmd = [sys.executable, str(BASE_DIR / stage["script"])]
+                if stage.get("parallel"):
+                    cmd += ["--workers", str(workers)]
+
+                wall, rss = run_measured(cmd, work)
+                records.append({
+                    "scale": scale,
+                    "stage": name,
+                    "phase": phase,
+                    "wall_s": round(wall, 4),
+                    "peak_rss_mb": round(rss, 1),
+                })
+                print(f"   {scale:>10} {phase:<4} {name:<9} {wall:8.3f}s {rss:8.1f} MB")
+
+    return records
+
+
+def previous_run(history: list[dict], scale: str) -> dict:
+    """Última mesura de cada (stage, phase) per a una escala."""
+    last = {}
+    for r in history:
+        if r["scale"] == scale:
+            last[(r["stage"], r["phase"])] = r
+    return last
+
+
+def report_regressions(records: list[dict], history: list[dict], threshold: float) -> list[str]:
+    warnings = []
+    for scale in dict.fromkeys(r["scale"] for r in records):
+        before = previous_run(history, scale)
+        for r in (r for r in records if r["scale"] == scale):
+            old = before.get((r["stage"], r["phase"]))
+            if old is None:
+                continue
+            for metric in ["wall_s", "peak_rss_mb"]:
+                if old[metric] > 0 and r[metric] > old[metric] * (1 + threshold):
+                    warnings.append(
+                        f"⚠️  {scale} {r['phase']} {r['stage']}: {metric} "
+                        f"{old[metric]} → {r[metric]} (commit {old.get('commit')})"
+                    )
+    return warnings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de les etapes de data-prep")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES,
+                        help="escales LxSxT (lligues x temporades x equips)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="augment relatiu que es considera regressió")
+    parser.add_argument("--no-save", action="store_true", help="no desa l'historial")
+    args = parser.parse_args(argv)
+
+    history = load_history()
+    run_info = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+    }
+
+    records = []
+    for scale in args.scales:
+        print(f"\n📏 Escala {scale} (lligues x temporades x equips)")
+        records.extend({**run_info, **r} for r in bench_scale(scale, args.workers))
+
+    warnings = report_regressions(records, history, args.threshold)
+    print()
+    for w in warnings:
+        print(w)
+
+    if not args.no_save:
+        append_history(records)
+        print(f"💾 Resultats afegits a {HISTORY_FILE.relative_to(BASE_DIR)}")
+
+    if not warnings:
+        print("✅ Cap regressió respecte de l'última execució")
+
+
+if __name__ == "__main__":
+    main()
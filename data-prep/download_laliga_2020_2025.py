@@ -2,55 +2,249 @@
 #   LA LIGA 2020–2025 — DESCÀRREGA AUTOMÀTICA COMPLETA DE fbref
 #   Autora: Crhistel Soria Fuentes
 # --------------------------------------------------------------
+#
+#   Cada tupla (lliga, temporada, tipus d'estadística) és una tasca
+#   independent i es desa a data_raw/{lliga}/{temporada}/{tipus}.csv.
+#   Les tasques s'executen en paral·lel amb un límit de peticions per
+#   segon, es reintenten si fallen i queden registrades a
+#   data_raw/download_manifest.json. En tornar a executar l'script,
+#   els fitxers que ja hi són i coincideixen amb el manifest s'ometen,
+#   de manera que afegir una temporada només descarrega aquesta temporada.
+#
+#   Ús (des de data-prep/):
+#       python download_laliga_2020_2025.py
+#       python download_laliga_2020_2025.py --seasons 2025
+#       python download_laliga_2020_2025.py --leagues laliga premier seriea
+#
 
-import soccerdata as sd
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
-print(">>> Iniciant descàrrega automàtica de LaLiga 2020–2025...\n")
+from fbref_io import file_hash
+from layout import LEAGUES, RAW_DIR, Partition
 
 # ------------------------------------------------------------
 # 1. DECLARACIONS
 # ------------------------------------------------------------
 
-LEAGUE = 'ESP-La Liga'
+DEFAULT_LEAGUES = ["laliga"]
 # SEASONS = [2024]  # 2024−25 (Pràctica Part I)
 SEASONS = [2020, 2021, 2022, 2023, 2024]  # 5 temporades per la Part II: 2020−21 fins 2024−25
-RAW_DIR = Path("data_raw")
-RAW_DIR.mkdir(exist_ok=True)
+MANIFEST_FILE = RAW_DIR / "download_manifest.json"
+
+# FBref admet unes 10 peticions per minut. Cada client de soccerdata fa
+# les seves pròpies peticions (pàgines de la lliga i de la temporada)
+# després del torn del limitador, de manera que per defecte només hi ha
+# una descàrrega alhora i el torn és de 6 s.
+DEFAULT_WORKERS = 1
+DEFAULT_MIN_INTERVAL = 6.0
+
+# Dades per equip (read_team_season_stats) + calendari (read_schedule)
+STAT_TYPES = ["standard", "shooting", "passing", "defense", "possession", "misc"]
+SCHEDULE = "matches"
+
+
+def default_client(league: str, season: int):
+    """Client real de FBref (soccerdata només cal si es descarrega)."""
+    import soccerdata as sd
+    return sd.FBref(leagues=league, seasons=[season])
+
+
+# ------------------------------------------------------------
+# 2. UTILITATS
+# ------------------------------------------------------------
+
+class RateLimiter:
+    """Garanteix un interval mínim entre peticions, compartit entre fils."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        time.sleep(max(0.0, slot - now))
+
+
+def output_path(league: str, season: int, stat_type: str) -> Path:
+    return Partition(league, season).raw(stat_type)
+
+
+def manifest_key(path: Path) -> str:
+    """Clau del manifest: ruta relativa a data_raw/ (laliga/2020/standard.csv)."""
+    return path.relative_to(RAW_DIR).as_posix()
+
+
+def load_manifest() -> dict:
+    if MANIFEST_FILE.exists():
+        return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    tmp = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, MANIFEST_FILE)
+
+
+def is_complete(path: Path, manifest: dict) -> bool:
+    """Un artefacte és vàlid si existeix i el seu hash coincideix amb el manifest."""
+    entry = manifest.get(manifest_key(path))
+    return entry is not None and path.exists() and file_hash(path) == entry["sha256"]
+
+
+def fetch(client, stat_type: str):
+    if stat_type == SCHEDULE:
+        return client.read_schedule()
+    return client.read_team_season_stats(stat_type=stat_type)
+
 
 # ------------------------------------------------------------
-# 2. BUCLE PER TOTES LES TEMPORADES
+# 3. GESTOR DE DESCÀRREGUES
 # ------------------------------------------------------------
 
-for season in SEASONS:
-    print(f"\n=== PROCESSANT TEMPORADA {season} ===")
+def download_job(league, season, stat_type, client_factory, limiter, retries,
+                 backoff: float = 2.0) -> dict:
+    """
+    Descarrega un artefacte amb reintents (espera backoff, 2·backoff, ...)
+    i el desa de manera atòmica: si l'escriptura falla, el fitxer
+    anterior queda intacte i no queda cap temporal.
+    """
+    path = output_path(league, season, stat_type)
+
+    retries = max(1, retries)
+    for attempt in range(1, retries + 1):
+        try:
+            limiter.wait()
+            client = client_factory(LEAGUES[league], season)
+            df = fetch(client, stat_type)
+            break
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            print(f"   ⚠️  {manifest_key(path)}: intent {attempt} fallit ({e}), reintent en {delay}s")
+            time.sleep(delay)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    return {
+        "league": league,
+        "season": season,
+        "stat_type": stat_type,
+        "rows": len(df),
+        "sha256": file_hash(path),
+        "downloaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def download_all(seasons=SEASONS, workers=DEFAULT_WORKERS, min_interval=DEFAULT_MIN_INTERVAL,
+                 retries=3, force=False, client_factory=default_client,
+                 leagues=DEFAULT_LEAGUES, backoff: float = 2.0) -> dict:
+    """
+    Executa totes les tasques (lliga, temporada, tipus) pendents.
+
+    client_factory(league, season) ha de retornar un objecte amb la
+    interfície de soccerdata.FBref (read_team_season_stats, read_schedule);
+    es pot substituir per un client local per fer proves
+    (tests/test_download.py). Tots els fils comparteixen un sol
+    limitador; amb workers > 1, les peticions internes de cada client
+    poden superar el límit de FBref si min_interval és massa curt.
+    Retorna {"downloaded": [...], "skipped": [...], "failed": {...}}.
+    """
+    RAW_DIR.mkdir(exist_ok=True)
+    manifest = load_manifest()
+    manifest_lock = threading.Lock()
+    limiter = RateLimiter(min_interval)
+
+    unknown = set(leagues) - set(LEAGUES)
+    if unknown:
+        raise ValueError(f"❌ Lligues desconegudes: {sorted(unknown)} (disponibles: {list(LEAGUES)})")
+
+    jobs = [(lg, s, t) for lg in leagues for s in seasons for t in [*STAT_TYPES, SCHEDULE]]
+    pending = []
+    skipped = []
+    for job in jobs:
+        path = output_path(*job)
+        if not force and is_complete(path, manifest):
+            skipped.append(manifest_key(path))
+        else:
+            pending.append(job)
+
+    print(f" > {len(pending)} descàrregues pendents, {len(skipped)} ja completes")
+
+    downloaded = []
+    failed = {}
+
+    def run(job):
+        name = manifest_key(output_path(*job))
+        try:
+            entry = download_job(*job, client_factory, limiter, retries, backoff)
+        except Exception as e:
+            failed[name] = str(e)
+            print(f"   ❌ {name}: {e}")
+            return
+        # El manifest es desa després de cada èxit per poder reprendre
+        with manifest_lock:
+            manifest[name] = entry
+            save_manifest(manifest)
+        downloaded.append(name)
+        print(f"   ✓ {name} ({entry['rows']} files)")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(run, pending))
+
+    return {"downloaded": sorted(downloaded), "skipped": skipped, "failed": failed}
+
 
-    fb = sd.FBref(leagues=LEAGUE, seasons=[season])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Descàrrega de dades FBref per lligues")
+    parser.add_argument("--leagues", nargs="+", default=DEFAULT_LEAGUES, choices=list(LEAGUES))
+    parser.add_argument("--seasons", type=int, nargs="+", default=SEASONS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="descàrregues simultànies (cada una fa diverses peticions)")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="segons mínims entre descàrregues, compartits entre fils "
+                             "(FBref: ~10 peticions per minut)")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--force", action="store_true", help="ignora el manifest")
+    args = parser.parse_args(argv)
 
-    # Descarregar dades per equip
-    print(" > Descarregant dades per equip...")
-    standard = fb.read_team_season_stats(stat_type="standard")
-    shooting = fb.read_team_season_stats(stat_type="shooting")
-    passing = fb.read_team_season_stats(stat_type="passing")
-    defense = fb.read_team_season_stats(stat_type="defense")
-    possession = fb.read_team_season_stats(stat_type="possession")
-    misc = fb.read_team_season_stats(stat_type="misc")
+    print(f">>> Iniciant descàrrega automàtica de {', '.join(args.leagues)}...\n")
 
-    # Descarregar dades de partits
-    print(" > Descarregant calendari de partits...")
-    matches = fb.read_schedule()
+    result = download_all(
+        seasons=args.seasons,
+        workers=args.workers,
+        min_interval=args.min_interval,
+        retries=args.retries,
+        force=args.force,
+        leagues=args.leagues,
+    )
 
-    # Guardar CSVs originals
-    print(" > Guardant CSVs...")
+    if result["failed"]:
+        print(f"\n>>> {len(result['failed'])} descàrregues fallides; "
+              f"torna a executar l'script per reprendre-les.")
+        raise SystemExit(1)
 
-    standard.to_csv(RAW_DIR / f"laliga_{season}_standard.csv", index=False)
-    shooting.to_csv(RAW_DIR / f"laliga_{season}_shooting.csv", index=False)
-    passing.to_csv(RAW_DIR / f"laliga_{season}_passing.csv", index=False)
-    defense.to_csv(RAW_DIR / f"laliga_{season}_defense.csv", index=False)
-    possession.to_csv(RAW_DIR / f"laliga_{season}_possession.csv", index=False)
-    misc.to_csv(RAW_DIR / f"laliga_{season}_misc.csv", index=False)
-    matches.to_csv(RAW_DIR / f"laliga_{season}_matches.csv", index=False)
+    print("\n>>> PROCÉS COMPLET!")
 
-    print(f" ✓ CSVs guardats correctament per la temporada {season}.")
 
-print("\n>>> PROCÉS COMPLET!")
+if __name__ == "__main__":
+    main()
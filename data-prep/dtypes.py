@@ -0,0 +1,176 @@
+# --------------------------------------------------------------
+#   POLÍTICA DE TIPUS COMPARTIDA PER TOTES LES TAULES
+# --------------------------------------------------------------
+#
+#   - claus (lliga, temporada, equip) i etiquetes → category
+#   - team_id, jornada, punts, dif. de gols, gols → enters petits
+#   - la resta de mètriques                       → float32
+#
+#   Els càlculs (restes, acumulats, mitjanes, escalats) es fan en
+#   float64: les taules intermèdies es compacten amb floats=False, les
+#   que es llegeixen d'un CSV per operar-hi es llegeixen directament en
+#   float64 (read_compact_csv(floats=False)) i les que ja són en memòria
+#   en float32 es passen per as_float64(). Només la taula final baixa a
+#   float32, de manera que els CSV no arrosseguen soroll de float32
+#   ("-7.5999985").
+#
+#   Les taules es compacten en crear-les o en llegir-les, i es
+#   concatenen amb concat(), que unifica les categories perquè el
+#   resultat continuï sent categòric (pd.concat de categories
+#   diferents torna a object). Els groupby sobre claus categòriques
+#   agrupen pels codis enters i han de fer servir observed=True.
+#
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CATEGORY_COLUMNS = ["league", "season", "team", "trend", "play_style"]
+
+# Amb marge per a lligues de 46 jornades (punts acumulats > 127)
+INT_DTYPES = {
+    "team_id": "int32",
+    "matchday": "int16",
+    "points": "int16",
+    "points_cum": "int16",
+    "goal_diff": "int16",
+    "goal_diff_cum": "int16",
+    "goals": "int16",
+    "goals_for": "int16",
+    "goals_against": "int16",
+    "window": "int16",
+    "matches": "int16",
+    "played": "int16",
+    "position": "int16",
+    "position_change": "int16",
+}
+
+FLOAT_DTYPE = "float32"
+
+
+def compact(df: pd.DataFrame, floats: bool = True) -> pd.DataFrame:
+    """
+    Aplica la política de tipus a les columnes que hi apareixen.
+    floats=False deixa els floats com estan (taules intermèdies que
+    encara s'han de fer servir per calcular).
+    """
+    casts = {}
+    for col, dtype in df.dtypes.items():
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(dtype, pd.CategoricalDtype):
+                casts[col] = "category"
+        elif col in INT_DTYPES:
+            # Amb valors absents es queda com està (float)
+            if not df[col].isna().any():
+                casts[col] = INT_DTYPES[col]
+        elif floats and pd.api.types.is_float_dtype(dtype):
+            casts[col] = FLOAT_DTYPE
+    return df.astype(casts) if casts else df
+
+
+# Xifres significatives que pot necessitar un float32 per tornar al mateix valor
+FLOAT32_DIGITS = 9
+
+
+def _float64(s: pd.Series) -> pd.Series:
+    """
+    float32 → float64 amb el valor decimal que s'escriu als CSV (0.87,
+    no 0.8700000047683716): el decimal més curt que torna al mateix
+    float32. Sense passar per text: per a 1, 2, ... xifres significatives
+    s'arrodoneix numèricament cada valor pendent i es queda el primer
+    arrodoniment que, en float32, és el valor original.
+    """
+    values = s.to_numpy(dtype="float32", na_value=np.nan)
+    x = values.astype("float64")
+    out = x.copy()
+
+    pending = np.flatnonzero(np.isfinite(x) & (x != 0))
+    magnitude = np.floor(np.log10(np.abs(x[pending]))).astype("int64")
+    for digits in range(1, FLOAT32_DIGITS + 1):
+        if not len(pending):
+            break
+        # 10**decimals exacte fins a 22: la divisió dona el float64 més proper al decimal
+        decimals = digits - 1 - magnitude
+        scale = 10.0 ** np.abs(decimals)
+        up = decimals >= 0
+        candidate = np.where(
+            up,
+            np.round(x[pending] * scale) / scale,
+            np.round(x[pending] / scale) * scale,
+        )
+        found = candidate.astype("float32") == values[pending]
+        out[pending[found]] = candidate[found]
+        pending, magnitude = pending[~found], magnitude[~found]
+
+    return pd.Series(out, index=s.index, name=s.name)
+
+
+def as_float64(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Còpia amb les columnes float32 en float64 (via _float64), per
+    calcular-hi sense soroll.
+    """
+    casts = {col: _float64(df[col]) for col, dtype in df.dtypes.items() if dtype == FLOAT_DTYPE}
+    return df.assign(**casts)
+
+
+def concat_compact(frames, **kwargs) -> pd.DataFrame:
+    """pd.concat que conserva les columnes categòriques (categories unides i ordenades)."""
+    frames = list(frames)
+    for col in CATEGORY_COLUMNS:
+        columns = [f[col] for f in frames if col in f.columns]
+        if len(columns) != len(frames) or not all(
+            isinstance(c.dtype, pd.CategoricalDtype) for c in columns
+        ):
+            continue
+        categories = union_categoricals(columns, sort_categories=True).categories
+        frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, **kwargs)
+
+
+def read_compact_csv(path, floats: bool = True, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv amb les claus llegides directament com a category.
+    floats=False deixa els floats en float64, amb el valor exacte del
+    decimal escrit (per operar-hi).
+    """
+    dtype = {col: "category" for col in CATEGORY_COLUMNS}
+    if not floats:
+        kwargs.setdefault("float_precision", "round_trip")
+    return compact(pd.read_csv(path, dtype=dtype, **kwargs), floats=floats)
+
+
+def widen(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Desfà la política per exportar fora de pandas (JSON, SQLite):
+    categories → text i float32 → float64 amb el mateix valor decimal
+    que s'escriu als CSV (0.87, no 0.8700000047683716).
+    """
+    out = {}
+    for col, dtype in df.dtypes.items():
+        s = df[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            s = s.astype(str).where(s.notna(), None)
+        elif dtype == FLOAT_DTYPE:
+            s = _float64(s)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def memory_usage(df: pd.DataFrame) -> tuple[float, float]:
+    """
+    (MB sense la política, MB actuals). El primer valor s'estima
+    columna a columna (category → object, numèrics → 8 bytes), sense
+    materialitzar la taula ampla sencera.
+    """
+    wide = df.index.memory_usage()
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            wide += s.astype(object).memory_usage(deep=True, index=False)
+        elif pd.api.types.is_numeric_dtype(s.dtype):
+            wide += 8 * len(s)
+        else:
+            wide += s.memory_usage(deep=True, index=False)
+    current = df.memory_usage(deep=True).sum()
+    return wide / 1024 ** 2, current / 1024 ** 2
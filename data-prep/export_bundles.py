@@ -0,0 +1,185 @@
+# --------------------------------------------------------------
+#   EXPORTACIÓ — PAQUETS DE DADES PER A LA DATASTORY
+# --------------------------------------------------------------
+#
+#   La datastory només mostra una temporada alhora i, per a les
+#   seccions 4 i 5, un sol equip. En lloc de descarregar els cinc CSV
+#   sencers en obrir la pàgina, main.js llegeix un índex petit i va
+#   carregant els fragments que demanen els selectors:
+#
+#       bundles/index.json                        ← temporades, equips i fragments
+#       bundles/{temporada}/section{1,2,3}.json.gz ← tots els equips d'una temporada
+#       bundles/{temporada}/teams/{team_id}.json.gz ← seccions 4 i 5 d'un equip
+#
+#   Cada fragment és JSON columnar ({columna: [valors]}) comprimit amb
+#   gzip de manera determinista, i es publica amb publish.py: un
+#   fragment sense canvis no es reescriu. L'índex en guarda el hash
+#   perquè el navegador el pugui desar a la memòria cau sense risc.
+#
+
+import argparse
+import gzip
+import hashlib
+import json
+
+import pandas as pd
+
+from dtypes import widen
+from instrumentation import instrument
+from layout import (
+    DATASTORY_LEAGUE, WEB_DATA_DIR, add_partition_args, processed_leagues, shared_table,
+)
+from publish import publish_bytes
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+BUNDLE_DIR = WEB_DATA_DIR / "bundles"
+INDEX_FILE = BUNDLE_DIR / "index.json"
+
+# etapa → taula publicada
+SEASON_SECTIONS = {
+    "section1": "section1_overview.csv",
+    "section2": "section2_efficiency.csv",
+    "section3": "section3_evolution.csv",
+}
+TEAM_SECTIONS = {
+    "section4": "section4_style.csv",
+    "section5": "section5_summary.csv",
+}
+
+
+# ------------------------------------------------------------
+# SERIALITZACIÓ
+# ------------------------------------------------------------
+
+def plain_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepara una taula per serialitzar-la (un cop per taula, no per
+    fragment): tipus de Python (dtypes.widen) i valors absents com a
+    None (null).
+    """
+    df = widen(df)
+    return df.astype(object).where(df.notna(), None)
+
+
+def to_columns(df: pd.DataFrame) -> dict[str, list]:
+    """Taula (ja preparada amb plain_table) → {columna: [valors]}."""
+    return {col: df[col].tolist() for col in df.columns}
+
+
+def encode(payload) -> bytes:
+    """JSON compacte comprimit amb gzip (mtime=0: mateix contingut → mateixos bytes)."""
+    data = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    return gzip.compress(data.encode("utf-8"), mtime=0)
+
+
+def publish_shard(path: str, payload, run) -> dict:
+    """Publica un fragment i en retorna l'entrada de l'índex."""
+    data = encode(payload)
+    target = BUNDLE_DIR / path
+    [written] = publish_bytes(data, [target])
+    run.output(target, written=written)
+    return {"path": path, "hash": hashlib.sha256(data).hexdigest()[:16], "bytes": len(data)}
+
+
+def remove_stale(keep: set[str]) -> int:
+    """Esborra els fragments que ja no surten a l'índex (temporades o equips desapareguts)."""
+    removed = 0
+    for path in BUNDLE_DIR.rglob("*.json.gz"):
+        if path.relative_to(BUNDLE_DIR).as_posix() not in keep:
+            path.unlink()
+            removed += 1
+    # Directoris buits, de més profund a menys
+    for folder in sorted((p for p in BUNDLE_DIR.rglob("*") if p.is_dir()), reverse=True):
+        if not any(folder.iterdir()):
+            folder.rmdir()
+    return removed
+
+
+# ------------------------------------------------------------
+# EXPORTACIÓ
+# ------------------------------------------------------------
+
+def main(argv=None, shared=None) -> dict:
+    """
+    Exporta els paquets de DATASTORY_LEAGUE. Sempre cobreix totes les
+    temporades: amb --seasons (execució parcial) les taules es llegeixen
+    dels CSV publicats en lloc de prendre-les de `shared`.
+    Retorna l'índex.
+    """
+    parser = argparse.ArgumentParser(description="Exportació de paquets per a la datastory")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    league = DATASTORY_LEAGUE
+    if args.seasons:
+        shared = None
+
+    with instrument("bundles") as run:
+        if not processed_leagues(SEASON_SECTIONS["section1"], [league]):
+            print(f"⚠️  No hi ha taules de {league}: no s'exporta cap paquet")
+            return {}
+
+        tables = {
+            stage: plain_table(shared_table(shared, stage, name, league, run=run))
+            for stage, name in {**SEASON_SECTIONS, **TEAM_SECTIONS}.items()
+        }
+
+        seasons = sorted(tables["section1"]["season"].unique(), reverse=True)
+        index = {
+            "league": league,
+            "seasons": seasons,
+            "teams": sorted(tables["section1"]["team"].unique()),
+            "shards": {},
+        }
+        shards = []
+
+        for season in seasons:
+            entry = {}
+            for stage in SEASON_SECTIONS:
+                df = tables[stage]
+                rows = df[df["season"] == season]
+                entry[stage] = publish_shard(f"{season}/{stage}.json.gz", to_columns(rows), run)
+                shards.append(entry[stage])
+
+            entry["teams"] = {}
+            season_rows = {
+                stage: tables[stage][tables[stage]["season"] == season]
+                for stage in TEAM_SECTIONS
+            }
+            by_team = {
+                stage: dict(tuple(rows.groupby("team_id", sort=False)))
+                for stage, rows in season_rows.items()
+            }
+            team_ids = season_rows["section4"][["team_id", "team"]].drop_duplicates()
+            for team_id, team in team_ids.itertuples(index=False):
+                payload = {
+                    stage: to_columns(groups.get(team_id, season_rows[stage].iloc[:0]))
+                    for stage, groups in by_team.items()
+                }
+                entry["teams"][str(team)] = publish_shard(
+                    f"{season}/teams/{team_id}.json.gz", payload, run
+                )
+                shards.append(entry["teams"][str(team)])
+
+            index["shards"][season] = entry
+            print(f"📦 {league}/{season}: {len(entry['teams'])} equips")
+
+        removed = remove_stale({shard["path"] for shard in shards})
+        if removed:
+            print(f"🧹 {removed} fragments obsolets esborrats")
+
+        data = json.dumps(index, indent=1, ensure_ascii=False).encode("utf-8")
+        [written] = publish_bytes(data, [INDEX_FILE])
+        run.output(INDEX_FILE, written=written)
+
+        total = sum(shard["bytes"] for shard in shards)
+        print(f"✅ {INDEX_FILE}: {len(shards)} fragments, {total / 1024:.1f} KB comprimits")
+
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+# --------------------------------------------------------------
+#   LECTURA DE TAULES FBREF (amb memòria cau columnar)
+# --------------------------------------------------------------
+#
+#   Els CSV d'equip de FBref tenen una capçalera de dues files que
+#   cal aplanar i una columna url d'on es deriva el nom de l'equip.
+#   Parsejar-los és la part més lenta d'una execució en fred, així que
+#   cada columna es parseja una sola vegada (només les que demana alguna
+#   secció, amb usecols) i es desa ja aplanada, amb team i squad_id, a
+#   data_cache/. Les lectures següents surten d'allà mentre el fitxer
+#   original no canviï (mtime/mida o, si cal, SHA-256).
+#
+#   Un procés de llarga durada (pipeline.py --watch) pot activar a més
+#   una cau en memòria amb enable_memory_cache(): les taules ja
+#   parsejades es mantenen calentes entre reconstruccions.
+#
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+CACHE_DIR = Path("data_cache")
+
+# S'incrementa quan canvia el que es desa a la cau (invalida les entrades antigues)
+CACHE_VERSION = 3
+
+# ruta → (mtime_ns, mida, taula sencera); None = cau en memòria desactivada
+_memory_cache: dict[str, tuple[int, int, pd.DataFrame]] | None = None
+
+
+# ------------------------------------------------------------
+# PARSEIG
+# ------------------------------------------------------------
+
+def team_from_url(urls: pd.Series) -> pd.Series:
+    """'/en/squads/8d6fd021/2020-2021/Alaves-Stats' → 'Alaves'"""
+    return (
+        urls
+        .astype(str)
+        .str.split("/")
+        .str[-1]
+        .str.replace("-Stats", "", regex=False)
+        .str.replace("-", " ", regex=False)
+        .str.strip()
+    )
+
+
+def squad_from_url(urls: pd.Series) -> pd.Series:
+    """'/en/squads/8d6fd021/2020-2021/Alaves-Stats' → '8d6fd021'"""
+    return urls.astype(str).str.extract(r"/squads/([0-9a-f]+)/", expand=False)
+
+
+def read_fbref_header(path: Path) -> list[str]:
+    """
+    Noms de columna aplanats tal com quedaran a la taula parsejada
+    (sense players_used i amb la columna url normalitzada a 'url').
+    Només llegeix les dues files de capçalera.
+    """
+    names, _ = _header_positions(path)
+    return list(names)
+
+
+def _header_positions(path: Path) -> tuple[list[str], list[int]]:
+    header = pd.read_csv(path, header=[0, 1], nrows=0).columns
+
+    # Aplanar columnes (multinivell parcial inclòs)
+    flat = [f"{a}_{b}".strip("_").strip() for a, b in header]
+
+    # Eliminar NOMÉS players_used (la resta de columnes són dades vàlides)
+    keep = [i for i, c in enumerate(flat) if "players_used" not in c.lower()]
+
+    # Trobar la columna url (pot tenir sufixos) i renombrar-la a 'url'
+    url_pos = next((i for i in keep if flat[i].lower().startswith("url")), None)
+    if url_pos is None:
+        raise ValueError(f"No s'ha trobat columna 'url' a {path.name}")
+    flat[url_pos] = "url"
+
+    return [flat[i] for i in keep], keep
+
+
+def parse_fbref_csv(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Llegeix CSV FBref amb header multinivell parcial,
+    aplana columnes i conserva totes les dades reals.
+
+    Si es passa columns, només es parsegen aquestes columnes (més url,
+    necessària per derivar team): la capçalera es resol a part i les
+    dades es llegeixen amb usecols.
+    """
+    path = Path(path)
+    names, positions = _header_positions(path)
+
+    if columns is not None:
+        missing = set(columns) - set(names)
+        if missing:
+            raise ValueError(f"No s'han trobat les columnes {sorted(missing)} a {path.name}")
+        wanted = set(columns) | {"url"}
+        selected = [(pos, name) for pos, name in zip(positions, names) if name in wanted]
+        positions = [pos for pos, _ in selected]
+        names = [name for _, name in selected]
+
+    df = pd.read_csv(path, header=None, skiprows=2, usecols=positions)
+    df.columns = names
+
+    # Crear team i l'identificador d'equip de FBref
+    df["team"] = team_from_url(df["url"])
+    df["squad_id"] = squad_from_url(df["url"])
+
+    return df
+
+
+# ------------------------------------------------------------
+# ESQUEMA (nom lògic → columna real)
+# ------------------------------------------------------------
+
+class FbrefSchema:
+    """
+    Registre precompilat de columnes per a un o més temes FBref.
+
+    Els noms lògics ("Poss", "PrgP", "Blocks_Sh", ...) es resolen amb
+    la mateixa prioritat de sempre: coincidència exacta, després per
+    prefix ("Poss" → "Poss_Unnamed: 2_level_1") i després per sufix
+    ("PrgC" → "Progression_PrgC"), quedant-se amb la primera columna
+    en l'ordre dels temes. Els tres índexs es construeixen una sola
+    vegada, de manera que cada consulta és O(1).
+    """
+
+    def __init__(self, headers: dict[str, list[str]]):
+        self.headers = headers
+        self._exact = {}
+        self._prefix = {}
+        self._suffix = {}
+
+        for topic, columns in headers.items():
+            for c in columns:
+                self._exact.setdefault(c.strip(), (topic, c))
+                for i, ch in enumerate(c):
+                    if ch == "_":
+                        self._prefix.setdefault(c[:i], (topic, c))
+                        self._suffix.setdefault(c[i + 1:], (topic, c))
+
+    @classmethod
+    def from_files(cls, topic_files: dict[str, Path]) -> "FbrefSchema":
+        """Construeix el registre llegint només les capçaleres."""
+        return cls({topic: read_fbref_header(path) for topic, path in topic_files.items()})
+
+    def lookup(self, target: str) -> tuple[str, str] | None:
+        """Retorna (tema, columna real) o None si no hi és."""
+        return (
+            self._exact.get(target)
+            or self._prefix.get(target)
+            or self._suffix.get(target)
+        )
+
+    def resolve(self, targets: list[str]) -> dict[str, tuple[str, str]]:
+        """
+        Resol tots els noms lògics de cop → {nom: (tema, columna real)}.
+        Si en falta algun, falla indicant-los tots.
+        """
+        resolved = {t: self.lookup(t) for t in targets}
+        missing = [t for t, found in resolved.items() if found is None]
+        if missing:
+            raise ValueError(
+                f"No s'han trobat les columnes {missing}. "
+                f"Temes disponibles: {list(self.headers)}"
+            )
+        return resolved
+
+
+# ------------------------------------------------------------
+# UNIÓ DE TEMES
+# ------------------------------------------------------------
+
+def join_topics(tables: dict[str, pd.DataFrame],
+                keys: list[str]) -> tuple[pd.DataFrame, dict[str, list[tuple]]]:
+    """
+    Uneix les taules de diversos temes en una sola operació alineada.
+
+    Cada taula s'indexa per keys un sol cop i les seves columnes es
+    prefixen amb el tema ("passing/PrgP"), de manera que dues columnes
+    amb el mateix nom en temes diferents (p. ex. 90s) no col·lideixen.
+    Només es conserven les claus presents a tots els temes (en l'ordre
+    del primer); també es retorna, per tema, les claus que hi falten.
+    """
+    indexed = {}
+    for topic, df in tables.items():
+        table = df.set_index(keys)
+        if not table.index.is_unique:
+            duplicated = table.index[table.index.duplicated()].unique().tolist()
+            raise ValueError(f"❌ Claus {keys} repetides al tema {topic}: {duplicated}")
+        indexed[topic] = table.add_prefix(f"{topic}/")
+
+    all_keys = None
+    for table in indexed.values():
+        all_keys = table.index if all_keys is None else all_keys.union(table.index, sort=False)
+
+    missing = {}
+    for topic, table in indexed.items():
+        absent = all_keys.difference(table.index, sort=False)
+        if len(absent):
+            missing[topic] = absent.tolist()
+
+    wide = pd.concat(indexed.values(), axis=1, join="inner")
+    return wide.reset_index(), missing
+
+
+# ------------------------------------------------------------
+# MEMÒRIA CAU
+# ------------------------------------------------------------
+
+def file_hash(path: Path) -> str:
+    """SHA-256 del contingut d'un fitxer (llegit per blocs)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_paths(path: Path) -> tuple[Path, Path]:
+    # data_raw/laliga/2020/standard.csv → data_cache/laliga_2020_standard.*
+    key = "_".join(path.with_suffix("").parts[-3:])
+    data_file = CACHE_DIR / f"{key}.{CACHE_FORMAT}"
+    meta_file = CACHE_DIR / f"{key}.json"
+    return data_file, meta_file
+
+
+def _write_cache(df: pd.DataFrame, data_file: Path) -> None:
+    tmp = data_file.with_name(data_file.name + ".tmp")
+    if CACHE_FORMAT == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, data_file)
+
+
+def _project(columns: list[str] | None) -> list[str] | None:
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*columns, "url", "team", "squad_id"]))
+
+
+def _raw_columns(df: pd.DataFrame) -> list[str]:
+    """Columnes del CSV que porta una taula parsejada (sense les derivades team i squad_id)."""
+    return [col for col in df.columns if col not in ("url", "team", "squad_id")]
+
+
+def _covers(available: list[str] | None, columns: list[str] | None) -> bool:
+    """Una taula amb les columnes `available` (None = totes) serveix per a `columns`."""
+    if available is None:
+        return True
+    return columns is not None and set(_project(columns)) <= set(available)
+
+
+def _widen(available: list[str] | None, columns: list[str] | None) -> list[str] | None:
+    """Columnes a parsejar perquè la taula cobreixi les que ja té i les que es demanen."""
+    if columns is None:
+        return None
+    kept = [col for col in available or [] if col not in ("url", "team", "squad_id")]
+    return list(dict.fromkeys([*kept, *columns]))
+
+
+def _read_cache(data_file: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    columns = _project(columns)
+    if CACHE_FORMAT == "parquet":
+        return pd.read_parquet(data_file, columns=columns)
+    # El pickle no es pot llegir per columnes: només hi ha les que s'han demanat mai
+    df = pd.read_pickle(data_file)
+    return df if columns is None else df[columns]
+
+
+def enable_memory_cache() -> None:
+    """Manté en memòria les taules llegides amb read_fbref_csv (processos de llarga durada)."""
+    global _memory_cache
+    if _memory_cache is None:
+        _memory_cache = {}
+
+
+def read_fbref_csv(path: Path, columns: list[str] | None = None,
+                   use_cache: bool = True) -> pd.DataFrame:
+    """
+    Com _read_fbref_csv, però amb la cau en memòria si està activada:
+    una entrada es reutilitza mentre (mtime, mida) del fitxer no canviïn
+    i tingui les columnes demanades; si no, es torna a llegir amb les
+    que ja tenia més les noves.
+    """
+    if _memory_cache is None or not use_cache:
+        return _read_fbref_csv(path, columns, use_cache)
+
+    path = Path(path)
+    stat = path.stat()
+    entry = _memory_cache.get(str(path))
+    if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+        entry = None
+    if entry is None or not _covers(entry[3], columns):
+        wanted = _widen(entry[3], columns) if entry is not None else columns
+        df = _read_fbref_csv(path, wanted)
+        entry = (stat.st_mtime_ns, stat.st_size, df, None if wanted is None else list(df.columns))
+        _memory_cache[str(path)] = entry
+
+    df = entry[2]
+    # Còpia superficial: qui la rep pot afegir-hi columnes sense tocar la cau
+    return df.copy(deep=False) if columns is None else df[_project(columns)]
+
+
+def _read_fbref_csv(path: Path, columns: list[str] | None = None,
+                    use_cache: bool = True) -> pd.DataFrame:
+    """
+    Versió amb memòria cau de parse_fbref_csv.
+
+    La validesa es comprova primer amb (mtime, mida) del fitxer original;
+    si no coincideixen però el SHA-256 sí (p. ex. un fitxer tornat a
+    descarregar idèntic), es reaprofita la cau i s'actualitza la metadada.
+
+    columns limita les columnes retornades (sempre s'hi afegeixen url,
+    team i squad_id) i també les que es parsegen: la cau només desa les
+    columnes que s'han demanat (la metadada en guarda la llista; cap
+    llista vol dir la taula sencera). Si la cau és vàlida i les té, es
+    llegeixen del fitxer columnar; si no, es parsegen del CSV amb
+    usecols les que ja hi havia més les noves, i la cau es reescriu.
+    """
+    path = Path(path)
+    if not use_cache:
+        return parse_fbref_csv(path, columns)
+
+    data_file, meta_file = _cache_paths(path)
+    stat = path.stat()
+    source = {"version": CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    meta = {}
+    if data_file.exists() and meta_file.exists():
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+
+    valid = False
+    sha = None
+    if meta.get("version") == CACHE_VERSION:
+        if meta.get("mtime_ns") == source["mtime_ns"] and meta.get("size") == source["size"]:
+            valid, sha = True, meta.get("sha256")
+        else:
+            sha = file_hash(path)
+            if meta.get("sha256") == sha:
+                valid = True
+                meta_file.write_text(json.dumps({**meta, **source}), encoding="utf-8")
+
+    if valid and _covers(meta.get("columns"), columns):
+        return _read_cache(data_file, columns)
+
+    wanted = _widen(meta.get("columns"), columns) if valid else columns
+    df = parse_fbref_csv(path, wanted)
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    _write_cache(df, data_file)
+    meta = {**source, "sha256": sha or file_hash(path),
+            "columns": None if wanted is None else list(df.columns)}
+    meta_file.write_text(json.dumps(meta), encoding="utf-8")
+
+    return df if columns is None else df[_project(columns)]
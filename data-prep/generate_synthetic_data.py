@@ -0,0 +1,186 @@
+# --------------------------------------------------------------
+#   DADES SINTÈTIQUES AMB FORMAT FBREF (per a benchmarks)
+# --------------------------------------------------------------
+#
+#   Genera fitxers amb la mateixa forma i disposició que els de
+#   data_raw/ ({lliga}/{temporada}/{tema}.csv): taules d'equip amb
+#   capçalera de dues files (standard, passing, possession, defense,
+#   shooting, misc) i el calendari de partits, per a N lligues ×
+#   M temporades × T equips.
+#
+#   Les capçaleres es copien literalment dels fitxers reals de
+#   LaLiga (TEMPLATE_DIR) i els valors es generen al voltant de la
+#   primera fila real de cada columna, de manera que tots els scripts
+#   prepare_section*_data.py els poden processar sense canvis.
+#
+#   Ús (des de data-prep/):
+#       python generate_synthetic_data.py OUT_DIR --leagues 5 --seasons 10 --teams 20
+#
+
+import argparse
+import csv
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "data_raw" / "laliga"
+TEMPLATE_SEASON = 2020
+TOPICS = ["standard", "passing", "possession", "defense", "shooting", "misc"]
+FIRST_SEASON = 2020
+
+# Columnes que depenen del nombre de partits jugats (segona fila de capçalera)
+MATCH_COUNT_COLS = {"MP", "90s"}
+
+
+# ------------------------------------------------------------
+# UTILITATS
+# ------------------------------------------------------------
+
+def league_name(league: int) -> str:
+    return f"synth{league + 1}"
+
+
+def team_names(league: int, teams: int) -> list[str]:
+    return [f"Team L{league + 1} {i + 1:02d}" for i in range(teams)]
+
+
+def squad_id(team: str) -> str:
+    """Identificador FBref fictici però estable per equip (igual a tots els temes)."""
+    return f"{zlib.crc32(team.encode()):08x}"
+
+
+def read_template(topic: str) -> tuple[list[str], list[str], pd.Series]:
+    """Dues files de capçalera i la primera fila real (valors de referència)."""
+    path = TEMPLATE_DIR / str(TEMPLATE_SEASON) / f"{topic}.csv"
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        top, bottom = next(reader), next(reader)
+    reference = pd.read_csv(path, header=None, skiprows=2, nrows=1).iloc[0]
+    return top, bottom, reference
+
+
+def round_robin(teams: list[str]) -> list[list[tuple[str, str]]]:
+    """Calendari de doble volta (mètode del cercle): llista de jornades."""
+    names = list(teams)
+    if len(names) % 2:
+        names.append(None)
+    n = len(names)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = names[i], names[n - 1 - i]
+            if home is not None and away is not None:
+                pairs.append((home, away) if r % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        names = [names[0], names[-1], *names[1:-1]]
+    return rounds + [[(a, h) for h, a in pairs] for pairs in rounds]
+
+
+# ------------------------------------------------------------
+# GENERADORS
+# ------------------------------------------------------------
+
+def team_table(topic: str, season: int, teams: list[str], n_matches: int,
+               rng: np.random.Generator) -> list[list]:
+    top, bottom, reference = read_template(topic)
+    n = len(teams)
+    columns = []
+
+    for pos, (group, name) in enumerate(zip(top, bottom)):
+        if group.startswith("url"):
+            columns.append([
+                f"/en/squads/{squad_id(t)}/{season}-{season + 1}/{t.replace(' ', '-')}-Stats"
+                for t in teams
+            ])
+            continue
+
+        value = reference[pos]
+        if name in MATCH_COUNT_COLS:
+            columns.append([n_matches] * n)
+        elif isinstance(value, (int, np.integer)):
+            columns.append(np.rint(value * rng.uniform(0.7, 1.3, n)).astype(int).tolist())
+        elif isinstance(value, (float, np.floating)) and not np.isnan(value):
+            columns.append(np.round(value * rng.uniform(0.7, 1.3, n), 2).tolist())
+        else:
+            columns.append([""] * n)
+
+    return [top, bottom, *map(list, zip(*columns))]
+
+
+def schedule(season: int, teams: list[str], rng: np.random.Generator) -> pd.DataFrame:
+    rows = []
+    start = pd.Timestamp(f"{season}-08-15")
+    for week, pairs in enumerate(round_robin(teams), start=1):
+        date = start + pd.Timedelta(days=7 * (week - 1))
+        for home, away in pairs:
+            home_xg, away_xg = np.round(rng.gamma(2.0, 0.7, 2), 1)
+            home_goals, away_goals = rng.poisson([home_xg, away_xg])
+            game_id = f"{rng.integers(0, 16 ** 8):08x}"
+            rows.append({
+                "week": week,
+                "day": date.strftime("%a"),
+                "date": date.strftime("%Y-%m-%d"),
+                "time": "21:00",
+                "home_team": home,
+                "home_xg": home_xg,
+                "score": f"{home_goals}–{away_goals}",
+                "away_xg": away_xg,
+                "away_team": away,
+                "attendance": None,
+                "venue": f"Estadi {home}",
+                "referee": "Àrbitre",
+                "match_report": f"/en/matches/{game_id}/",
+                "notes": None,
+                "game_id": game_id,
+            })
+    return pd.DataFrame(rows)
+
+
+def generate(out_dir: Path, leagues: int, seasons: int, teams: int, seed: int = 0) -> list[Path]:
+    """
+    Escriu els fitxers sintètics a out_dir/{lliga}/{temporada}/ i en
+    retorna la llista. Cada lliga (synth1, synth2, ...) té els seus
+    equips i el seu calendari de doble volta.
+    """
+    rng = np.random.default_rng(seed)
+    written = []
+    n_matches = 2 * (teams - 1)
+
+    for lg in range(leagues):
+        league_teams = team_names(lg, teams)
+
+        for season in range(FIRST_SEASON, FIRST_SEASON + seasons):
+            season_dir = out_dir / league_name(lg) / str(season)
+            season_dir.mkdir(parents=True, exist_ok=True)
+
+            for topic in TOPICS:
+                path = season_dir / f"{topic}.csv"
+                with open(path, "w", newline="", encoding="utf-8") as f:
+                    csv.writer(f).writerows(team_table(topic, season, league_teams, n_matches, rng))
+                written.append(path)
+
+            path = season_dir / "matches.csv"
+            schedule(season, league_teams, rng).to_csv(path, index=False)
+            written.append(path)
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera dades FBref sintètiques")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    written = generate(args.out_dir, args.leagues, args.seasons, args.teams, args.seed)
+    print(f"✅ {len(written)} fitxers generats a {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
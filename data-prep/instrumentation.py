@@ -0,0 +1,218 @@
+# --------------------------------------------------------------
+#   INSTRUMENTACIÓ D'ETAPES I MANIFEST D'EXECUCIÓ
+# --------------------------------------------------------------
+#
+#   Cada script prepare_section*_data.py s'executa dins de
+#   instrument("sectionN"), que mesura el temps de paret i el pic de
+#   memòria de l'etapa i recull les entrades i sortides declarades
+#   (files, bytes i SHA-256; les sortides sense canvis consten com a
+#   no escrites), a més de la memòria de les taules
+#   principals abans i després de la política de tipus (dtypes.py).
+#   A Linux, el pic de memòria resident (VmHWM) es reinicia en començar
+#   cada etapa (/proc/self/clear_refs), de manera que amb pipeline.py
+#   --in-process cada etapa registra el seu pic i no el de les
+#   anteriors (peak_rss_scope = "stage"; rss_growth_mb és el creixement
+#   respecte de la memòria en començar). Si no es pot reiniciar, el
+#   valor és el pic acumulat del procés (peak_rss_scope = "process").
+#
+#   El resultat s'escriu a run_manifest.json (al costat de
+#   data_processed/), una entrada per etapa.
+#
+#   Amb la variable d'entorn DATAPREP_PROFILE=1 (o pipeline.py
+#   --profile) es desa també un perfil cProfile per etapa a profiles/.
+#
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dtypes import memory_usage
+from fbref_io import file_hash
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+MANIFEST_FILE = Path("run_manifest.json")
+PROFILE_DIR = Path("profiles")
+PROFILE_ENV = "DATAPREP_PROFILE"
+
+
+# ------------------------------------------------------------
+# UTILITATS
+# ------------------------------------------------------------
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _proc_status_mb(field: str) -> float | None:
+    """Camp de memòria de /proc/self/status (VmRSS, VmHWM) en MB."""
+    try:
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reinicia el pic de memòria resident del procés (Linux >= 4.0)."""
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    return _proc_status_mb("VmHWM") is not None
+
+
+def current_rss_mb() -> float | None:
+    return _proc_status_mb("VmRSS")
+
+
+def peak_rss_mb() -> float | None:
+    """Pic de memòria resident (MB) des de l'últim reset_peak_rss() o des de l'inici del procés."""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None or resource is None:
+        return peak
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KB a Linux, bytes a macOS
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def file_entry(path: Path, rows: int | None, written: bool | None = None) -> dict:
+    path = Path(path)
+    entry = {
+        "path": path.as_posix(),
+        "rows": rows,
+        "bytes": path.stat().st_size,
+        "sha256": file_hash(path),
+    }
+    if written is not None:
+        entry["written"] = written
+    return entry
+
+
+def load_manifest() -> dict:
+    if MANIFEST_FILE.exists():
+        return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    return {"stages": {}}
+
+
+def save_manifest(manifest: dict) -> None:
+    tmp = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, MANIFEST_FILE)
+
+
+# ------------------------------------------------------------
+# REGISTRE D'UNA ETAPA
+# ------------------------------------------------------------
+
+class StageRun:
+    """Entrades i sortides declarades per una etapa durant l'execució."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.inputs = []
+        self.outputs = []
+        self.tables = {}
+
+    def input(self, path: Path, rows: int | None = None) -> None:
+        self.inputs.append((Path(path), rows))
+
+    def output(self, path: Path, rows: int | None = None, written: bool = True) -> None:
+        """written=False → el contingut no havia canviat i no s'ha reescrit."""
+        self.outputs.append((Path(path), rows, written))
+
+    def memory(self, label: str, df) -> None:
+        """Registra la memòria d'una taula sense i amb la política de tipus."""
+        wide_mb, compact_mb = memory_usage(df)
+        self.tables[label] = {
+            "rows": len(df),
+            "before_mb": round(wide_mb, 3),
+            "after_mb": round(compact_mb, 3),
+        }
+        print(f"🧮 {label}: {wide_mb:.3f} MB → {compact_mb:.3f} MB ({len(df)} files)")
+
+    def summary(self) -> dict:
+        inputs = [file_entry(p, r) for p, r in self.inputs if p.exists()]
+        outputs = [file_entry(p, r, w) for p, r, w in self.outputs if p.exists()]
+        return {
+            # Les còpies d'una taula (datastory) es registren sense files
+            "rows_in": sum(e["rows"] or 0 for e in inputs),
+            "rows_out": sum(e["rows"] or 0 for e in outputs),
+            "bytes_read": sum(e["bytes"] for e in inputs),
+            "bytes_written": sum(e["bytes"] for e in outputs if e["written"]),
+            "inputs": inputs,
+            "outputs": outputs,
+            "memory": self.tables,
+        }
+
+
+def memory_entry(stage_scoped: bool, rss_start: float | None) -> dict:
+    peak = peak_rss_mb()
+    entry = {
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        "peak_rss_scope": "stage" if stage_scoped else "process",
+    }
+    if stage_scoped and peak is not None and rss_start is not None:
+        entry["rss_growth_mb"] = round(peak - rss_start, 1)
+    return entry
+
+
+@contextmanager
+def instrument(name: str):
+    """
+    Context d'execució d'una etapa: en sortir (amb èxit o error)
+    actualitza l'entrada de l'etapa a run_manifest.json.
+    """
+    run = StageRun(name)
+    profiler = cProfile.Profile() if os.environ.get(PROFILE_ENV) else None
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    stage_scoped = reset_peak_rss()
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    status = "ok"
+
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield run
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+
+        entry = {
+            "started_at": started_at,
+            "status": status,
+            "wall_s": round(wall, 4),
+            **memory_entry(stage_scoped, rss_start),
+            **run.summary(),
+        }
+
+        if profiler is not None:
+            PROFILE_DIR.mkdir(exist_ok=True)
+            profile_file = PROFILE_DIR / f"{name}.prof"
+            profiler.dump_stats(profile_file)
+            entry["profile"] = profile_file.as_posix()
+
+        manifest = load_manifest()
+        manifest["stages"][name] = entry
+        save_manifest(manifest)
+
+        print(f"⏱️  {name}: {wall:.3f}s, {entry['rows_in']} → {entry['rows_out']} files")
@@ -0,0 +1,194 @@
+# --------------------------------------------------------------
+#   DISPOSICIÓ DE LES DADES PER PARTICIONS (lliga / temporada)
+# --------------------------------------------------------------
+#
+#   data_raw/{lliga}/{any}/{tema}.csv     ← fitxers FBref d'una partició
+#   data_processed/{lliga}/{secció}.csv   ← una taula per lliga (columna season)
+#
+#   La lliga és el nom del directori (p. ex. "laliga"); LEAGUES només
+#   en dona el nom que espera FBref per descarregar-la. Les etapes
+#   descobreixen les particions que hi ha a disc i en poden processar
+#   un subconjunt (--leagues / --seasons): aleshores només se substitueixen
+#   les files d'aquelles temporades a la taula de cada lliga.
+#
+#   La datastory mostra DATASTORY_LEAGUE: les seves taules es publiquen
+#   també a ../datastory/data amb el nom de sempre (publish.py).
+#
+
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from dtypes import compact, concat_compact, read_compact_csv
+from publish import publish_table
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+RAW_DIR = Path("data_raw")
+PROCESSED_DIR = Path("data_processed")
+WEB_DATA_DIR = Path("../datastory/data")
+
+# ------------------------------------------------------------
+# LLIGUES
+# ------------------------------------------------------------
+
+# directori → nom de la lliga a FBref (soccerdata)
+LEAGUES = {
+    "laliga": "ESP-La Liga",
+    "premier": "ENG-Premier League",
+    "seriea": "ITA-Serie A",
+    "bundesliga": "GER-Bundesliga",
+    "ligue1": "FRA-Ligue 1",
+}
+
+DATASTORY_LEAGUE = "laliga"
+
+
+# ------------------------------------------------------------
+# PARTICIONS
+# ------------------------------------------------------------
+
+def season_label(year: int) -> str:
+    """2024 → '2024-25'"""
+    return f"{year}-{str(year + 1)[-2:]}"
+
+
+class Partition(NamedTuple):
+    league: str
+    year: int
+
+    @property
+    def season(self) -> str:
+        return season_label(self.year)
+
+    def raw(self, topic: str) -> Path:
+        return RAW_DIR / self.league / str(self.year) / f"{topic}.csv"
+
+    def __str__(self) -> str:
+        return f"{self.league}/{self.season}"
+
+
+def discover(topics: list[str], leagues=None, seasons=None) -> list[Partition]:
+    """
+    Particions de data_raw/ que tenen algun dels temes indicats,
+    ordenades per lliga i temporada. leagues / seasons (anys d'inici)
+    restringeixen el resultat; None vol dir totes.
+    """
+    partitions = []
+    for season_dir in sorted(RAW_DIR.glob("*/*")):
+        if not season_dir.is_dir() or not season_dir.name.isdigit():
+            continue
+        p = Partition(season_dir.parent.name, int(season_dir.name))
+        if leagues and p.league not in leagues:
+            continue
+        if seasons and p.year not in seasons:
+            continue
+        if any(p.raw(t).exists() for t in topics):
+            partitions.append(p)
+    return sorted(partitions)
+
+
+def by_league(partitions: list[Partition]) -> dict[str, list[Partition]]:
+    grouped = {}
+    for p in partitions:
+        grouped.setdefault(p.league, []).append(p)
+    return grouped
+
+
+def add_partition_args(parser) -> None:
+    """Arguments comuns per processar només un subconjunt de particions."""
+    parser.add_argument("--leagues", nargs="+", default=None,
+                        help="lligues a processar (per defecte, totes les de data_raw/)")
+    parser.add_argument("--seasons", nargs="+", type=int, default=None,
+                        help="temporades a processar, per any d'inici (per defecte, totes)")
+
+
+# ------------------------------------------------------------
+# TAULES PROCESSADES PER LLIGA
+# ------------------------------------------------------------
+
+def league_path(league: str, name: str) -> Path:
+    return PROCESSED_DIR / league / name
+
+
+def processed_leagues(name: str, leagues=None) -> list[str]:
+    """Lligues que ja tenen la taula `name` a data_processed/."""
+    found = sorted(p.parent.name for p in PROCESSED_DIR.glob(f"*/{name}"))
+    return [lg for lg in found if not leagues or lg in leagues]
+
+
+def league_targets(league: str, name: str) -> list[Path]:
+    """Destins de la taula `name` d'una lliga: data_processed/ i, si escau, la datastory."""
+    targets = [league_path(league, name)]
+    if league == DATASTORY_LEAGUE:
+        targets.append(WEB_DATA_DIR / name)
+    return targets
+
+
+def select_seasons(df: pd.DataFrame, seasons=None) -> pd.DataFrame:
+    """Files de les temporades indicades (anys d'inici); None vol dir totes."""
+    if seasons:
+        df = df[df["season"].isin([season_label(y) for y in seasons])].reset_index(drop=True)
+    return df
+
+
+def load_league_table(name: str, league: str, seasons=None, floats: bool = True) -> pd.DataFrame:
+    """
+    Taula d'una lliga amb la política de tipus compacta, opcionalment
+    només per a unes temporades (anys d'inici). floats=False la llegeix
+    amb els floats en float64 (per calcular-hi).
+    """
+    return select_seasons(read_compact_csv(league_path(league, name), floats=floats), seasons)
+
+
+def shared_table(shared, stage: str, name: str, league: str,
+                 seasons=None, run=None, floats: bool = True) -> pd.DataFrame:
+    """
+    Taula d'una etapa anterior. Amb pipeline.py --in-process, `shared`
+    conté el resultat de cada etapa ({etapa: {lliga: taula}}) i la taula
+    es pren de memòria; si no hi és, es llegeix del CSV publicat (amb
+    floats=False, en float64).
+    """
+    tables = (shared or {}).get(stage) or {}
+    if league in tables:
+        return tables[league]
+    df = load_league_table(name, league, seasons, floats)
+    if run is not None:
+        run.input(league_path(league, name), rows=len(df))
+    return df
+
+
+def save_league_table(name: str, league: str, df: pd.DataFrame,
+                      seasons=None, run=None) -> pd.DataFrame:
+    """
+    Publica la taula `name` d'una lliga (i la còpia de la datastory si
+    és DATASTORY_LEAGUE): es serialitza un cop, s'escriu de manera
+    atòmica i els destins amb el mateix contingut no es reescriuen.
+
+    seasons=None → df és la taula sencera i substitueix l'anterior.
+    Si no, df només conté aquestes temporades (anys d'inici): les files
+    de la resta de temporades es conserven de la taula existent.
+    """
+    path = league_path(league, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if seasons and path.exists():
+        existing = read_compact_csv(path)
+        kept = existing[~existing["season"].isin([season_label(y) for y in seasons])]
+        df = (
+            concat_compact([kept, compact(df)], ignore_index=True)
+            .sort_values("season", kind="stable")
+            .reset_index(drop=True)
+        )
+
+    targets = league_targets(league, name)
+    written = publish_table(df, targets)
+
+    if run is not None:
+        for target, was_written in zip(targets, written):
+            run.output(target, rows=len(df) if target == path else None, written=was_written)
+
+    return df
@@ -0,0 +1,46 @@
+# --------------------------------------------------------------
+#   PARAL·LELISME PER TEMPORADES
+# --------------------------------------------------------------
+#
+#   Cada temporada es pot processar de manera independent fins al
+#   pd.concat final. map_seasons reparteix les temporades en un pool
+#   de processos i retorna els resultats en l'ordre d'entrada.
+#
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _timed_call(func, arg):
+    start = time.perf_counter()
+    result = func(arg)
+    return result, time.perf_counter() - start
+
+
+def map_seasons(func, jobs: dict, workers: int = 1) -> list:
+    """
+    Aplica func(arg) a cada element de jobs ({temporada: arg}).
+
+    - workers <= 1 → execució seqüencial al mateix procés
+    - workers > 1  → ProcessPoolExecutor amb aquest nombre de processos
+
+    func ha de ser una funció de nivell de mòdul (picklable).
+    Retorna la llista de resultats en l'ordre de jobs i imprimeix
+    el temps de cada temporada.
+    """
+    start = time.perf_counter()
+    seasons = list(jobs)
+
+    if workers <= 1 or len(seasons) <= 1:
+        outcomes = [_timed_call(func, jobs[s]) for s in seasons]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_timed_call, func, jobs[s]) for s in seasons]
+            outcomes = [f.result() for f in futures]
+
+    for season, (_, elapsed) in zip(seasons, outcomes):
+        print(f"   ⏱️  {season}: {elapsed:.3f}s")
+    print(f"   ⏱️  total ({len(seasons)} temporades, workers={workers}): "
+          f"{time.perf_counter() - start:.3f}s")
+
+    return [result for result, _ in outcomes]
@@ -0,0 +1,560 @@
+# --------------------------------------------------------------
+#   PIPELINE — Execució incremental de totes les seccions
+# --------------------------------------------------------------
+#
+#   Ús (des de data-prep/):
+#       python pipeline.py                 # executa només el que ha canviat
+#       python pipeline.py --force         # reconstrueix-ho tot
+#       python pipeline.py section3        # section3 i les etapes que en depenen
+#       python pipeline.py --dry-run       # mostra què s'executaria
+#       python pipeline.py --workers 4     # temporades en paral·lel (s3, s4)
+#       python pipeline.py --append        # section3 només integra partits nous
+#       python pipeline.py --profile       # perfil cProfile per etapa a profiles/
+#       python pipeline.py --leagues premier --seasons 2024   # només aquestes particions
+#       python pipeline.py --in-process    # totes les etapes en un procés, taules en memòria
+#       python pipeline.py --watch         # vigila data_raw/ i el codi i reconstrueix el que canviï
+#       python warehouse.py --query "SELECT ..."   # consulta ad hoc al magatzem SQLite
+#
+#   Cada etapa deixa temps, memòria, files i hashes a run_manifest.json;
+#   si supera el seu budget_s es mostra un avís (o falla amb --strict-budget).
+#
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path, PurePosixPath
+
+from fbref_io import enable_memory_cache, file_hash
+from instrumentation import MANIFEST_FILE, PROFILE_ENV
+from layout import add_partition_args
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+BASE_DIR = Path(__file__).resolve().parent
+RAW_DIR = BASE_DIR / "data_raw"
+PROCESSED_DIR = BASE_DIR / "data_processed"
+STATE_FILE = PROCESSED_DIR / ".pipeline_state.json"
+
+# fitxer → ((mtime_ns, mida), mòduls de data-prep/ que importa)
+_imports_cache: dict[Path, tuple[tuple[int, int], set[str]]] = {}
+
+# ------------------------------------------------------------
+# GRAF D'ETAPES
+# ------------------------------------------------------------
+#   script  → codi de l'etapa; ell i els mòduls de data-prep/ que importa
+#             (directament o no, vegeu code_files) formen part de l'empremta
+#   config  → fitxers de configuració que llegeix (també formen part de l'empremta)
+#   raw     → patrons glob dins de data_raw/ ({lliga}/{temporada}/{tema}.csv)
+#   deps    → etapes de les quals llegeix la sortida
+#   outputs → patrons glob de les taules que escriu, relatius a data-prep/ (una etapa
+#             sense cap sortida existent no està al dia)
+#   parallel→ l'script accepta --workers (paral·lelisme per temporades)
+#   append  → l'script accepta --append (ingesta incremental)
+#   budget_s→ temps màxim esperat (segons) abans d'avisar
+
+STAGES = {
+    "teams": {
+        "script": "prepare_teams_data.py",
+        "raw": ["*/*/standard.csv", "*/*/matches.csv"],
+        "deps": [],
+        "outputs": ["data_processed/teams.csv"],
+        "budget_s": 5,
+    },
+    "section1": {
+        "script": "prepare_section1_data.py",
+        "raw": ["*/*/standard.csv"],
+        "deps": ["teams"],
+        "outputs": ["data_processed/*/section1_overview.csv"],
+        "budget_s": 10,
+    },
+    "section2": {
+        "script": "prepare_section2_data.py",
+        "raw": ["*/*/standard.csv"],
+        "deps": ["teams", "section1"],
+        "outputs": ["data_processed/*/section2_efficiency.csv"],
+        "budget_s": 5,
+    },
+    "section3": {
+        "script": "prepare_section3_data.py",
+        "raw": ["*/*/matches.csv"],
+        "deps": ["teams"],
+        "outputs": ["data_processed/*/section3_evolution.csv"],
+        "budget_s": 30,
+        "parallel": True,
+        "append": True,
+    },
+    "form": {
+        "script": "prepare_form_data.py",
+        "raw": ["*/*/matches.csv"],
+        "deps": ["teams"],
+        "outputs": ["data_processed/*/form_rolling.csv"],
+        "budget_s": 10,
+    },
+    "standings": {
+        "script": "prepare_standings_data.py",
+        "raw": ["*/*/matches.csv"],
+        "deps": ["teams"],
+        "outputs": ["data_processed/*/standings.csv"],
+        "budget_s": 10,
+    },
+    "section4": {
+        "script": "prepare_section4_data.py",
+        "raw": [
+            "*/*/standard.csv",
+            "*/*/passing.csv",
+            "*/*/possession.csv",
+            "*/*/defense.csv",
+            "*/*/shooting.csv",
+        ],
+        "deps": ["teams"],
+        "outputs": ["data_processed/*/section4_style.csv"],
+        "budget_s": 30,
+        "parallel": True,
+    },
+    "section5": {
+        "script": "prepare_section5_data.py",
+        "config": ["style_rules.json"],
+        "raw": [],
+        "deps": ["section1", "section2", "section3", "section4"],
+        "outputs": ["data_processed/*/section5_summary.csv"],
+        "budget_s": 10,
+    },
+    "warehouse": {
+        "script": "warehouse.py",
+        "raw": ["*/*/*.csv"],
+        "deps": ["teams", "section1", "section2", "section3", "section4", "section5", "form",
+                 "standings"],
+        "outputs": ["data_processed/warehouse.sqlite"],
+        "budget_s": 30,
+    },
+    "bundles": {
+        "script": "export_bundles.py",
+        "raw": [],
+        "deps": ["section1", "section2", "section3", "section4", "section5"],
+        # Escriu a ../datastory/data/bundles, fora de data_processed/
+        "outputs": ["../datastory/data/bundles/index.json"],
+        "budget_s": 10,
+    },
+}
+
+
+# ------------------------------------------------------------
+# UTILITATS
+# ------------------------------------------------------------
+
+def topological_order(stages: dict) -> list[str]:
+    """Ordena les etapes de manera que cada una vagi després de les seves deps."""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"❌ Cicle al graf d'etapes a '{name}'")
+        visiting.add(name)
+        for dep in stages[name]["deps"]:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def dependents(stages: dict, roots: set[str]) -> set[str]:
+    """Retorna roots més totes les etapes que en depenen (directament o no)."""
+    selected = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for name, stage in stages.items():
+            if name not in selected and selected & set(stage["deps"]):
+                selected.add(name)
+                changed = True
+    return selected
+
+
+def local_imports(path: Path) -> set[str]:
+    """Mòduls de data-prep/ que importa un fitxer (import x / from x import y)."""
+    stat = path.stat()
+    cached = _imports_cache.get(path)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    names = {name for name in names if (BASE_DIR / f"{name}.py").exists()}
+    _imports_cache[path] = ((stat.st_mtime_ns, stat.st_size), names)
+    return names
+
+
+def code_files(name: str) -> list[str]:
+    """
+    Fitxers de codi d'una etapa, relatius a data-prep/: l'script, els
+    mòduls de data-prep/ que importa directament o a través d'altres, i
+    els fitxers de configuració (config).
+    """
+    script = STAGES[name]["script"]
+    seen = set()
+    pending = [script]
+    while pending:
+        f = pending.pop()
+        if f in seen or not (BASE_DIR / f).exists():
+            continue
+        seen.add(f)
+        pending.extend(f"{module}.py" for module in local_imports(BASE_DIR / f))
+    return [script, *sorted(seen - {script}), *STAGES[name].get("config", [])]
+
+
+def stage_inputs(name: str) -> list[Path]:
+    """Llista ordenada de tots els fitxers que llegeix una etapa."""
+    stage = STAGES[name]
+    files = [BASE_DIR / f for f in code_files(name)]
+    for pattern in stage["raw"]:
+        files.extend(sorted(RAW_DIR.glob(pattern)))
+    for dep in stage["deps"]:
+        for pattern in STAGES[dep]["outputs"]:
+            files.extend(sorted(BASE_DIR.glob(pattern)))
+    return files
+
+
+def stage_fingerprint(name: str) -> dict[str, str]:
+    """Empremta d'una etapa: {ruta relativa: hash} de codi i entrades."""
+    fingerprint = {}
+    for path in stage_inputs(name):
+        key = path.relative_to(BASE_DIR).as_posix()
+        fingerprint[key] = file_hash(path) if path.exists() else "missing"
+    return fingerprint
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_state(state: dict) -> None:
+    PROCESSED_DIR.mkdir(exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def is_up_to_date(name: str, fingerprint: dict, state: dict) -> bool:
+    if state.get(name) != fingerprint:
+        return False
+    return all(any(BASE_DIR.glob(pattern)) for pattern in STAGES[name]["outputs"])
+
+
+def stage_argv(name: str, workers: int = 1, append: bool = False,
+               leagues=None, seasons=None) -> list[str]:
+    """Arguments de línia d'ordres d'una etapa."""
+    stage = STAGES[name]
+    argv = []
+    if stage.get("parallel"):
+        argv += ["--workers", str(workers)]
+    if append and stage.get("append"):
+        argv += ["--append"]
+    if leagues:
+        argv += ["--leagues", *leagues]
+    if seasons:
+        argv += ["--seasons", *map(str, seasons)]
+    return argv
+
+
+def run_stage(name: str, workers: int = 1, append: bool = False, profile: bool = False,
+              leagues=None, seasons=None) -> None:
+    cmd = [sys.executable, STAGES[name]["script"],
+           *stage_argv(name, workers, append, leagues, seasons)]
+    env = {**os.environ, PROFILE_ENV: "1"} if profile else None
+    subprocess.run(cmd, cwd=BASE_DIR, check=True, env=env)
+
+
+def run_stage_in_process(name: str, shared: dict, workers: int = 1, append: bool = False,
+                         leagues=None, seasons=None):
+    """
+    Executa main() de l'etapa dins d'aquest procés. `shared` conté el
+    resultat de les etapes anteriors ({etapa: {lliga: taula}}, o la
+    dimensió d'equips), de manera que les deps no es tornen a llegir
+    dels CSV. Els CSV s'escriuen igualment com a artefactes finals.
+    """
+    module = importlib.import_module(Path(STAGES[name]["script"]).stem)
+    return module.main(stage_argv(name, workers, append, leagues, seasons), shared=shared)
+
+
+def check_budget(name: str) -> str | None:
+    """Retorna un avís si l'última execució de l'etapa ha superat budget_s."""
+    manifest_path = BASE_DIR / MANIFEST_FILE
+    budget = STAGES[name].get("budget_s")
+    if budget is None or not manifest_path.exists():
+        return None
+    entry = json.loads(manifest_path.read_text(encoding="utf-8"))["stages"].get(name)
+    if entry and entry["wall_s"] > budget:
+        return f"⚠️  {name}: {entry['wall_s']:.1f}s supera el pressupost de {budget}s"
+    return None
+
+
+# ------------------------------------------------------------
+# EXECUCIÓ
+# ------------------------------------------------------------
+
+def run_pipeline(targets=None, force=False, dry_run=False, workers=1, append=False,
+                 profile=False, strict_budget=False, leagues=None, seasons=None,
+                 in_process=False, shared=None) -> list[str]:
+    """
+    Executa les etapes en ordre topològic i salta les que tenen
+    la mateixa empremta que l'última execució correcta.
+
+    Amb leagues / seasons les etapes només processen aquelles
+    particions; com que l'empremta cobreix totes les dades, aquestes
+    execucions parcials no actualitzen l'estat del pipeline.
+
+    Amb in_process les etapes s'executen dins d'aquest procés i es
+    passen les taules en memòria (les etapes omeses es llegeixen del
+    CSV); `shared` permet conservar-les entre crides (mode --watch).
+    Retorna la llista d'etapes executades.
+    """
+    partial = bool(leagues or seasons)
+    order = topological_order(STAGES)
+    if targets:
+        unknown = set(targets) - set(STAGES)
+        if unknown:
+            raise ValueError(f"❌ Etapes desconegudes: {sorted(unknown)}")
+        selected = dependents(STAGES, set(targets))
+        order = [name for name in order if name in selected]
+
+    state = load_state()
+    executed = []
+    shared = {} if shared is None else shared
+
+    if in_process:
+        # Els scripts fan servir rutes relatives a data-prep/
+        os.chdir(BASE_DIR)
+        if profile:
+            os.environ[PROFILE_ENV] = "1"
+
+    for name in order:
+        # L'empremta es calcula just abans d'executar: les sortides de
+        # les deps ja estan actualitzades en aquest punt.
+        fingerprint = stage_fingerprint(name)
+
+        # En simulació les sortides de les deps no canvien: una etapa que
+        # depèn d'una que s'executaria també s'executaria
+        would_run_dep = dry_run and set(STAGES[name]["deps"]) & set(executed)
+
+        if (not force and not partial and not would_run_dep
+                and is_up_to_date(name, fingerprint, state)):
+            print(f"⏭️  {name}: sense canvis, s'omet")
+            continue
+
+        if dry_run:
+            reason = f" (depèn de {', '.join(sorted(would_run_dep))})" if would_run_dep else ""
+            print(f"▶️  {name}: s'executaria{reason}")
+            executed.append(name)
+            continue
+
+        print(f"▶️  {name}: executant {STAGES[name]['script']} ...")
+        if in_process:
+            shared[name] = run_stage_in_process(name, shared, workers=workers, append=append,
+                                                leagues=leagues, seasons=seasons)
+        else:
+            run_stage(name, workers=workers, append=append, profile=profile,
+                      leagues=leagues, seasons=seasons)
+
+        warning = check_budget(name)
+        if warning:
+            print(warning)
+            if strict_budget:
+                raise RuntimeError(warning)
+
+        if not partial:
+            state[name] = fingerprint
+            save_state(state)
+        executed.append(name)
+
+    return executed
+
+
+# ------------------------------------------------------------
+# MODE --watch
+# ------------------------------------------------------------
+
+def watch_snapshot() -> dict[str, tuple[int, int]]:
+    """
+    {fitxer: (mtime_ns, mida)} de tots els CSV de data_raw/ (ruta
+    relativa a data_raw/) i del codi de les etapes (relatiu a data-prep/).
+    """
+    snapshot = {}
+    for path in RAW_DIR.glob("*/*/*.csv"):
+        stat = path.stat()
+        snapshot[path.relative_to(RAW_DIR).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    for f in {f for name in STAGES for f in code_files(name)}:
+        path = BASE_DIR / f
+        if path.exists():
+            stat = path.stat()
+            snapshot[f] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def changed_files(before: dict, after: dict) -> set[str]:
+    """Fitxers nous, modificats o esborrats entre dues instantànies."""
+    return {f for f in before.keys() | after.keys() if before.get(f) != after.get(f)}
+
+
+def stages_for_files(files) -> set[str]:
+    """Etapes que llegeixen directament algun dels fitxers (patrons raw) o en fan servir el codi."""
+    return {
+        name
+        for name, stage in STAGES.items()
+        for f in files
+        if f in code_files(name) or any(PurePosixPath(f).match(pattern) for pattern in stage["raw"])
+    }
+
+
+def reload_modules(files) -> list[str]:
+    """
+    Torna a carregar els mòduls ja importats dels fitxers `files` i els
+    que n'importen noms, directament o indirectament (un `from teams
+    import TeamDimension` es quedaria amb la classe antiga), amb les
+    dependències abans. Retorna els mòduls recarregats, en ordre.
+    """
+    loaded = {
+        name: module for name, module in list(sys.modules.items())
+        if name not in ("__main__", __name__)
+        and getattr(module, "__file__", None)
+        and Path(module.__file__).resolve().parent == BASE_DIR
+    }
+    imports = {name: local_imports(Path(module.__file__)) & loaded.keys()
+               for name, module in loaded.items()}
+
+    stale = {Path(f).stem for f in files} & loaded.keys()
+    while True:
+        importers = {name for name, deps in imports.items() if deps & stale} - stale
+        if not importers:
+            break
+        stale |= importers
+
+    order = topological_order({name: {"deps": sorted(imports[name] & stale)} for name in sorted(stale)})
+    for name in order:
+        importlib.reload(loaded[name])
+    if "fbref_io" in stale:
+        # La recàrrega buida la memòria cau del mòdul
+        loaded["fbref_io"].enable_memory_cache()
+    return order
+
+
+def wait_for_changes(snapshot: dict, interval: float, debounce: float) -> tuple[set[str], dict]:
+    """
+    Espera canvis a data_raw/ o al codi i agrupa les ràfegues: torna quan fa
+    `debounce` segons que no n'apareix cap de nou.
+    """
+    pending = set()
+    quiet_since = None
+    while True:
+        time.sleep(interval)
+        current = watch_snapshot()
+        changed = changed_files(snapshot, current)
+        if changed:
+            pending |= changed
+            snapshot = current
+            quiet_since = time.monotonic()
+        elif pending and time.monotonic() - quiet_since >= debounce:
+            return pending, snapshot
+
+
+def watch(interval: float = 1.0, debounce: float = 2.0, **options) -> None:
+    """
+    Execució contínua: reconstrueix dins d'aquest procés les etapes
+    afectades per cada canvi de data_raw/ o del seu codi (i les que en
+    depenen). El codi canviat es torna a carregar abans de reconstruir.
+    Les taules publicades i les taules FBref parsejades es mantenen en
+    memòria entre reconstruccions.
+    """
+    enable_memory_cache()
+    shared = {}
+
+    # Posar-se al dia abans de començar a vigilar
+    run_pipeline(in_process=True, shared=shared, **options)
+    snapshot = watch_snapshot()
+    print(f"\n👀 Vigilant {RAW_DIR.relative_to(BASE_DIR)}/ i el codi (Ctrl+C per sortir) ...")
+
+    try:
+        while True:
+            files, snapshot = wait_for_changes(snapshot, interval, debounce)
+            roots = stages_for_files(files)
+            print(f"\n🔔 {len(files)} fitxers canviats: {sorted(files)}")
+            if not roots:
+                continue
+
+            start = time.perf_counter()
+            try:
+                reloaded = reload_modules(files)
+                if reloaded:
+                    print(f"🔄 Mòduls recarregats: {reloaded}")
+                executed = run_pipeline(sorted(roots), in_process=True, shared=shared, **options)
+            except Exception as e:
+                # Un fitxer a mig descarregar o invàlid no atura la vigilància
+                print(f"❌ Reconstrucció fallida: {e}")
+                continue
+            print(f"✅ {len(executed)} etapes reconstruïdes en {time.perf_counter() - start:.1f}s: "
+                  f"{executed}")
+            print(f"👀 Vigilant {RAW_DIR.relative_to(BASE_DIR)}/ i el codi ...")
+    except KeyboardInterrupt:
+        print("\n👋 Fi de la vigilància")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline incremental de data-prep")
+    parser.add_argument("stages", nargs="*", help="etapes a executar (i les que en depenen)")
+    parser.add_argument("--force", action="store_true", help="ignora l'estat i ho executa tot")
+    parser.add_argument("--dry-run", action="store_true", help="no executa res, només informa")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos per temporades a les etapes paral·lelitzables")
+    parser.add_argument("--append", action="store_true",
+                        help="ingesta incremental a les etapes que la suporten")
+    parser.add_argument("--profile", action="store_true",
+                        help="desa un perfil cProfile per etapa a profiles/")
+    parser.add_argument("--strict-budget", action="store_true",
+                        help="falla si una etapa supera el seu budget_s")
+    parser.add_argument("--in-process", action="store_true",
+                        help="executa les etapes en aquest procés i passa les taules en memòria")
+    parser.add_argument("--watch", action="store_true",
+                        help="vigila data_raw/ i el codi i reconstrueix les etapes afectades "
+                             "(implica --in-process)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="segons entre comprovacions de data_raw/ i del codi en mode --watch")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="segons sense canvis nous abans de reconstruir en mode --watch")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        watch(
+            args.interval, args.debounce,
+            workers=args.workers, append=args.append, profile=args.profile,
+            strict_budget=args.strict_budget, leagues=args.leagues, seasons=args.seasons,
+        )
+        return
+
+    executed = run_pipeline(
+        args.stages, force=args.force, dry_run=args.dry_run,
+        workers=args.workers, append=args.append,
+        profile=args.profile, strict_budget=args.strict_budget,
+        leagues=args.leagues, seasons=args.seasons, in_process=args.in_process,
+    )
+    print(f"\n✅ Pipeline complet ({len(executed)} etapes executades)")
+
+
+if __name__ == "__main__":
+    main()
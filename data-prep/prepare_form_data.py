@@ -0,0 +1,162 @@
+# --------------------------------------------------------------
+#   FORMA — MÈTRIQUES DE LES ÚLTIMES k JORNADES
+# --------------------------------------------------------------
+#
+#   Per a cada equip, temporada i jornada, i per a cada finestra k,
+#   els totals dels últims k partits (per ordre de jornada, com la
+#   secció 3): partits, punts, gols i xG a favor i en contra i
+#   finishing (gols - xG a favor). Taula en format llarg, una fila per
+#   (equip, temporada, jornada, finestra):
+#
+#       team_id, team, season, matchday, window, matches, points, ...
+#
+#   Les files per equip i partit surten del mateix motor que la
+#   secció 3 (matches_to_team_rows). Totes les finestres es calculen
+#   d'una passada amb diferències d'acumulats: amb C la suma acumulada
+#   de la lliga sencera i `start` la primera fila de l'equip-temporada,
+#
+#       finestra(i, k) = C[i] - C[max(start, i - k)]
+#
+#   O(files x finestres), sense rolling().apply per grup.
+#
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dtypes import compact, concat_compact
+from instrumentation import instrument
+from layout import add_partition_args, by_league, discover, save_league_table, select_seasons
+from prepare_section3_data import matches_to_team_rows, read_matches
+from teams import shared_teams
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+OUTPUT_NAME = "form_rolling.csv"
+
+DEFAULT_WINDOWS = [3, 5, 10]
+
+# Mètriques per partit que se sumen a cada finestra
+FORM_METRICS = ["points", "goals_for", "goals_against", "xg_for", "xg_against"]
+
+FORM_COLS = [
+    "team_id",
+    "team",
+    "season",
+    "matchday",
+    "window",
+    "matches",
+    *FORM_METRICS,
+    "finishing",
+]
+
+# L'xG de FBref té un decimal: s'arrodoneix el soroll de restar acumulats
+XG_DECIMALS = 3
+
+
+# ------------------------------------------------------------
+# PROCESSAMENT
+# ------------------------------------------------------------
+
+def rolling_form(team_rows: pd.DataFrame, windows: list[int]) -> pd.DataFrame:
+    """
+    Mètriques de forma de totes les finestres a partir de les files per
+    equip i partit (de qualsevol nombre de temporades).
+
+    Les files s'ordenen per temporada, equip i jornada perquè cada
+    equip-temporada sigui un bloc contigu; llavors una única suma
+    acumulada serveix per a tots els blocs i totes les finestres. A les
+    primeres jornades la finestra només té els partits jugats
+    (`matches` < k).
+    """
+    rows = team_rows.sort_values(["season", "team", "team_id", "matchday"], kind="stable")
+    rows = rows.reset_index(drop=True)
+
+    n = len(rows)
+    position = np.arange(n)
+    # Primera fila del bloc (season, team_id) de cada fila
+    new_block = np.ones(n, dtype=bool)
+    new_block[1:] = (
+        (rows["season"].to_numpy()[1:] != rows["season"].to_numpy()[:-1])
+        | (rows["team_id"].to_numpy()[1:] != rows["team_id"].to_numpy()[:-1])
+    )
+    start = np.maximum.accumulate(np.where(new_block, position, 0))
+
+    # C[i] = suma de les files 0..i-1 (amb una fila de zeros al davant)
+    values = rows[FORM_METRICS].to_numpy(dtype="float64")
+    cum = np.vstack([np.zeros((1, len(FORM_METRICS))), np.cumsum(values, axis=0)])
+
+    windows = np.asarray(sorted(windows))
+    # lo[i, w] = primera fila de la finestra w que acaba a la fila i
+    lo = np.maximum(start[:, None], position[:, None] + 1 - windows[None, :])
+    sums = cum[position + 1][:, None, :] - cum[lo]
+
+    # Una fila per (fila, finestra), en aquest ordre
+    k = len(windows)
+    form = pd.DataFrame(sums.reshape(n * k, len(FORM_METRICS)), columns=FORM_METRICS)
+    form["points"] = form["points"].round().astype("int64")
+    form["goals_for"] = form["goals_for"].round().astype("int64")
+    form["goals_against"] = form["goals_against"].round().astype("int64")
+    form[["xg_for", "xg_against"]] = form[["xg_for", "xg_against"]].round(XG_DECIMALS)
+    form["finishing"] = (form["goals_for"] - form["xg_for"]).round(XG_DECIMALS)
+
+    keys = rows[["team_id", "team", "season", "matchday"]].iloc[np.repeat(position, k)]
+    form = pd.concat([keys.reset_index(drop=True), form], axis=1)
+    form["window"] = np.tile(windows, n)
+    form["matches"] = (position[:, None] + 1 - lo).ravel()
+
+    return compact(form[FORM_COLS])
+
+
+def season_rows(partitions, teams, run=None) -> pd.DataFrame:
+    """
+    Files per equip i partit jugat de les temporades d'una lliga. Amb
+    `run`, cada calendari es registra com a entrada amb els partits jugats.
+    """
+    frames = []
+    for p in partitions:
+        matches = read_matches(p.raw("matches"))
+        if run is not None:
+            run.input(p.raw("matches"), rows=len(matches))
+        frames.append(matches_to_team_rows(matches, p.season, teams, p.league))
+    return concat_compact(frames, ignore_index=True)
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """Retorna {lliga: taula publicada} per a les etapes següents."""
+    parser = argparse.ArgumentParser(description="Forma — mètriques de les últimes k jornades")
+    parser.add_argument("--windows", type=int, nargs="+", default=DEFAULT_WINDOWS,
+                        help="mides de finestra (partits) a calcular")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    if any(k < 1 for k in args.windows):
+        parser.error("--windows ha de ser un o més enters positius")
+    windows = sorted(set(args.windows))
+
+    tables = {}
+    with instrument("form") as run:
+        teams = shared_teams(shared)
+        print("📥 Buscant calendaris FBref a ./data_raw ...")
+
+        partitions = discover(["matches"], args.leagues, args.seasons)
+
+        for league, league_partitions in by_league(partitions).items():
+            print(f"\n📈 {league}: forma amb finestres {windows} ...")
+            rows = season_rows(league_partitions, teams, run)
+
+            form = rolling_form(rows, windows)
+            run.memory(f"{league}/{OUTPUT_NAME}", form)
+            form = save_league_table(OUTPUT_NAME, league, form, args.seasons, run)
+            tables[league] = select_seasons(form, args.seasons)
+
+            print(f"✅ {league}/{OUTPUT_NAME} creat correctament ({len(form)} files)")
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
@@ -2,64 +2,74 @@
 #   SECCIÓ 1 — OVERVIEW
 # --------------------------------------------------------------
 
-from pathlib import Path
+import argparse
 import pandas as pd
 
-seasons = {
-    "2020-21": "laliga_2020_standard.csv",
-    "2021-22": "laliga_2021_standard.csv",
-    "2022-23": "laliga_2022_standard.csv",
-    "2023-24": "laliga_2023_standard.csv",
-    "2024-25": "laliga_2024_standard.csv"
-}
+from dtypes import compact, concat_compact
+from fbref_io import read_fbref_csv
+from instrumentation import instrument
+from layout import add_partition_args, by_league, discover, save_league_table, select_seasons
+from teams import shared_teams
 
-RAW_DIR = Path("data_raw")
-PROCESSED_DIR = Path("data_processed")
-PROCESSED_DIR.mkdir(exist_ok=True)
-WEB_DATA_DIR = Path("../datastory/data")
-WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_NAME = "section1_overview.csv"
 
+# Úniques columnes del fitxer standard que fa servir aquesta secció
+COLUMNS = ["Expected_xG", "Expected_npxG", "Playing Time_MP", "Performance_Gls"]
 
-def extract_team_from_url(url):
-    if not isinstance(url, str):
-        return None
-    name = url.split("/")[-1]
-    return name.replace("-Stats", "").replace("-", " ")
 
-all_data = []
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """
+    Retorna {lliga: taula publicada} (les temporades processades) per
+    compartir-la amb les etapes següents (pipeline.py --in-process).
+    """
+    parser = argparse.ArgumentParser(description="Secció 1 — overview")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
 
-for season, file in seasons.items():
-    print(f"Processant temporada {season}...")
+    tables = {}
+    with instrument("section1") as run:
+        teams = shared_teams(shared)
+        partitions = discover(["standard"], args.leagues, args.seasons)
 
-    df = pd.read_csv(RAW_DIR / file, header=[0, 1])
+        for league, league_partitions in by_league(partitions).items():
+            all_data = []
 
-    # Aplanar columnes
-    df.columns = [f"{a}_{b}".strip("_") for a, b in df.columns]
+            for p in league_partitions:
+                print(f"Processant temporada {p}...")
+                season = p.season
 
-    # Normalitzar url
-    df = df.rename(columns={"url_Unnamed: 31_level_1": "url"})
+                # Columnes aplanades i team derivat (des de la cau si és vàlida)
+                df = read_fbref_csv(p.raw("standard"), columns=COLUMNS)
+                df["season"] = season
+                run.input(p.raw("standard"), rows=len(df))
 
-    # Crear team
-    df["team"] = df["url"].apply(extract_team_from_url)
-    df["season"] = season
+                # Columnes clau (equip resolt per squad_id a la dimensió d'equips)
+                team_id = teams.ids_from_squads(df["squad_id"])
+                df_section = pd.DataFrame({
+                    "team_id": team_id,
+                    "team": teams.names(team_id),
+                    "season": season,
+                    "xGPerGame": df["Expected_xG"] / df["Playing Time_MP"],
+                    "xGAPerGame": df["Expected_npxG"] / df["Playing Time_MP"],
+                    "goals": df["Performance_Gls"]
+                })
 
-    # Columnes clau
-    df_section = pd.DataFrame({
-        "team": df["team"],
-        "season": season,
-        "xGPerGame": df["Expected_xG"] / df["Playing Time_MP"],
-        "xGAPerGame": df["Expected_npxG"] / df["Playing Time_MP"],
-        "goals": df["Performance_Gls"]
-    })
+                df_section["xGPerGame"] = df_section["xGPerGame"].round(2)
+                df_section["xGAPerGame"] = df_section["xGAPerGame"].round(2)
 
-    df_section["xGPerGame"] = df_section["xGPerGame"].round(2)
-    df_section["xGAPerGame"] = df_section["xGAPerGame"].round(2)
+                all_data.append(compact(df_section))
 
-    all_data.append(df_section)
+            final_df = concat_compact(all_data, ignore_index=True)
+            run.memory(f"{league}/{OUTPUT_NAME}", final_df)
+            final_df = save_league_table(OUTPUT_NAME, league, final_df, args.seasons, run)
 
-final_df = pd.concat(all_data, ignore_index=True)
-final_df.to_csv(PROCESSED_DIR / "section1_overview.csv", index=False)
-final_df.to_csv(WEB_DATA_DIR / "section1_overview.csv", index=False)
+            tables[league] = select_seasons(final_df, args.seasons)
 
-print("✅ section1_overview.csv creat correctament")
-print(final_df.head())
\ No newline at end of file
+            print(f"✅ {league}/{OUTPUT_NAME} creat correctament")
+            print(final_df.head())
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
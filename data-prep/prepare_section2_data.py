@@ -2,65 +2,112 @@
 #   SECCIÓ 2 — EFICIÈNCIA (xG vs GOLS REALS)
 # --------------------------------------------------------------
 
+import argparse
 import pandas as pd
-from pathlib import Path
+
+from dtypes import compact, concat_compact
+from fbref_io import read_fbref_csv
+from instrumentation import instrument
+from layout import (
+    add_partition_args, by_league, discover, save_league_table, select_seasons, shared_table,
+)
+from teams import TeamDimension, shared_teams
 
 # ------------------------------------------------------------
 # PATHS
 # ------------------------------------------------------------
 
-BASE_PATH = Path("data_processed")
-
 SECTION1_NAME = "section1_overview.csv"
 SECTION2_NAME = "section2_efficiency.csv"
 
-INPUT_FILE = BASE_PATH / SECTION1_NAME
-OUTPUT_FILE = BASE_PATH / SECTION2_NAME
-
-MATCHES_PER_SEASON = 38  # A LaLiga són 38 partits
-
-WEB_DATA_DIR = Path("../datastory/data")
-WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-# ------------------------------------------------------------
-# CÀRREGA DE DADES
-# ------------------------------------------------------------
-
-print("📥 Llegint section1_overview.csv...")
-df = pd.read_csv(INPUT_FILE)
-
-# Comprovació mínima
-required_columns = {"team", "season", "xGPerGame", "goals"}
-missing = required_columns - set(df.columns)
-
-if missing:
-    raise ValueError(f"❌ Falten columnes necessàries: {missing}")
-
-# ------------------------------------------------------------
-# TRANSFORMACIÓ
-# ------------------------------------------------------------
-
-print("🔧 Calculant xG totals...")
-
-df_section2 = (
-    df[["team", "season", "xGPerGame", "goals"]]
-    .assign(
-        xG=lambda x: (x["xGPerGame"] * MATCHES_PER_SEASON).round(1)
-    )
-    .drop(columns=["xGPerGame"])
-    .sort_values(["season", "team"])
-    .reset_index(drop=True)
-)
-
-# Reordenar columnes
-df_section2 = df_section2[["team", "season", "xG", "goals"]]
-
-# ------------------------------------------------------------
-# GUARDAR CSV
-# ------------------------------------------------------------
-
-df_section2.to_csv(OUTPUT_FILE, index=False)
-df_section2.to_csv(WEB_DATA_DIR / SECTION2_NAME, index=False)
 
-print("✅ section2_efficiency.csv creat correctament")
-print(df_section2.head())
+def season_xg(partitions, teams: TeamDimension) -> pd.DataFrame:
+    """
+    xG total per equip i temporada (Expected_xG del fitxer standard),
+    sense arrodonir. Abans es reconstruïa com a xGPerGame * partits a
+    partir del valor de la secció 1, ja arrodonit a dos decimals.
+    """
+    frames = []
+    for p in partitions:
+        df = read_fbref_csv(p.raw("standard"), columns=["Expected_xG"])
+        frames.append(compact(pd.DataFrame({
+            "team_id": teams.ids_from_squads(df["squad_id"]),
+            "season": p.season,
+            "xG_total": df["Expected_xG"],
+        })))
+    return concat_compact(frames, ignore_index=True)
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """
+    Retorna {lliga: taula publicada}. Amb `shared` (pipeline.py
+    --in-process) la taula de la secció 1 es pren de memòria.
+    """
+    parser = argparse.ArgumentParser(description="Secció 2 — eficiència")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    tables = {}
+    with instrument("section2") as run:
+        teams = shared_teams(shared)
+        partitions = discover(["standard"], args.leagues, args.seasons)
+
+        for league, league_partitions in by_league(partitions).items():
+            # ------------------------------------------------------------
+            # CÀRREGA DE DADES
+            # ------------------------------------------------------------
+
+            print(f"📥 Llegint {league}/{SECTION1_NAME}...")
+            df = shared_table(shared, "section1", SECTION1_NAME, league, args.seasons, run)
+
+            # Comprovació mínima
+            required_columns = {"team_id", "team", "season", "goals"}
+            missing = required_columns - set(df.columns)
+
+            if missing:
+                raise ValueError(f"❌ Falten columnes necessàries: {missing}")
+
+            totals = season_xg(league_partitions, teams)
+            for p in league_partitions:
+                run.input(p.raw("standard"))
+
+            # ------------------------------------------------------------
+            # TRANSFORMACIÓ
+            # ------------------------------------------------------------
+
+            print("🔧 Calculant xG totals...")
+
+            df = df.merge(totals, on=["team_id", "season"], how="left", validate="1:1")
+            if df["xG_total"].isna().any():
+                unmatched = df.loc[df["xG_total"].isna(), ["season", "team"]].values.tolist()
+                raise ValueError(f"❌ Equips sense xG a {league}: {unmatched}")
+
+            df_section2 = (
+                df[["team_id", "team", "season", "goals", "xG_total"]]
+                .assign(
+                    xG=lambda x: x["xG_total"].round(1)
+                )
+                .drop(columns=["xG_total"])
+                .sort_values(["season", "team"])
+                .reset_index(drop=True)
+            )
+
+            # Reordenar columnes
+            df_section2 = compact(df_section2[["team_id", "team", "season", "xG", "goals"]])
+            run.memory(f"{league}/{SECTION2_NAME}", df_section2)
+
+            # ------------------------------------------------------------
+            # GUARDAR CSV
+            # ------------------------------------------------------------
+
+            df_section2 = save_league_table(SECTION2_NAME, league, df_section2, args.seasons, run)
+            tables[league] = select_seasons(df_section2, args.seasons)
+
+            print(f"✅ {league}/{SECTION2_NAME} creat correctament")
+            print(df_section2.head())
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
@@ -2,137 +2,550 @@
 #   SECCIÓ 3 — EVOLUCIÓ TEMPORAL (Connected Scatterplot)
 # --------------------------------------------------------------
 
+import argparse
+import json
+import shutil
+from functools import partial
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dtypes import as_float64, compact, concat_compact, read_compact_csv
+from fbref_io import file_hash
+from instrumentation import instrument
+from layout import (
+    Partition, add_partition_args, by_league, discover, league_path, league_targets,
+    save_league_table, select_seasons,
+)
+from parallel import map_seasons
+from publish import publish_file
+from teams import TeamDimension, shared_teams
 
 # ------------------------------------------------------------
 # PATHS
 # ------------------------------------------------------------
 
-RAW_DATA_PATH = Path("data_raw")
-OUTPUT_PATH = Path("data_processed")
-OUTPUT_PATH.mkdir(exist_ok=True)
-
-OUTPUT_FILE = OUTPUT_PATH / "section3_evolution.csv"
-
-WEB_DATA_DIR = Path("../datastory/data")
-WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_NAME = "section3_evolution.csv"
+
+# Partits ja integrats per temporada (per al mode --append), un per lliga
+STATE_NAME = ".section3_state.json"
+
+# Partits per bloc en el mode --stream
+DEFAULT_CHUNKSIZE = 10_000
+
+REQUIRED_COLS = {
+    "week",
+    "home_team",
+    "away_team",
+    "score",
+    "home_xg",
+    "away_xg",
+}
+
+EVOLUTION_COLS = [
+    "team_id",
+    "team",
+    "season",
+    "matchday",
+    "points_cum",
+    "goal_diff_cum",
+    "xg_diff_cum",
+]
+
+CUM_COLS = {
+    "points": "points_cum",
+    "goal_diff": "goal_diff_cum",
+    "xg_diff": "xg_diff_cum",
+}
 
 # ------------------------------------------------------------
 # UTILITATS
 # ------------------------------------------------------------
 
-def parse_score(score):
-    """Converteix '2–1' → (2,1)"""
-    if pd.isna(score):
-        return None, None
-    home, away = score.replace("–", "-").split("-")
-    return int(home), int(away)
+SCORE_PATTERN = r"^\s*(\d+)\s*[–-]\s*(\d+)\s*$"
+
+
+def parse_scores(scores: pd.Series) -> pd.DataFrame:
+    """
+    Converteix la columna score ('2–1') en dues columnes numèriques
+    home_goals / away_goals. Els partits sense resultat queden a NaN.
+    """
+    goals = scores.astype(str).str.extract(SCORE_PATTERN)
+    goals.columns = ["home_goals", "away_goals"]
+    return goals.apply(pd.to_numeric)
+
+
+def points_from_goals(goals_for: pd.Series, goals_against: pd.Series) -> pd.Series:
+    """3 punts per victòria, 1 per empat, 0 per derrota (o sense resultat)."""
+    points = np.where(
+        goals_for > goals_against, 3,
+        np.where(goals_for == goals_against, 1, 0)
+    )
+    return pd.Series(points, index=goals_for.index)
+
+
+def matches_to_team_rows(df: pd.DataFrame, season: str, teams: TeamDimension,
+                         league: str | None = None) -> pd.DataFrame:
+    """
+    Motor columnar: passa d'una fila per partit a dues files per partit
+    (perspectiva local i visitant) sense iterar fila a fila.
+    Els noms del calendari es resolen a team_id (i nom canònic) amb la
+    dimensió d'equips, dins de la lliga `league`. Les files queden intercalades (local, visitant)
+    en l'ordre del fitxer, amb la política de tipus compacta excepte els
+    floats, que es mantenen en float64 per acumular-los.
+    A més de les columnes que s'acumulen (CUM_COLS), cada fila porta
+    els gols i l'xG a favor i en contra del partit (etapa form).
+    """
+    goals = parse_scores(df["score"])
+    home_goals = goals["home_goals"]
+    away_goals = goals["away_goals"]
+    matchday = df["week"].astype(int)
+    home_id = teams.ids_from_names(df["home_team"], league)
+    away_id = teams.ids_from_names(df["away_team"], league)
+
+    home = pd.DataFrame({
+        "team_id": home_id,
+        "team": teams.names(home_id),
+        "season": season,
+        "matchday": matchday,
+        "points": points_from_goals(home_goals, away_goals),
+        "goal_diff": home_goals - away_goals,
+        "xg_diff": home_goals - df["home_xg"],
+        "goals_for": home_goals,
+        "goals_against": away_goals,
+        "xg_for": df["home_xg"],
+        "xg_against": df["away_xg"],
+    })
+
+    away = pd.DataFrame({
+        "team_id": away_id,
+        "team": teams.names(away_id),
+        "season": season,
+        "matchday": matchday,
+        "points": points_from_goals(away_goals, home_goals),
+        "goal_diff": away_goals - home_goals,
+        "xg_diff": away_goals - df["away_xg"],
+        "goals_for": away_goals,
+        "goals_against": home_goals,
+        "xg_for": df["away_xg"],
+        "xg_against": df["home_xg"],
+    })
+
+    # Intercalar: fila 2i = local, fila 2i+1 = visitant
+    positions = np.arange(len(df))
+    home.index = 2 * positions
+    away.index = 2 * positions + 1
+
+    return compact(pd.concat([home, away]).sort_index().reset_index(drop=True), floats=False)
+
 
 # ------------------------------------------------------------
 # PROCESSAMENT
 # ------------------------------------------------------------
 
-all_seasons_data = []
+def grouped_cumsum(values: np.ndarray, groups: np.ndarray,
+                   start: np.ndarray | None = None) -> np.ndarray:
+    """
+    Suma acumulada de `values` per blocs contigus de `groups`, en
+    l'ordre de les files. Els NaN no sumen i queden NaN, com amb
+    groupby().cumsum().
+
+    La suma és seqüencial i sense compensació (groupby().cumsum() en fa
+    servir), de manera que continuar-la en un altre bloc de dades dona
+    exactament el mateix resultat: `start` (un valor per fila, només
+    compta el de la primera fila de cada bloc; NaN = cap) és l'acumulat
+    previ del bloc.
+    """
+    values = np.asarray(values)
+    missing = pd.isna(values)
+    filled = np.where(missing, 0, values)
+    out = np.empty(len(filled), dtype=filled.dtype if start is None else "float64")
+    bounds = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1], True])
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if start is not None and not np.isnan(start[lo]):
+            out[lo:hi] = np.cumsum(np.r_[start[lo], filled[lo:hi]])[1:]
+        else:
+            out[lo:hi] = np.cumsum(filled[lo:hi])
+    if missing.any():
+        out = out.astype("float64")
+        out[missing] = np.nan
+    return out
+
+
+def played_matches(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    """Valida les columnes d'un calendari (o d'un bloc) i es queda amb els partits jugats."""
+    missing = REQUIRED_COLS - set(df.columns)
+    if missing:
+        raise ValueError(f"❌ Falten columnes a {file.name}: {missing}")
 
-print("📥 Buscant fitxers FBref a ./data_raw ...")
+    return df[df["score"].notna()].reset_index(drop=True)
 
-for file in sorted(RAW_DATA_PATH.glob("laliga_*_matches.csv")):
-    start_year = int(file.stem.split("_")[1])  # ex: 2024
-    season = f"{start_year}-{str(start_year + 1)[-2:]}"  # 2024-25
 
-    print(f"\n📅 Processant temporada {season} ...")
+def read_matches(file: Path) -> pd.DataFrame:
+    """Llegeix un calendari i es queda només amb els partits ja jugats."""
+    return played_matches(pd.read_csv(file), file)
 
-    df = pd.read_csv(file)
 
-    required_cols = {
-        "week",
-        "home_team",
-        "away_team",
-        "score",
-        "home_xg",
-        "away_xg",
-    }
+def accumulate(team_rows: pd.DataFrame, offsets: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Ordena per equip i jornada i calcula els acumulats.
 
-    missing = required_cols - set(df.columns)
-    if missing:
-        raise ValueError(f"❌ Falten columnes a {file.name}: {missing}")
+    offsets (indexat per team_id, amb les columnes *_cum) és l'últim
+    estat conegut de cada equip: s'hi afegeix com a
+    fila inicial perquè l'acumulat continuï des d'aquell punt. Només és
+    vàlid si les jornades de team_rows són posteriors a les ja
+    acumulades (ho comprova append_season); llavors el resultat
+    coincideix amb el recàlcul complet llevat d'arrodoniments de
+    l'últim decimal en els floats.
+    """
+    if offsets is not None:
+        names = team_rows.drop_duplicates("team_id").set_index("team_id")["team"]
+        known = names[names.index.isin(offsets.index)]
+        seeds = offsets.loc[known.index].rename(
+            columns={cum: col for col, cum in CUM_COLS.items()}
+        )
+        seeds = compact(as_float64(seeds).assign(
+            team_id=known.index.to_numpy(), team=known.astype(str).to_numpy(),
+            season=team_rows["season"].iloc[0], matchday=-1,
+        ), floats=False)
+        team_rows = concat_compact(
+            [seeds.assign(_seed=True), team_rows.assign(_seed=False)], ignore_index=True
+        )
 
-    # Parsejar score
-    df[["home_goals", "away_goals"]] = df["score"].apply(
-        lambda s: pd.Series(parse_score(s))
-    )
+    # Ordenar per nom canònic i acumular per team_id
+    season_df = team_rows.sort_values(["team", "matchday"])
 
-    rows = []
+    groups = season_df["team_id"].to_numpy()
+    for col, cum in CUM_COLS.items():
+        season_df[cum] = grouped_cumsum(season_df[col].to_numpy(), groups)
 
-    for _, r in df.iterrows():
-        matchday = int(r["week"])
+    if offsets is not None:
+        season_df = season_df[~season_df["_seed"]]
 
-        # --- HOME TEAM ---
-        home_points = (
-            3 if r["home_goals"] > r["away_goals"]
-            else 1 if r["home_goals"] == r["away_goals"]
-            else 0
-        )
+    return compact(season_df[EVOLUTION_COLS])
 
-        rows.append({
-            "team": r["home_team"],
-            "season": season,
-            "matchday": matchday,
-            "points": home_points,
-            "goal_diff": r["home_goals"] - r["away_goals"],
-            "xg_diff": r["home_goals"] - r["home_xg"],
-        })
-
-        # --- AWAY TEAM ---
-        away_points = (
-            3 if r["away_goals"] > r["home_goals"]
-            else 1 if r["away_goals"] == r["home_goals"]
-            else 0
-        )
 
-        rows.append({
-            "team": r["away_team"],
-            "season": season,
-            "matchday": matchday,
-            "points": away_points,
-            "goal_diff": r["away_goals"] - r["home_goals"],
-            "xg_diff": r["away_goals"] - r["away_xg"],
-        })
-
-    season_df = pd.DataFrame(rows)
-
-    # Ordenar i acumular
-    season_df = season_df.sort_values(["team", "matchday"])
-
-    season_df["points_cum"] = season_df.groupby("team")["points"].cumsum()
-    season_df["goal_diff_cum"] = season_df.groupby("team")["goal_diff"].cumsum()
-    season_df["xg_diff_cum"] = season_df.groupby("team")["xg_diff"].cumsum()
-
-    all_seasons_data.append(
-        season_df[[
-            "team",
-            "season",
-            "matchday",
-            "points_cum",
-            "goal_diff_cum",
-            "xg_diff_cum",
-        ]]
-    )
+def process_season(p: Partition, teams: TeamDimension) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Calcula l'evolució acumulada de tots els equips d'una temporada.
+    Retorna també els game_id integrats (per al mode --append).
+    """
+    df = read_matches(p.raw("matches"))
 
+    season_df = accumulate(matches_to_team_rows(df, p.season, teams, p.league))
 
-# ------------------------------------------------------------
-# GUARDAR RESULTAT FINAL
-# ------------------------------------------------------------
+    game_ids = df["game_id"].astype(str).tolist() if "game_id" in df.columns else []
+    return season_df, game_ids
+
+
+def append_season(p: Partition, existing: pd.DataFrame, ingested: set[str],
+                  teams: TeamDimension) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Estén l'evolució existent d'una temporada amb els partits nous
+    (game_id no integrats), partint de l'últim acumulat de cada equip.
+
+    Si algun partit nou és d'una jornada igual o anterior a l'última
+    integrada del seu equip (partit ajornat que arriba tard), els
+    acumulats de les jornades posteriors ja no valen: la temporada es
+    recalcula sencera, com en el mode per lots.
+    """
+    season = p.season
+    df = read_matches(p.raw("matches"))
+
+    if "game_id" not in df.columns:
+        raise ValueError(f"❌ {p.raw('matches')} no té game_id: no es pot fer --append")
+
+    new = df[~df["game_id"].astype(str).isin(ingested)]
+    game_ids = sorted(ingested | set(new["game_id"].astype(str)))
 
-final_df = pd.concat(all_seasons_data).reset_index(drop=True)
+    if new.empty:
+        return existing, game_ids
 
-final_df["team"] = final_df["team"].replace({
-    "Betis": "Real Betis"
-})
+    new_team_rows = matches_to_team_rows(new, season, teams, p.league)
+    last_matchday = existing.groupby("team_id", observed=True)["matchday"].max()
+    late = new_team_rows["matchday"] <= new_team_rows["team_id"].map(last_matchday)
+    if late.any():
+        print(f"   🔁 {p}: {int(late.sum())} files de jornades ja integrades "
+              f"(partits ajornats), es recalcula la temporada")
+        return accumulate(matches_to_team_rows(df, season, teams, p.league)), game_ids
 
-final_df.to_csv(OUTPUT_FILE, index=False)
-final_df.to_csv(WEB_DATA_DIR / "section3_evolution.csv", index=False)
+    last_state = existing.groupby("team_id").tail(1).set_index("team_id")[list(CUM_COLS.values())]
+    new_rows = accumulate(new_team_rows, offsets=last_state)
+
+    # Mantenir l'ordre dels equips existents (els nous van al final) i,
+    # dins de cada equip, l'ordre de jornada
+    team_order = {team_id: i for i, team_id in enumerate(pd.unique(existing["team_id"]))}
+    for team_id in pd.unique(new_rows["team_id"]):
+        team_order.setdefault(team_id, len(team_order))
+
+    combined = concat_compact([existing, new_rows], ignore_index=True)
+    combined = (
+        combined.assign(_order=combined["team_id"].map(team_order))
+        .sort_values(["_order", "matchday"], kind="stable")
+        .drop(columns="_order")
+    )
+
+    print(f"   ➕ {p}: {len(new)} partits nous")
+    return combined, game_ids
+
+
+# ------------------------------------------------------------
+# MODE --stream (memòria acotada)
+# ------------------------------------------------------------
 
-print("\n✅ section3_evolution.csv creat correctament")
-print(final_df.head())
\ No newline at end of file
+def stream_season(p: Partition, teams: TeamDimension, out, chunksize: int,
+                  spool: Path) -> tuple[int, list[str]]:
+    """
+    Llegeix el calendari d'una temporada per blocs de `chunksize`
+    partits i n'escriu les files d'evolució a `out`. En memòria només hi
+    ha el bloc actual i, per team_id, l'últim acumulat i l'última
+    jornada integrada.
+
+    Cada bloc continua l'acumulat de cada equip (grouped_cumsum, en
+    float64 i amb les mateixes sumes que el mode per lots) i les files s'aboquen a
+    un fitxer per equip dins de `spool`. Una fila d'una jornada igual o
+    anterior a l'última integrada del seu equip (partit ajornat) marca
+    l'equip: en acabar la temporada, el seu acumulat es recalcula amb el
+    motor per lots a partir de les mètriques de cada partit, també
+    guardades. Els equips s'escriuen un a un, per nom i jornada: la
+    sortida coincideix exactament amb la del mode per lots.
+    """
+    file = p.raw("matches")
+    cum_cols = list(CUM_COLS.values())
+    running = pd.DataFrame(columns=["matchday", *cum_cols], dtype="float64")
+    names = {}
+    late = set()
+    game_ids = []
+
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        chunk = played_matches(chunk, file)
+        if chunk.empty:
+            continue
+
+        team_rows = matches_to_team_rows(chunk, p.season, teams, p.league)
+        team_rows = team_rows[["team_id", "team", "season", "matchday", *CUM_COLS]]
+        team_rows = team_rows.sort_values(["team_id", "matchday"], kind="stable")
+
+        previous = running.reindex(team_rows["team_id"])
+        is_late = team_rows["matchday"].to_numpy() <= previous["matchday"].to_numpy()
+        late.update(team_rows.loc[is_late, "team_id"])
+
+        # Cada equip continua des del seu últim acumulat
+        groups = team_rows["team_id"].to_numpy()
+        for col, cum in CUM_COLS.items():
+            team_rows[cum] = grouped_cumsum(team_rows[col].to_numpy(), groups,
+                                            start=previous[cum].to_numpy())
+
+        last = team_rows.groupby("team_id", observed=True).tail(1).set_index("team_id")
+        running = last[["matchday", *cum_cols]].astype("float64").combine_first(running)
+
+        for team_id, rows in team_rows.groupby("team_id", sort=False, observed=True):
+            names[team_id] = str(rows["team"].iloc[0])
+            team_file = spool / f"{team_id}.csv"
+            rows.to_csv(team_file, mode="a", header=not team_file.exists(), index=False)
+
+        if "game_id" in chunk.columns:
+            game_ids.extend(chunk["game_id"].astype(str))
+
+    if late:
+        print(f"   🔁 {p}: {len(late)} equips amb partits ajornats, se'n recalcula l'acumulat")
+
+    total = 0
+    for team_id, _ in sorted(names.items(), key=lambda item: (item[1], item[0])):
+        team_file = spool / f"{team_id}.csv"
+        team_rows = pd.read_csv(team_file, dtype={"team": str, "season": str},
+                                float_precision="round_trip")
+        team_file.unlink()
+        team_rows = accumulate(team_rows) if team_id in late else compact(team_rows[EVOLUTION_COLS])
+        team_rows.to_csv(out, header=False, index=False)
+        total += len(team_rows)
+
+    return total, game_ids
+
+
+def split_seasons(path: Path, exclude: set[str], spool: Path, chunksize: int) -> dict[str, int]:
+    """
+    Reparteix en una sola lectura, per blocs i sense reinterpretar-les,
+    les files de `path` de les temporades que no són a `exclude`: un
+    fitxer {temporada}.csv per temporada dins de `spool`. Retorna les
+    files de cada temporada.
+    """
+    rows = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False):
+        for season, season_rows in chunk.groupby("season", sort=False):
+            if season in exclude:
+                continue
+            season_rows.to_csv(spool / f"{season}.csv", mode="a", header=False, index=False)
+            rows[season] = rows.get(season, 0) + len(season_rows)
+    return rows
+
+
+def run_stream(league: str, partitions: list[Partition], teams: TeamDimension,
+               chunksize: int, seasons, run) -> dict:
+    """
+    Reescriu section3_evolution.csv d'una lliga temporada a temporada
+    sense construir cap taula sencera en memòria. Amb --seasons, les
+    temporades no seleccionades es copien de la taula existent, que es
+    llegeix un sol cop.
+    """
+    path = league_path(league, OUTPUT_NAME)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    selected = {p.season: p for p in partitions}
+
+    state = {}
+    total = 0
+    tmp = path.with_name(f".{path.name}.stream")
+    with TemporaryDirectory(prefix="section3_stream_") as spool_dir:
+        spool = Path(spool_dir)
+        kept = {}
+        if seasons and path.exists():
+            kept = split_seasons(path, set(selected), spool, chunksize)
+
+        with open(tmp, "w", newline="", encoding="utf-8") as out:
+            out.write(",".join(EVOLUTION_COLS) + "\n")
+            for season in sorted(set(selected) | set(kept)):
+                if season in kept:
+                    with open(spool / f"{season}.csv", encoding="utf-8") as src:
+                        shutil.copyfileobj(src, out)
+                    total += kept[season]
+                    continue
+                p = selected[season]
+                rows, game_ids = stream_season(p, teams, out, chunksize, spool)
+                state[season] = {"sha256": file_hash(p.raw("matches")), "game_ids": game_ids}
+                total += rows
+
+    targets = league_targets(league, OUTPUT_NAME)
+    for target, written in zip(targets, publish_file(tmp, targets)):
+        run.output(target, rows=total if target == path else None, written=written)
+
+    print(f"   🌊 {league}: {total} files escrites per blocs de {chunksize} partits")
+    return state
+
+
+def load_state(league: str) -> dict:
+    state_file = league_path(league, STATE_NAME)
+    if state_file.exists():
+        return json.loads(state_file.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_state(league: str, state: dict) -> None:
+    state_file = league_path(league, STATE_NAME)
+    state_file.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def run_append(league: str, partitions: list[Partition],
+               teams: TeamDimension) -> tuple[list[pd.DataFrame], dict]:
+    """
+    Mode incremental: les temporades amb el fitxer sense canvis es
+    reaprofiten sense llegir-lo; la resta només integra els partits nous.
+    Les temporades sense estat previ es recalculen senceres.
+    """
+    state = load_state(league)
+    existing = read_compact_csv(league_path(league, OUTPUT_NAME))
+    blocks = {season: g for season, g in existing.groupby("season", sort=False, observed=True)}
+
+    results = []
+    new_state = {}
+
+    for p in partitions:
+        season = p.season
+        sha = file_hash(p.raw("matches"))
+        previous = state.get(season)
+
+        if previous is not None and season in blocks and previous["sha256"] == sha:
+            season_df, game_ids = blocks[season], previous["game_ids"]
+        elif previous is not None and season in blocks:
+            season_df, game_ids = append_season(p, blocks[season], set(previous["game_ids"]), teams)
+        else:
+            print(f"   🔁 {p}: sense estat previ, es recalcula sencera")
+            season_df, game_ids = process_season(p, teams)
+
+        results.append(season_df)
+        new_state[season] = {"sha256": sha, "game_ids": game_ids}
+
+    return results, new_state
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """
+    Retorna {lliga: taula publicada} per a les etapes següents; en mode
+    --stream la taula no es construeix en memòria i no s'hi inclou.
+    """
+    parser = argparse.ArgumentParser(description="Secció 3 — evolució temporal")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos per temporades (1 = seqüencial)")
+    parser.add_argument("--append", action="store_true",
+                        help="integra només els partits nous sobre section3_evolution.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="llegeix els calendaris per blocs i escriu les files a mesura "
+                             "(memòria acotada per equip, mateixa taula que per lots)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="partits per bloc en el mode --stream")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.stream and args.append:
+        parser.error("--stream i --append no es poden combinar")
+
+    tables = {}
+    with instrument("section3") as run:
+        teams = shared_teams(shared)
+        print("📥 Buscant calendaris FBref a ./data_raw ...")
+
+        partitions = discover(["matches"], args.leagues, args.seasons)
+
+        for league, league_partitions in by_league(partitions).items():
+            seasons = [p.season for p in league_partitions]
+
+            if args.stream:
+                print(f"\n📅 {league}: processant temporades {seasons} per blocs ...")
+                state = run_stream(league, league_partitions, teams,
+                                   args.chunksize, args.seasons, run)
+                for p in league_partitions:
+                    run.input(p.raw("matches"), rows=len(state[p.season]["game_ids"]))
+                if args.seasons:
+                    state = {**load_state(league), **state}
+                save_state(league, state)
+                print(f"\n✅ {league}/{OUTPUT_NAME} creat correctament")
+                continue
+
+            if args.append and league_path(league, OUTPUT_NAME).exists():
+                print(f"\n📅 {league}: integrant partits nous {seasons} ...")
+                all_seasons_data, state = run_append(league, league_partitions, teams)
+            else:
+                print(f"\n📅 {league}: processant temporades {seasons} ...")
+                jobs = {str(p): p for p in league_partitions}
+                results = map_seasons(partial(process_season, teams=teams), jobs, workers=args.workers)
+                all_seasons_data = [season_df for season_df, _ in results]
+                state = {
+                    p.season: {"sha256": file_hash(p.raw("matches")), "game_ids": game_ids}
+                    for p, (_, game_ids) in zip(league_partitions, results)
+                }
+
+            for p in league_partitions:
+                run.input(p.raw("matches"), rows=len(state[p.season]["game_ids"]))
+
+            # ------------------------------------------------------------
+            # GUARDAR RESULTAT FINAL
+            # ------------------------------------------------------------
+
+            final_df = concat_compact(all_seasons_data).reset_index(drop=True)
+            run.memory(f"{league}/{OUTPUT_NAME}", final_df)
+            final_df = save_league_table(OUTPUT_NAME, league, final_df, args.seasons, run)
+            tables[league] = select_seasons(final_df, args.seasons)
+
+            # Amb un subconjunt de temporades, es conserva l'estat de la resta
+            if args.seasons:
+                state = {**load_state(league), **state}
+            save_state(league, state)
+
+            print(f"\n✅ {league}/{OUTPUT_NAME} creat correctament")
+            print(final_df.head())
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
@@ -2,225 +2,283 @@
 #   SECCIÓ 4 — ESTILS DE JOC (Radar charts)
 # --------------------------------------------------------------
 
-from pathlib import Path
+import argparse
+from functools import partial
+
 import pandas as pd
-import re
+
+from dtypes import compact, concat_compact
+from fbref_io import FbrefSchema, join_topics, read_fbref_csv
+from instrumentation import instrument
+from layout import add_partition_args, by_league, discover, save_league_table, select_seasons
+from parallel import map_seasons
+from teams import TeamDimension, shared_teams
 
 # ------------------------------------------------------------
 # PATHS
 # ------------------------------------------------------------
-RAW_DIR = Path("data_raw")
-PROCESSED_DIR = Path("data_processed")
-PROCESSED_DIR.mkdir(exist_ok=True)
-
-WEB_DATA_DIR = Path("../datastory/data")
-WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-OUTPUT_FILE = PROCESSED_DIR / "section4_style.csv"
+OUTPUT_NAME = "section4_style.csv"
 
 TOPICS = ["standard", "passing", "possession", "defense", "shooting"]
 
+# Columnes lògiques que necessiten els radars. Es resolen contra les
+# capçaleres dels temes (en l'ordre de TOPICS) abans de llegir cap dada,
+# i després només es llegeixen aquestes.
+REQUIRED_COLUMNS = [
+    "Playing Time_90s",
+    "Poss",
+    "Per 90 Minutes_xG",
+    "Standard_Sh/90",
+    "Touches_Att Pen",
+    "PrgP",
+    "Tkl+Int",
+    "TklW",
+    "Blocks_Sh",
+    "Blocks_Pass",
+    "Int",
+    "Att 3rd",
+    "PrgC",
+    "Long_Cmp%",
+    "CrsPA",
+    "Touches_Touches",
+]
+
 
 # ------------------------------------------------------------
 # UTILITATS
 # ------------------------------------------------------------
-def season_label(y: int) -> str:
-    return f"{y}-{str(y + 1)[-2:]}"
-
-
-def parse_filename(path: Path):
-    m = re.match(r"laliga_(\d{4})_([a-zA-Z]+)\.csv$", path.name)
-    if not m:
-        return None, None
-    return int(m.group(1)), m.group(2).lower()
-
+def to_per90(series: pd.Series, minutes: pd.Series) -> pd.Series:
+    return series / minutes
 
-def read_fbref_csv(path: Path) -> pd.DataFrame:
-    """
-    Llegeix CSV FBref amb header multinivell parcial,
-    aplana columnes i conserva totes les dades reals.
-    """
-    df = pd.read_csv(path, header=[0, 1])
-
-    # Aplanar columnes (multinivell parcial inclòs)
-    df.columns = [f"{a}_{b}".strip("_").strip() for a, b in df.columns]
-
-    # Eliminar NOMÉS players_used (la resta de columnes són dades vàlides)
-    drop_cols = [c for c in df.columns if "players_used" in c.lower()]
-    df = df.drop(columns=drop_cols, errors="ignore")
-
-    # Trobar la columna url (pot tenir sufixos)
-    url_col = None
-    for c in df.columns:
-        if c.lower().startswith("url"):
-            url_col = c
-            break
-
-    if url_col is None:
-        raise ValueError(f"No s'ha trobat columna 'url' a {path.name}")
-
-    # Renombrar a 'url' per simplificar
-    df = df.rename(columns={url_col: "url"})
-
-    # Crear team
-    df["team"] = (
-        df["url"]
-        .astype(str)
-        .str.split("/")
-        .str[-1]
-        .str.replace("-Stats", "", regex=False)
-        .str.replace("-", " ", regex=False)
-        .str.strip()
-    )
 
-    return df
+def minmax_scaler(values: pd.DataFrame, seasons: pd.Series) -> pd.DataFrame:
+    """(x - min) / (max - min) per temporada; 0.5 si la columna és constant."""
+    stats = values.groupby(seasons, observed=True).agg(["min", "max"])
+    lo = stats.xs("min", axis=1, level=1).reindex(seasons).set_axis(values.index)
+    hi = stats.xs("max", axis=1, level=1).reindex(seasons).set_axis(values.index)
+    return ((values - lo) / (hi - lo)).mask(hi == lo, 0.5)
 
 
-def resolve_column(df: pd.DataFrame, target: str) -> str:
+def zscore_scaler(values: pd.DataFrame, seasons: pd.Series) -> pd.DataFrame:
     """
-    Retorna el nom real de la columna que coincideix amb target.
-    Prova diverses estratègies: exacta, prefix, sufix.
+    (x - mitjana) / desviació per temporada; 0 si la columna és constant
+    o la temporada només té un equip (desviació NaN).
     """
-    # 1. Intentar coincidència exacta
-    for c in df.columns:
-        if c.strip() == target:
-            return c
-
-    # 2. Intentar coincidència per prefix (ex: "Poss_Unnamed..." o "Tkl+Int_Unnamed...")
-    for c in df.columns:
-        if c.startswith(target + "_"):
-            return c
+    stats = values.groupby(seasons, observed=True).agg(["mean", "std"])
+    mean = stats.xs("mean", axis=1, level=1).reindex(seasons).set_axis(values.index)
+    std = stats.xs("std", axis=1, level=1).reindex(seasons).set_axis(values.index)
+    flat = (std == 0) | std.isna()
+    return ((values - mean) / std).mask(flat & values.notna(), 0.0)
 
-    # 3. Intentar coincidència per sufix (ex: "Progression_PrgP")
-    for c in df.columns:
-        if c.endswith("_" + target):
-            return c
 
-    raise ValueError(f"No s'ha trobat la columna '{target}'. Columnes disponibles: {df.columns.tolist()}")
+def percentile_scaler(values: pd.DataFrame, seasons: pd.Series) -> pd.DataFrame:
+    """Rang percentil (0–1] dins de la temporada; 0.5 si la columna és constant."""
+    ranks = values.groupby(seasons, observed=True).rank(pct=True)
+    spread = values.groupby(seasons, observed=True).transform("nunique")
+    return ranks.mask(spread == 1, 0.5)
 
 
-def to_per90(series: pd.Series, minutes: pd.Series) -> pd.Series:
-    return series / minutes
+# nom → (sufix de les columnes de sortida, funció)
+SCALERS = {
+    "minmax": ("_norm", minmax_scaler),
+    "zscore": ("_z", zscore_scaler),
+    "percentile": ("_pct", percentile_scaler),
+}
 
 
-def normalize_by_season(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    for c in cols:
-        df[c + "_norm"] = df.groupby("season")[c].transform(
-            lambda x: (x - x.min()) / (x.max() - x.min())
-            if x.max() != x.min() else 0.5
-        )
+def normalize_by_season(df: pd.DataFrame, cols: list[str],
+                        scalers: list[str] = ("minmax",)) -> pd.DataFrame:
+    """
+    Afegeix les columnes escalades per temporada de cada mètrica.
+    Cada escalador fa una sola agregació agrupada per a totes les
+    columnes alhora i en difon el resultat a cada fila.
+    """
+    values = df[cols]
+    for name in scalers:
+        suffix, scaler = SCALERS[name]
+        scaled = scaler(values, df["season"])
+        df[[c + suffix for c in cols]] = scaled[cols].to_numpy()
     return df
 
 
-# ------------------------------------------------------------
-# 1) DETECTAR FITXERS
-# ------------------------------------------------------------
-files = []
-for f in RAW_DIR.glob("laliga_*_*.csv"):
-    y, t = parse_filename(f)
-    if t in TOPICS:
-        files.append((y, t, f))
-
-by_season = {}
-for y, t, f in files:
-    by_season.setdefault(y, {})[t] = f
-
-print("📥 Temporades trobades:", sorted(by_season.keys()))
-
-# ------------------------------------------------------------
-# 2) MERGE PER TEMPORADA
-# ------------------------------------------------------------
-all_seasons = []
-
-for y in sorted(by_season):
-    base = read_fbref_csv(by_season[y]["standard"])
-    base["season"] = season_label(y)
-
-    merged = base
-
-    for topic in ["passing", "possession", "defense", "shooting"]:
-        tmp = read_fbref_csv(by_season[y][topic])
-        tmp["season"] = season_label(y)
-
-        # Eliminar url per evitar duplicats
-        tmp = tmp.drop(columns=["url"], errors="ignore")
-
-        merged = merged.merge(
-            tmp,
-            on=["season", "team"],
-            how="inner"
-        )
-
-    all_seasons.append(merged)
-
-df = pd.concat(all_seasons, ignore_index=True)
-print("✅ Taula integrada:", df.shape)
+def merge_season(job, teams: TeamDimension) -> tuple[pd.DataFrame, dict[str, int], dict[str, list]]:
+    """
+    Integra els cinc temes FBref d'una temporada en una sola taula
+    amb només les REQUIRED_COLUMNS (anomenades pel seu nom lògic).
 
-# ------------------------------------------------------------
-# 3) VARIABLES DELS RADARS
-# ------------------------------------------------------------
-out = df[["season", "team"]].copy()
-minutes = df[resolve_column(df, "Playing Time_90s")]
-
-# ========================
-# RADAR OFENSIU
-# ========================
-out["possession_pct"] = df[resolve_column(df, "Poss")]
-out["xg_per90"] = df[resolve_column(df, "Per 90 Minutes_xG")]
-out["shots_per90"] = df[resolve_column(df, "Standard_Sh/90")]
-out["touches_att_pen_area_per90"] = to_per90(
-    df[resolve_column(df, "Touches_Att Pen")], minutes
-)
-out["progressive_passes_per90"] = to_per90(
-    df[resolve_column(df, "PrgP")], minutes
-)
-
-# ========================
-# RADAR DEFENSIU
-# ========================
-out["tackles_interceptions_per90"] = to_per90(
-    df[resolve_column(df, "Tkl+Int")], minutes
-)
-out["tackles_won_per90"] = to_per90(
-    df[resolve_column(df, "TklW")], minutes
-)
-out["blocks_per90"] = to_per90(
-    df[resolve_column(df, "Blocks_Sh")] + df[resolve_column(df, "Blocks_Pass")],
-    minutes
-)
-out["interceptions_per90"] = to_per90(
-    df[resolve_column(df, "Int")], minutes
-)
-out["def_actions_att_third_per90"] = to_per90(
-    df[resolve_column(df, "Att 3rd")], minutes
-)
-
-# ========================
-# RADAR PROGRESSIÓ
-# ========================
-out["progressive_carries_per90"] = to_per90(
-    df[resolve_column(df, "PrgC")], minutes
-)
-out["long_pass_pct"] = df[resolve_column(df, "Long_Cmp%")]
-out["crosses_into_pen_area_per90"] = to_per90(
-    df[resolve_column(df, "CrsPA")], minutes
-)
-out["touches_per_possession"] = (
-        df[resolve_column(df, "Touches_Touches")] /
-        df[resolve_column(df, "Poss")]
-)
+    Cada tema s'indexa per (season, team_id) i s'uneixen tots de cop
+    (join_topics); els equips absents d'algun tema queden fora.
+    Retorna també les files llegides de cada tema i els equips que
+    falten a cada tema.
+    """
+    p, resolved = job
+
+    tables = {}
+    rows = {}
+
+    for topic in TOPICS:
+        columns = [col for t, col in resolved.values() if t == topic]
+        raw = read_fbref_csv(p.raw(topic), columns=columns)
+        rows[topic] = len(raw)
+
+        table = raw[columns].copy()
+        table.insert(0, "team_id", teams.ids_from_squads(raw["squad_id"]))
+        table.insert(0, "season", p.season)
+        tables[topic] = table
+
+    wide, missing = join_topics(tables, ["season", "team_id"])
+
+    merged = pd.DataFrame({
+        "season": wide["season"],
+        "team_id": wide["team_id"],
+        "team": teams.names(wide["team_id"]),
+        **{name: wide[f"{topic}/{col}"] for name, (topic, col) in resolved.items()},
+    })
+
+    missing = {
+        topic: teams.names(pd.Series([team_id for _, team_id in keys])).tolist()
+        for topic, keys in missing.items()
+    }
+
+    return compact(merged, floats=False), rows, missing
+
+
+def radar_variables(df: pd.DataFrame) -> pd.DataFrame:
+    """Variables dels tres radars a partir de la taula integrada."""
+    out = df[["season", "team_id", "team"]].copy()
+    minutes = df["Playing Time_90s"]
+
+    # ========================
+    # RADAR OFENSIU
+    # ========================
+    out["possession_pct"] = df["Poss"]
+    out["xg_per90"] = df["Per 90 Minutes_xG"]
+    out["shots_per90"] = df["Standard_Sh/90"]
+    out["touches_att_pen_area_per90"] = to_per90(
+        df["Touches_Att Pen"], minutes
+    )
+    out["progressive_passes_per90"] = to_per90(
+        df["PrgP"], minutes
+    )
 
-# ------------------------------------------------------------
-# 4) NORMALITZACIÓ
-# ------------------------------------------------------------
-value_cols = [c for c in out.columns if c not in ["season", "team"]]
-out = normalize_by_season(out, value_cols)
+    # ========================
+    # RADAR DEFENSIU
+    # ========================
+    out["tackles_interceptions_per90"] = to_per90(
+        df["Tkl+Int"], minutes
+    )
+    out["tackles_won_per90"] = to_per90(
+        df["TklW"], minutes
+    )
+    out["blocks_per90"] = to_per90(
+        df["Blocks_Sh"] + df["Blocks_Pass"],
+        minutes
+    )
+    out["interceptions_per90"] = to_per90(
+        df["Int"], minutes
+    )
+    out["def_actions_att_third_per90"] = to_per90(
+        df["Att 3rd"], minutes
+    )
 
-# ------------------------------------------------------------
-# 5) EXPORT FINAL
-# ------------------------------------------------------------
-out.to_csv(OUTPUT_FILE, index=False)
-out.to_csv(WEB_DATA_DIR / "section4_style.csv", index=False)
+    # ========================
+    # RADAR PROGRESSIÓ
+    # ========================
+    out["progressive_carries_per90"] = to_per90(
+        df["PrgC"], minutes
+    )
+    out["long_pass_pct"] = df["Long_Cmp%"]
+    out["crosses_into_pen_area_per90"] = to_per90(
+        df["CrsPA"], minutes
+    )
+    out["touches_per_possession"] = (
+            df["Touches_Touches"] /
+            df["Poss"]
+    )
 
-print("\n✅ section4_style.csv creat correctament")
-print(out.head())
\ No newline at end of file
+    return compact(out, floats=False)
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """Retorna {lliga: taula publicada} per a les etapes següents."""
+    parser = argparse.ArgumentParser(description="Secció 4 — estils de joc")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos per temporades (1 = seqüencial)")
+    parser.add_argument("--scalers", nargs="+", default=["minmax"], choices=list(SCALERS),
+                        help="escaladors per temporada "
+                             "(minmax → _norm, zscore → _z, percentile → _pct)")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    tables = {}
+    with instrument("section4") as run:
+        teams = shared_teams(shared)
+
+        # ------------------------------------------------------------
+        # 1) DETECTAR PARTICIONS
+        # ------------------------------------------------------------
+        partitions = discover(TOPICS, args.leagues, args.seasons)
+
+        print("📥 Temporades trobades:", [str(p) for p in partitions])
+
+        # ------------------------------------------------------------
+        # 2) VALIDAR ESQUEMA (només capçaleres, abans de cap merge)
+        # ------------------------------------------------------------
+        resolved = {}
+        errors = []
+        for p in partitions:
+            missing_topics = [t for t in TOPICS if not p.raw(t).exists()]
+            if missing_topics:
+                errors.append(f"{p}: falten fitxers {missing_topics}")
+                continue
+            schema = FbrefSchema.from_files({t: p.raw(t) for t in TOPICS})
+            try:
+                resolved[p] = schema.resolve(REQUIRED_COLUMNS)
+            except ValueError as e:
+                errors.append(f"{p}: {e}")
+
+        if errors:
+            raise ValueError("❌ Esquema FBref incomplet:\n  " + "\n  ".join(errors))
+
+        for league, league_partitions in by_league(partitions).items():
+            # ------------------------------------------------------------
+            # 3) MERGE PER TEMPORADA
+            # ------------------------------------------------------------
+            jobs = {str(p): (p, resolved[p]) for p in league_partitions}
+            results = map_seasons(partial(merge_season, teams=teams), jobs, workers=args.workers)
+            all_seasons = [merged for merged, _, _ in results]
+
+            for p, (_, rows, missing) in zip(league_partitions, results):
+                for topic in TOPICS:
+                    run.input(p.raw(topic), rows=rows[topic])
+                for topic, absent in missing.items():
+                    print(f"⚠️  {p}: equips sense dades de {topic} (queden fora): {absent}")
+
+            df = concat_compact(all_seasons, ignore_index=True)
+            print(f"✅ Taula integrada {league}:", df.shape)
+
+            # ------------------------------------------------------------
+            # 4) VARIABLES DELS RADARS
+            # ------------------------------------------------------------
+            out = radar_variables(df)
+
+            # ------------------------------------------------------------
+            # 5) NORMALITZACIÓ
+            # ------------------------------------------------------------
+            value_cols = [c for c in out.columns if c not in ["season", "team_id", "team"]]
+            out = compact(normalize_by_season(out, value_cols, args.scalers))
+            run.memory(f"{league}/{OUTPUT_NAME}", out)
+
+            # ------------------------------------------------------------
+            # 6) EXPORT FINAL
+            # ------------------------------------------------------------
+            out = save_league_table(OUTPUT_NAME, league, out, args.seasons, run)
+            tables[league] = select_seasons(out, args.seasons)
+
+            print(f"\n✅ {league}/{OUTPUT_NAME} creat correctament")
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
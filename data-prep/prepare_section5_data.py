@@ -1,18 +1,23 @@
 # --------------------------------------------------------------
 #   SECCIÓ 5 — CONCLUSIONS
 # --------------------------------------------------------------
-import pandas as pd
+import argparse
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from dtypes import as_float64, compact
+from instrumentation import instrument
+from layout import (
+    add_partition_args, load_league_table, processed_leagues, save_league_table, select_seasons,
+    shared_table,
+)
+from styles import STYLE_RULES_FILE, classify_clusters, classify_rules, load_rules
+
 # -------------------------------
 # Paths
 # -------------------------------
-INPUT_PATH = "data_processed/"
-OUTPUT_PATH = "data_processed/"
-
-WEB_DATA_DIR = Path("../datastory/data")
-WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
-
 SECTION1_FILE = "section1_overview.csv"
 SECTION2_FILE = "section2_efficiency.csv"
 SECTION3_FILE = "section3_evolution.csv"
@@ -20,97 +25,168 @@ SECTION4_FILE = "section4_style.csv"
 
 OUTPUT_FILE = "section5_summary.csv"
 
-
-# -------------------------------
-# Load data
-# -------------------------------
-df_s1 = pd.read_csv(INPUT_PATH + SECTION1_FILE)
-df_s2 = pd.read_csv(INPUT_PATH + SECTION2_FILE)
-df_s3 = pd.read_csv(INPUT_PATH + SECTION3_FILE)
-df_s4 = pd.read_csv(INPUT_PATH + SECTION4_FILE)
-
-
-# -------------------------------
-# KPI 1 — Performance xG
-# -------------------------------
-df_s1["performance_xg"] = df_s1["xGPerGame"] - df_s1["xGAPerGame"]
-df_perf = df_s1[["season", "team", "performance_xg"]]
-
-
-# -------------------------------
-# KPI 2 — Efficiency
-# -------------------------------
-df_s2["efficiency"] = df_s2["goals"] - df_s2["xG"]
-df_eff = df_s2[["season", "team", "efficiency"]]
+# Clau de tots els joins entre seccions (team_id de la dimensió d'equips)
+KEYS = ["season", "team_id"]
 
 
 # -------------------------------
-# Merge KPI 1 & 2
+# Utilitats
 # -------------------------------
-df = df_perf.merge(df_eff, on=["season", "team"], how="inner")
+def compute_trend(df_s3: pd.DataFrame, window: int | None = None,
+                  threshold: float = 0.3, min_matches: int = 6) -> pd.DataFrame:
+    """
+    Tendència de cada (season, team_id) comparant la mitjana de xg_diff_cum
+    al principi i al final de la temporada: up / down / stable.
 
+    - window=None → primer terç (n // 3 jornades) contra l'últim terç
+      (ceil(n / 3) jornades), com sempre
+    - window=k    → primeres k jornades contra les últimes k
+    Els equips amb menys de min_matches jornades queden com a "stable".
+    Tot es calcula amb operacions agrupades, sense bucle per equip.
+    """
+    keys = KEYS
+    g = df_s3.sort_values(keys + ["matchday"], kind="stable")
 
-# -------------------------------
-# KPI 3 — Trend (from xg_diff_cum)
-# -------------------------------
-trend_rows = []
-
-for (season, team), g in df_s3.groupby(["season", "team"]):
-    g = g.sort_values("matchday")
+    # observed=True: amb claus categòriques, només les parelles que existeixen
+    grouped = g.groupby(keys, sort=True, observed=True)
+    pos = grouped.cumcount()
+    n = grouped["matchday"].transform("size")
 
-    n = len(g)
-    if n < 6:
-        trend = "stable"
+    if window is None:
+        first_k = n // 3
+        last_k = -(-n // 3)
     else:
-        first = g.iloc[: n // 3]["xg_diff_cum"].mean()
-        last = g.iloc[- n // 3 :]["xg_diff_cum"].mean()
-        delta = last - first
-
-        if delta > 0.3:
-            trend = "up"
-        elif delta < -0.3:
-            trend = "down"
+        first_k = last_k = pd.Series(window, index=g.index)
+
+    values = g["xg_diff_cum"]
+    first = values.where(pos < first_k).groupby([g[k] for k in keys], sort=True, observed=True).mean()
+    last = values.where(pos >= n - last_k).groupby([g[k] for k in keys], sort=True, observed=True).mean()
+    sizes = grouped.size()
+
+    delta = last - first
+    trend = np.select(
+        [sizes < min_matches, delta > threshold, delta < -threshold],
+        ["stable", "up", "down"],
+        default="stable",
+    )
+
+    return pd.DataFrame({"trend": trend}, index=sizes.index).reset_index()
+
+
+def merge_kpi(df: pd.DataFrame, kpi: pd.DataFrame, how: str, label: str) -> pd.DataFrame:
+    """
+    Afegeix un KPI per (season, team_id) i avisa dels equips que no hi
+    tenen correspondència, en lloc de perdre'ls (inner) o deixar-los
+    buits (left) en silenci.
+    """
+    merged = df.merge(kpi, on=KEYS, how="left", indicator=True, validate="1:1")
+    unmatched = merged[merged["_merge"] == "left_only"]
+    if len(unmatched):
+        pairs = unmatched[["season", "team"]].astype(str).itertuples(index=False)
+        teams = sorted(f"{s} {t}" for s, t in pairs)
+        print(f"⚠️  {label}: {len(unmatched)} equips sense correspondència: {teams}")
+    if how == "inner":
+        merged = merged[merged["_merge"] == "both"]
+    return merged.drop(columns="_merge").reset_index(drop=True)
+
+
+def summarize_league(league: str, args, run, shared=None) -> pd.DataFrame:
+    """
+    Taula de conclusions d'una lliga (per a les temporades seleccionades).
+    Les taules de les seccions 1-4 es prenen de `shared` si hi són.
+    """
+    # -------------------------------
+    # Load data
+    # -------------------------------
+    df_s1, df_s2, df_s3, df_s4 = (
+        # Del CSV, ja en float64; de memòria (--in-process), en float32
+        as_float64(shared_table(shared, stage, file, league, args.seasons, run, floats=False))
+        for stage, file in [("section1", SECTION1_FILE), ("section2", SECTION2_FILE),
+                            ("section3", SECTION3_FILE), ("section4", SECTION4_FILE)]
+    )
+
+
+    # -------------------------------
+    # KPI 1 — Performance xG
+    # -------------------------------
+    df_s1["performance_xg"] = df_s1["xGPerGame"] - df_s1["xGAPerGame"]
+    df_perf = df_s1[["season", "team_id", "team", "performance_xg"]]
+
+
+    # -------------------------------
+    # KPI 2 — Efficiency
+    # -------------------------------
+    df_s2["efficiency"] = df_s2["goals"] - df_s2["xG"]
+    df_eff = df_s2[["season", "team_id", "efficiency"]]
+
+
+    # -------------------------------
+    # Merge KPI 1 & 2
+    # -------------------------------
+    df = merge_kpi(df_perf, df_eff, "inner", "efficiency")
+
+
+    # -------------------------------
+    # KPI 3 — Trend (from xg_diff_cum)
+    # -------------------------------
+    df_trend = compute_trend(df_s3, window=args.trend_window, threshold=args.trend_threshold)
+    df = merge_kpi(df, df_trend, "left", "trend")
+
+
+    # -------------------------------
+    # KPI 4 — Play style (regles de config o k-means)
+    # -------------------------------
+    if args.style == "kmeans":
+        # Els clústers s'ajusten sobre totes les temporades de la lliga: amb
+        # --seasons, la taula publicada sencera, perquè no es reetiquetin les altres
+        if args.seasons:
+            df_all = as_float64(load_league_table(SECTION4_FILE, league, floats=False))
+            df_all["play_style"] = classify_clusters(df_all, args.clusters, args.seed)
+            df_s4 = select_seasons(df_all, args.seasons)
         else:
-            trend = "stable"
-
-    trend_rows.append({
-        "season": season,
-        "team": team,
-        "trend": trend
-    })
-
-df_trend = pd.DataFrame(trend_rows)
-df = df.merge(df_trend, on=["season", "team"], how="left")
-
-
-# -------------------------------
-# KPI 4 — Play style (rule-based)
-# -------------------------------
-def classify_style(row):
-    if (
-        row["xg_per90_norm"] > 0.6
-        and row["progressive_passes_per90_norm"] > 0.6
-    ):
-        return "Ofensiu"
-    elif (
-        row["tackles_interceptions_per90_norm"] > 0.6
-        and row["blocks_per90_norm"] > 0.6
-    ):
-        return "Defensiu"
+            df_s4["play_style"] = classify_clusters(df_s4, args.clusters, args.seed)
     else:
-        return "Equilibrat"
-
-
-df_s4["play_style"] = df_s4.apply(classify_style, axis=1)
-df_style = df_s4[["season", "team", "play_style"]]
-
-df = df.merge(df_style, on=["season", "team"], how="left")
-
-
-# -------------------------------
-# Guardar CSV final
-# -------------------------------
-df.to_csv(OUTPUT_PATH + OUTPUT_FILE, index=False)
-df.to_csv(WEB_DATA_DIR / OUTPUT_FILE, index=False)
-
-print(f"✅ {OUTPUT_FILE} creat correctament")
\ No newline at end of file
+        df_s4["play_style"] = classify_rules(df_s4, load_rules(args.style_rules))
+    df_style = df_s4[["season", "team_id", "play_style"]]
+
+    df = merge_kpi(df, df_style, "left", "play_style")
+
+
+    # -------------------------------
+    # Guardar CSV final
+    # -------------------------------
+    df = compact(df)
+    run.memory(f"{league}/{OUTPUT_FILE}", df)
+    return save_league_table(OUTPUT_FILE, league, df, args.seasons, run)
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """Retorna {lliga: taula publicada}; amb `shared`, llegeix les seccions 1-4 de memòria."""
+    parser = argparse.ArgumentParser(description="Secció 5 — conclusions")
+    parser.add_argument("--trend-window", type=int, default=None,
+                        help="jornades a comparar a l'inici i al final (per defecte, terços)")
+    parser.add_argument("--trend-threshold", type=float, default=0.3,
+                        help="diferència mínima de xg_diff_cum per marcar up/down")
+    parser.add_argument("--style", choices=["rules", "kmeans"], default="rules",
+                        help="estil de joc per regles (--style-rules) o per clústers k-means")
+    parser.add_argument("--style-rules", type=Path, default=STYLE_RULES_FILE,
+                        help="fitxer JSON amb les regles d'estil")
+    parser.add_argument("--clusters", type=int, default=3,
+                        help="nombre de clústers en mode --style kmeans")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="llavor del k-means (mateixa llavor → mateixos clústers)")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    tables = {}
+    with instrument("section5") as run:
+        for league in processed_leagues(SECTION1_FILE, args.leagues):
+            df = summarize_league(league, args, run, shared)
+            tables[league] = select_seasons(df, args.seasons)
+            print(f"✅ {league}/{OUTPUT_FILE} creat correctament ({len(df)} files)")
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
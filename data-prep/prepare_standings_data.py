@@ -0,0 +1,189 @@
+# --------------------------------------------------------------
+#   CLASSIFICACIÓ — TAULA DE LA LLIGA A CADA JORNADA
+# --------------------------------------------------------------
+#
+#   Per a cada temporada i jornada, la classificació completa
+#   (partits, punts, diferència de gols, gols a favor i en contra,
+#   posició i canvi de posició respecte de la jornada anterior) de
+#   tots els equips, també dels que aquella jornada no han jugat
+#   (partit ajornat: arrosseguen els acumulats).
+#
+#   Les files per equip i partit surten del mateix motor que la
+#   secció 3 (matches_to_team_rows). Els acumulats es calculen sobre
+#   una graella densa (temporada x equip x jornada) i la posició és un
+#   sol ordenament agrupat per (temporada, jornada) amb el criteri de
+#   desempat de la lliga (TIEBREAKS), sense bucle per jornada.
+#
+#   La taula surt ordenada per (season, matchday, position): cada
+#   jornada és un bloc contigu, i Standings.at() el retorna en O(1)
+#   sense tornar a reproduir la temporada.
+#
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dtypes import compact
+from instrumentation import instrument
+from layout import (
+    add_partition_args, by_league, discover, league_path, load_league_table,
+    save_league_table, select_seasons,
+)
+from prepare_form_data import season_rows
+from teams import shared_teams
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+OUTPUT_NAME = "standings.csv"
+
+# Criteris de desempat per lliga (tots descendents); l'últim recurs és
+# el nom de l'equip. El gol average particular (LaLiga, Serie A) no es
+# pot deduir dels acumulats de cada equip: s'hi aplica la diferència
+# de gols general.
+DEFAULT_TIEBREAK = ["points", "goal_diff", "goals_for"]
+TIEBREAKS = {
+    "laliga": DEFAULT_TIEBREAK,
+    "premier": DEFAULT_TIEBREAK,
+    "seriea": DEFAULT_TIEBREAK,
+    "bundesliga": DEFAULT_TIEBREAK,
+    "ligue1": DEFAULT_TIEBREAK,
+}
+
+TOTAL_COLS = ["played", "points", "goals_for", "goals_against"]
+
+STANDINGS_COLS = [
+    "season",
+    "matchday",
+    "position",
+    "team_id",
+    "team",
+    "played",
+    "points",
+    "goal_diff",
+    "goals_for",
+    "goals_against",
+    "position_change",
+]
+
+
+# ------------------------------------------------------------
+# PROCESSAMENT
+# ------------------------------------------------------------
+
+def matchday_grid(team_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Totals de cada equip a cada jornada (1..última jornada jugada de la
+    temporada), amb zeros les jornades en què no ha jugat.
+    """
+    rows = team_rows.assign(played=1)
+    keys = ["season", "team_id", "matchday"]
+    totals = rows.groupby(keys, observed=True)[TOTAL_COLS].sum()
+
+    teams = rows[["season", "team_id", "team"]].drop_duplicates(["season", "team_id"])
+    last = rows.groupby("season", observed=True)["matchday"].max()
+    matchdays = pd.DataFrame({
+        "season": last.index.repeat(last.to_numpy()),
+        "matchday": np.concatenate([np.arange(1, n + 1) for n in last.to_numpy()]),
+    })
+    grid = teams.merge(matchdays, on="season")
+
+    grid = grid.join(totals, on=keys).fillna({col: 0 for col in TOTAL_COLS})
+    return grid.astype({col: "int64" for col in TOTAL_COLS})
+
+
+def rank_standings(team_rows: pd.DataFrame, tiebreak: list[str] = DEFAULT_TIEBREAK) -> pd.DataFrame:
+    """
+    Classificació a cada jornada de totes les temporades de team_rows.
+
+    position_change > 0 vol dir que l'equip ha pujat respecte de la
+    jornada anterior (0 a la primera jornada).
+    """
+    grid = matchday_grid(team_rows)
+    grid = grid.sort_values(["season", "team_id", "matchday"]).reset_index(drop=True)
+    grid[TOTAL_COLS] = grid.groupby(["season", "team_id"], observed=True)[TOTAL_COLS].cumsum()
+    grid["goal_diff"] = grid["goals_for"] - grid["goals_against"]
+
+    # Un sol ordenament: per jornada i, dins de cada jornada, pel desempat
+    table = grid.sort_values(
+        ["season", "matchday", *tiebreak, "team"],
+        ascending=[True, True, *[False] * len(tiebreak), True],
+        kind="stable",
+    ).reset_index(drop=True)
+    table["position"] = table.groupby(["season", "matchday"], observed=True).cumcount() + 1
+
+    previous = table.groupby(["season", "team_id"], observed=True)["position"].shift(1)
+    table["position_change"] = (previous - table["position"]).fillna(0).astype("int64")
+
+    return compact(table[STANDINGS_COLS])
+
+
+class Standings:
+    """
+    Classificacions d'una lliga amb els blocs de cada (season, matchday)
+    precompilats: la taula d'una jornada és una consulta O(1) i un tall
+    de files, no un recàlcul.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.reset_index(drop=True)
+        season = self.table["season"].astype(str).to_numpy()
+        matchday = self.table["matchday"].to_numpy()
+        starts = np.flatnonzero(
+            np.r_[True, (season[1:] != season[:-1]) | (matchday[1:] != matchday[:-1])]
+        )
+        stops = np.r_[starts[1:], len(self.table)]
+        self._blocks = {
+            (season[start], int(matchday[start])): slice(start, stop)
+            for start, stop in zip(starts, stops)
+        }
+
+    @classmethod
+    def load(cls, league: str) -> "Standings":
+        path = league_path(league, OUTPUT_NAME)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"❌ No existeix {path}: executa abans prepare_standings_data.py"
+            )
+        return cls(load_league_table(OUTPUT_NAME, league))
+
+    def at(self, season: str, matchday: int) -> pd.DataFrame:
+        """Classificació de la temporada `season` ('2024-25') després de la jornada `matchday`."""
+        block = self._blocks.get((season, int(matchday)))
+        if block is None:
+            raise KeyError(f"❌ No hi ha classificació per a {season}, jornada {matchday}")
+        return self.table.iloc[block]
+
+
+def main(argv=None, shared=None) -> dict[str, pd.DataFrame]:
+    """Retorna {lliga: taula publicada} per a les etapes següents."""
+    parser = argparse.ArgumentParser(description="Classificació a cada jornada")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    tables = {}
+    with instrument("standings") as run:
+        teams = shared_teams(shared)
+        print("📥 Buscant calendaris FBref a ./data_raw ...")
+
+        partitions = discover(["matches"], args.leagues, args.seasons)
+
+        for league, league_partitions in by_league(partitions).items():
+            tiebreak = TIEBREAKS.get(league, DEFAULT_TIEBREAK)
+            print(f"\n🏆 {league}: classificacions per jornada (desempat: {', '.join(tiebreak)}) ...")
+            rows = season_rows(league_partitions, teams, run)
+
+            standings = rank_standings(rows, tiebreak)
+            run.memory(f"{league}/{OUTPUT_NAME}", standings)
+            standings = save_league_table(OUTPUT_NAME, league, standings, args.seasons, run)
+            tables[league] = select_seasons(standings, args.seasons)
+
+            print(f"✅ {league}/{OUTPUT_NAME} creat correctament ({len(standings)} files)")
+
+    return tables
+
+
+if __name__ == "__main__":
+    main()
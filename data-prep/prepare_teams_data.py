@@ -0,0 +1,66 @@
+# --------------------------------------------------------------
+#   DIMENSIÓ D'EQUIPS — data_processed/teams.csv
+# --------------------------------------------------------------
+
+import argparse
+import pandas as pd
+
+from fbref_io import read_fbref_csv
+from instrumentation import instrument
+from layout import add_partition_args, discover
+from publish import publish_table
+from teams import TEAMS_FILE, TeamDimension, build_teams
+
+
+def main(argv=None, shared=None) -> TeamDimension:
+    """Retorna la dimensió d'equips per compartir-la amb les etapes següents."""
+    parser = argparse.ArgumentParser(description="Dimensió d'equips")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    with instrument("teams") as run:
+        standard = []
+        schedule_names = []
+
+        for p in discover(["standard", "matches"], args.leagues, args.seasons):
+            if p.raw("standard").exists():
+                df = read_fbref_csv(p.raw("standard"), columns=[])
+                standard.append(pd.DataFrame({
+                    "league": p.league,
+                    "season": p.season,
+                    "squad_id": df["squad_id"],
+                    "team": df["team"],
+                }))
+                run.input(p.raw("standard"), rows=len(df))
+
+            if p.raw("matches").exists():
+                matches = pd.read_csv(p.raw("matches"), usecols=["home_team", "away_team"])
+                names = pd.unique(matches[["home_team", "away_team"]].to_numpy().ravel())
+                schedule_names.append(pd.DataFrame({
+                    "league": p.league,
+                    "season": p.season,
+                    "name": names,
+                }))
+                run.input(p.raw("matches"), rows=len(matches))
+
+        existing = None
+        if TEAMS_FILE.exists():
+            existing = pd.read_csv(TEAMS_FILE, dtype={"squad_id": str, "leagues": str, "aliases": str})
+
+        teams = build_teams(
+            pd.concat(standard, ignore_index=True),
+            pd.concat(schedule_names, ignore_index=True),
+            existing,
+        )
+
+        [written] = publish_table(teams, [TEAMS_FILE])
+        run.output(TEAMS_FILE, rows=len(teams), written=written)
+
+        new = len(teams) - (len(existing) if existing is not None else 0)
+        print(f"✅ teams.csv: {len(teams)} equips ({new} nous)")
+
+    return TeamDimension(teams)
+
+
+if __name__ == "__main__":
+    main()
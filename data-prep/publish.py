@@ -0,0 +1,95 @@
+# --------------------------------------------------------------
+#   PUBLICACIÓ DE SORTIDES (escriptura única, atòmica i per contingut)
+# --------------------------------------------------------------
+#
+#   Cada taula es serialitza una sola vegada. El primer destí
+#   (data_processed/) s'escriu en un fitxer temporal del mateix
+#   directori i es reanomena amb os.replace: qui el llegeix (p. ex. la
+#   datastory) mai no veu un fitxer a mig escriure. La resta de destins
+#   (../datastory/data) s'hi enllacen (hard link) o, si el sistema de
+#   fitxers no ho permet, s'hi copien, també amb temporal + reanomenar.
+#
+#   Un destí que ja té el mateix contingut (mida i SHA-256) no es toca:
+#   una actualització sense canvis no reescriu res ni canvia la data de
+#   modificació dels fitxers que serveix el lloc estàtic.
+#
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from fbref_io import file_hash
+
+
+def _same_content(path: Path, size: int, digest: str) -> bool:
+    return path.exists() and path.stat().st_size == size and file_hash(path) == digest
+
+
+def _tmp_path(target: Path) -> Path:
+    return target.with_name(f".{target.name}.tmp")
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Enllaç (o còpia) atòmic de source a target."""
+    tmp = _tmp_path(target)
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        # Un altre dispositiu o sistema de fitxers sense hard links
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+def publish_file(source: Path, targets: list[Path]) -> list[bool]:
+    """
+    Publica un fitxer ja escrit (temporal) als destins. El primer
+    destí rep source amb os.replace (o source s'esborra si el contingut
+    no ha canviat); la resta s'hi enllacen o s'hi copien.
+    Retorna, per a cada destí, si s'ha escrit.
+    """
+    source = Path(source)
+    size, digest = source.stat().st_size, file_hash(source)
+    primary, *others = [Path(t) for t in targets]
+
+    written = []
+    for target in [primary, *others]:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if _same_content(target, size, digest):
+            written.append(False)
+            continue
+        if target == primary:
+            os.replace(source, primary)
+        else:
+            _link_or_copy(primary, target)
+        written.append(True)
+
+    source.unlink(missing_ok=True)
+    return written
+
+
+def publish_bytes(data: bytes, targets: list[Path]) -> list[bool]:
+    """Com publish_file, per a un contingut ja serialitzat en memòria."""
+    size, digest = len(data), hashlib.sha256(data).hexdigest()
+    targets = [Path(t) for t in targets]
+
+    if all(_same_content(t, size, digest) for t in targets):
+        return [False] * len(targets)
+
+    primary = targets[0]
+    primary.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(primary)
+    try:
+        tmp.write_bytes(data)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return publish_file(tmp, targets)
+
+
+def publish_table(df: pd.DataFrame, targets: list[Path]) -> list[bool]:
+    """Serialitza df a CSV una sola vegada i el publica als destins."""
+    return publish_bytes(df.to_csv(index=False).encode("utf-8"), targets)
@@ -0,0 +1,172 @@
+# --------------------------------------------------------------
+#   ESTILS DE JOC (classificació de la secció 5)
+# --------------------------------------------------------------
+#
+#   Dues maneres d'assignar un estil a cada equip i temporada a partir
+#   de la taula de la secció 4:
+#
+#   rules  → regles de style_rules.json, en ordre: la primera que es
+#            compleix dona l'estil i, si no se'n compleix cap, "default".
+#            Cada regla és una llista de condicions [columna, op, valor]
+#            que s'han de complir totes:
+#
+#                {"default": "Equilibrat",
+#                 "rules": [{"style": "Ofensiu",
+#                            "when": [["xg_per90_norm", ">", 0.6], ...]}]}
+#
+#            Cada condició és una màscara booleana sobre la columna
+#            sencera i l'estil surt d'un sol np.select.
+#
+#   kmeans → k-means (NumPy, inicialització k-means++) sobre totes les
+#            mètriques normalitzades dels radars (*_norm). Amb la mateixa
+#            llavor i les mateixes dades (en qualsevol ordre de files), els
+#            mateixos clústers i etiquetes. La secció 5 l'ajusta sempre
+#            sobre totes les temporades de la lliga.
+#
+
+import json
+import operator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+# Configuració, no dades: es busca al costat del codi (no al directori de treball)
+STYLE_RULES_FILE = Path(__file__).resolve().parent / "style_rules.json"
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Columnes de la secció 4 sobre les quals s'agrupa en mode kmeans
+FEATURE_SUFFIX = "_norm"
+
+
+# ------------------------------------------------------------
+# REGLES
+# ------------------------------------------------------------
+
+def load_rules(path: Path = STYLE_RULES_FILE) -> dict:
+    """Llegeix i valida un conjunt de regles."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ No existeix {path}: cal un fitxer de regles d'estil")
+    rules = json.loads(path.read_text(encoding="utf-8"))
+
+    if "default" not in rules or not isinstance(rules.get("rules"), list):
+        raise ValueError(f"❌ {path}: cal 'default' i una llista 'rules'")
+    for rule in rules["rules"]:
+        for condition in rule.get("when", []):
+            if len(condition) != 3 or condition[1] not in OPERATORS:
+                raise ValueError(
+                    f"❌ {path}: condició no vàlida a '{rule.get('style')}': {condition} "
+                    f"(operadors: {list(OPERATORS)})"
+                )
+    return rules
+
+
+def classify_rules(df: pd.DataFrame, rules: dict) -> pd.Series:
+    """
+    Estil de cada fila segons les regles, amb una màscara per condició.
+    Una comparació amb un valor absent (NaN) no es compleix.
+    """
+    needed = {col for rule in rules["rules"] for col, _, _ in rule.get("when", [])}
+    missing = sorted(needed - set(df.columns))
+    if missing:
+        raise ValueError(f"❌ Les regles d'estil fan servir columnes inexistents: {missing}")
+
+    masks = []
+    for rule in rules["rules"]:
+        mask = np.ones(len(df), dtype=bool)
+        for col, op, value in rule.get("when", []):
+            mask &= OPERATORS[op](df[col], value).to_numpy(dtype=bool, na_value=False)
+        masks.append(mask)
+
+    styles = np.select(masks, [rule["style"] for rule in rules["rules"]], default=rules["default"])
+    return pd.Series(styles, index=df.index, name="play_style")
+
+
+# ------------------------------------------------------------
+# K-MEANS
+# ------------------------------------------------------------
+
+def kmeans(points: np.ndarray, k: int, seed: int = 0,
+           max_iter: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """
+    K-means de Lloyd amb inicialització k-means++ (np.random.default_rng(seed)).
+    Retorna (clúster de cada punt, centroides).
+    """
+    n = len(points)
+    if not 1 <= k <= n:
+        raise ValueError(f"❌ k={k} clústers per a {n} equips")
+
+    rng = np.random.default_rng(seed)
+    centroids = np.empty((k, points.shape[1]))
+    centroids[0] = points[rng.integers(n)]
+    closest = ((points - centroids[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        chosen = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centroids[i] = points[chosen]
+        closest = np.minimum(closest, ((points - centroids[i]) ** 2).sum(axis=1))
+
+    squared = (points ** 2).sum(axis=1)[:, None]
+    labels = np.zeros(n, dtype=int)
+    for _ in range(max_iter):
+        # |x - c|² = |x|² - 2 x·c + |c|², sense la matriu n x k x d
+        distances = squared - 2 * points @ centroids.T + (centroids ** 2).sum(axis=1)
+        labels = distances.argmin(axis=1)
+
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        # Un clúster buit es queda on era
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    return labels, centroids
+
+
+def classify_clusters(df: pd.DataFrame, k: int = 3, seed: int = 0) -> pd.Series:
+    """
+    Estil de cada fila com a clúster de k-means sobre les columnes *_norm.
+
+    Els clústers es numeren per mida (el més gran és el 1) i cada
+    etiqueta diu la mètrica en què el centroide més supera la mitjana:
+    "Clúster 1 · xg_per90". Els valors absents es substitueixen per la
+    mitjana de la columna. Els punts s'ordenen abans d'ajustar, perquè
+    l'ordre de les files no canviï la inicialització.
+    """
+    features = [col for col in df.columns if col.endswith(FEATURE_SUFFIX)]
+    if not features:
+        raise ValueError(f"❌ No hi ha columnes {FEATURE_SUFFIX} per agrupar els equips")
+
+    values = df[features].to_numpy(dtype="float64")
+    means = np.nanmean(values, axis=0)
+    values = np.where(np.isnan(values), means, values)
+
+    order = np.lexsort(values.T[::-1])
+    sorted_labels, centroids = kmeans(values[order], k, seed)
+    labels = np.empty_like(sorted_labels)
+    labels[order] = sorted_labels
+
+    # Numeració estable: per mida descendent i, en cas d'empat, pel centroide
+    counts = np.bincount(labels, minlength=k)
+    order = sorted(range(k), key=lambda c: (-counts[c], tuple(centroids[c])))
+    names = {}
+    for number, cluster in enumerate(order, start=1):
+        top = features[int(np.argmax(centroids[cluster] - means))].removesuffix(FEATURE_SUFFIX)
+        names[cluster] = f"Clúster {number} · {top}"
+
+    return pd.Series(labels, index=df.index).map(names).rename("play_style")
@@ -0,0 +1,195 @@
+# --------------------------------------------------------------
+#   DIMENSIÓ D'EQUIPS (identificador canònic compartit)
+# --------------------------------------------------------------
+#
+#   Els noms d'equip arriben de dues fonts: les taules d'equip de
+#   FBref (url del club, p. ex. "Alaves") i els calendaris ("Alavés",
+#   "Betis"). data_processed/teams.csv fixa un únic equip per cada
+#   squad_id de FBref, amb:
+#
+#       team_id   → enter estable (mai es reassigna) per als joins
+#       squad_id  → identificador de FBref (de la url)
+#       team      → nom canònic publicat (el de la url més recent)
+#       leagues   → lligues (directoris de data_raw/) on ha jugat, separades per "|"
+#       aliases   → noms alternatius vistos als calendaris, separats per "|"
+#
+#   Totes les seccions resolen els seus equips contra aquesta taula i
+#   fan els joins per team_id. Un nom que no s'hi pot resoldre és un
+#   error (abans es perdia en silenci en els joins interns). Els noms
+#   dels calendaris es resolen dins de la seva lliga: dos clubs de
+#   lligues diferents poden tenir el mateix nom normalitzat. Un nom
+#   ambigu (sense lliga, o repetit dins d'una lliga) també és un error.
+#
+
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+from layout import PROCESSED_DIR
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+TEAMS_FILE = PROCESSED_DIR / "teams.csv"
+
+TEAMS_COLUMNS = ["team_id", "squad_id", "team", "leagues", "aliases"]
+
+# Àlies que no es poden deduir normalitzant el nom (calendari → nom de la url)
+MANUAL_ALIASES = {
+    "Betis": "Real Betis",
+}
+
+
+def normalize_name(name: str) -> str:
+    """'Atlético Madrid' → 'atleticomadrid' (sense accents, espais ni signes)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in ascii_name.lower() if ch.isalnum())
+
+
+def split_list(value) -> list[str]:
+    """Camp 'a|b' de teams.csv → ['a', 'b'] (buit o NaN → [])."""
+    if not isinstance(value, str):
+        return []
+    return [item for item in value.split("|") if item and item != "nan"]
+
+
+class TeamDimension:
+    """
+    Taula d'equips amb els índexs precompilats per resoldre squad_id
+    i noms (canònics, àlies o normalitzats) a team_id en O(1).
+
+    Els noms s'indexen per (lliga, nom normalitzat) i també només pel
+    nom; cada clau guarda tots els team_id que hi corresponen, per
+    detectar les col·lisions en lloc de quedar-se el primer.
+    Una taula sense la columna leagues (teams.csv antic) només es pot
+    consultar sense lliga.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.sort_values("team_id").reset_index(drop=True)
+        if "leagues" not in self.table.columns:
+            self.table["leagues"] = None
+        self._by_squad = dict(zip(self.table["squad_id"], self.table["team_id"]))
+        self._names = dict(zip(self.table["team_id"], self.table["team"]))
+        self._by_league_name = {}
+        self._by_name = {}
+        columns = ["team_id", "team", "leagues", "aliases"]
+        for team_id, team, leagues, aliases in self.table[columns].itertuples(index=False):
+            for name in [team, *split_list(aliases)]:
+                key = normalize_name(name)
+                self._by_name.setdefault(key, set()).add(team_id)
+                for league in split_list(leagues):
+                    self._by_league_name.setdefault((league, key), set()).add(team_id)
+        self._has_leagues = self.table["leagues"].map(lambda lg: bool(split_list(lg))).all()
+
+    @classmethod
+    def load(cls, path: Path = TEAMS_FILE) -> "TeamDimension":
+        if not path.exists():
+            raise FileNotFoundError(
+                f"❌ No existeix {path}: executa abans prepare_teams_data.py"
+            )
+        return cls(pd.read_csv(path, dtype={"squad_id": str, "leagues": str, "aliases": str}))
+
+    def lookup_name(self, name: str, league: str | None = None) -> int | None:
+        """
+        team_id d'un nom, dins de `league` si es coneix; None si no hi
+        és. Falla si el nom correspon a més d'un equip.
+        """
+        key = normalize_name(MANUAL_ALIASES.get(name, name))
+        if league is not None and self._has_leagues:
+            ids, scope = self._by_league_name.get((league, key)), league
+        else:
+            ids, scope = self._by_name.get(key), "totes les lligues"
+        if not ids:
+            return None
+        if len(ids) > 1:
+            raise ValueError(
+                f"❌ Nom d'equip ambigu a {TEAMS_FILE} ({scope}): '{name}' → team_id {sorted(ids)}"
+            )
+        return next(iter(ids))
+
+    def ids_from_squads(self, squad_ids: pd.Series) -> pd.Series:
+        """squad_id de FBref → team_id; falla si n'hi ha cap de desconegut."""
+        ids = squad_ids.map(self._by_squad)
+        unknown = sorted(set(squad_ids[ids.isna()].astype(str)))
+        if unknown:
+            raise ValueError(f"❌ squad_id sense equip a {TEAMS_FILE}: {unknown}")
+        return ids.astype("int32")
+
+    def ids_from_names(self, names: pd.Series, league: str | None = None) -> pd.Series:
+        """Noms (de qualsevol font) d'una lliga → team_id; falla si n'hi ha cap de desconegut."""
+        mapping = {name: self.lookup_name(name, league) for name in pd.unique(names)}
+        unknown = sorted(str(name) for name, team_id in mapping.items() if team_id is None)
+        if unknown:
+            raise ValueError(f"❌ Equips sense correspondència a {TEAMS_FILE}: {unknown}")
+        return names.map(mapping).astype("int32")
+
+    def names(self, team_ids: pd.Series) -> pd.Series:
+        """team_id → nom canònic."""
+        return team_ids.map(self._names)
+
+
+def shared_teams(shared=None) -> TeamDimension:
+    """Dimensió de l'etapa teams si el pipeline la comparteix en memòria; si no, teams.csv."""
+    if shared and shared.get("teams") is not None:
+        return shared["teams"]
+    return TeamDimension.load()
+
+
+def build_teams(standard: pd.DataFrame, schedule_names: pd.DataFrame,
+                existing: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Construeix (o amplia) la taula d'equips.
+
+    standard       → files (league, season, squad_id, team) de les taules d'equip
+    schedule_names → files (league, season, name) dels calendaris; cada nom
+                     es casa amb un equip de la mateixa partició pel nom
+                     normalitzat o per MANUAL_ALIASES
+    existing       → taula anterior: es conserven els seus team_id i els
+                     equips nous reben els següents, per ordre de nom
+    """
+    existing = existing if existing is not None else pd.DataFrame(columns=TEAMS_COLUMNS)
+    latest = standard.sort_values("season").groupby("squad_id").tail(1)
+
+    if "leagues" not in existing.columns:
+        existing = existing.assign(leagues="")
+    table = existing.set_index("squad_id")[["team_id", "team", "leagues", "aliases"]].to_dict("index")
+    next_id = int(existing["team_id"].max()) + 1 if len(existing) else 1
+    for squad_id, team in sorted(zip(latest["squad_id"], latest["team"]), key=lambda x: x[1]):
+        if squad_id in table:
+            table[squad_id]["team"] = team
+        else:
+            table[squad_id] = {"team_id": next_id, "team": team, "leagues": "", "aliases": ""}
+            next_id += 1
+
+    for squad_id, league in standard[["squad_id", "league"]].drop_duplicates().itertuples(index=False):
+        entry = table[squad_id]
+        entry["leagues"] = "|".join(sorted(set(split_list(entry["leagues"])) | {league}))
+
+    # Àlies dels calendaris, casats partició a partició
+    by_partition = {
+        (league, season, normalize_name(team)): squad_id
+        for league, season, squad_id, team
+        in standard[["league", "season", "squad_id", "team"]].itertuples(index=False)
+    }
+    unmatched = []
+    rows = schedule_names[["league", "season", "name"]].drop_duplicates()
+    for league, season, name in rows.itertuples(index=False):
+        key = (league, season, normalize_name(MANUAL_ALIASES.get(name, name)))
+        squad_id = by_partition.get(key)
+        if squad_id is None:
+            unmatched.append(f"{league}/{season} {name}")
+            continue
+        entry = table[squad_id]
+        aliases = set(split_list(entry["aliases"]))
+        if name != entry["team"]:
+            aliases.add(name)
+        entry["aliases"] = "|".join(sorted(aliases))
+
+    if unmatched:
+        raise ValueError(f"❌ Equips del calendari sense equip FBref: {unmatched}")
+
+    teams = pd.DataFrame.from_dict(table, orient="index").rename_axis("squad_id").reset_index()
+    return teams[TEAMS_COLUMNS].sort_values("team_id").reset_index(drop=True)
@@ -0,0 +1,36 @@
+# --------------------------------------------------------------
+#   PROVES — configuració compartida
+# --------------------------------------------------------------
+#
+#   Els scripts fan servir rutes relatives a data-prep/ (data_raw/,
+#   data_processed/, ../datastory/data). Les proves s'executen des de
+#   data-prep/ (python -m pytest -q tests) i cada una treballa en una
+#   còpia a tmp_path/data-prep perquè mai no toquin les taules del repo.
+#
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+DATA_PREP = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(DATA_PREP))
+
+
+@pytest.fixture
+def empty_workspace(tmp_path, monkeypatch) -> Path:
+    """Directori data-prep/ buit, com a directori de treball."""
+    work = tmp_path / "data-prep"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    return work
+
+
+@pytest.fixture
+def workspace(empty_workspace) -> Path:
+    """data-prep/ amb les dades de LaLiga del repo (data_raw/ i teams.csv)."""
+    shutil.copytree(DATA_PREP / "data_raw" / "laliga", empty_workspace / "data_raw" / "laliga")
+    (empty_workspace / "data_processed").mkdir()
+    shutil.copy(DATA_PREP / "data_processed" / "teams.csv", empty_workspace / "data_processed")
+    return empty_workspace
@@ -0,0 +1,124 @@
+# --------------------------------------------------------------
+#   PROVES — descàrrega FBref amb un client local
+# --------------------------------------------------------------
+
+import json
+
+import pandas as pd
+import pytest
+
+import download_laliga_2020_2025 as download
+from download_laliga_2020_2025 import MANIFEST_FILE, download_all, output_path
+from fbref_io import file_hash
+
+STAT_FILES = [*download.STAT_TYPES, download.SCHEDULE]
+
+
+class FakeFBref:
+    """
+    Client amb la interfície de soccerdata.FBref. `failures` diu quantes
+    crides han de fallar per a cada tipus abans de respondre; `calls`
+    compta les crides (compartit entre tots els clients de la fàbrica).
+    """
+
+    def __init__(self, league, season, failures, calls):
+        self.league, self.season = league, season
+        self.failures, self.calls = failures, calls
+
+    def _table(self, stat_type):
+        self.calls[stat_type] = self.calls.get(stat_type, 0) + 1
+        if self.calls[stat_type] <= self.failures.get(stat_type, 0):
+            raise ConnectionError(f"429 Too Many Requests ({stat_type})")
+        return pd.DataFrame({"team": ["Alavés", "Betis"], "season": self.season,
+                             "stat": [stat_type, stat_type]})
+
+    def read_team_season_stats(self, stat_type):
+        return self._table(stat_type)
+
+    def read_schedule(self):
+        return self._table(download.SCHEDULE)
+
+
+def fake_factory(failures=None):
+    calls = {}
+    factory = lambda league, season: FakeFBref(league, season, failures or {}, calls)  # noqa: E731
+    return factory, calls
+
+
+def run(factory, **kwargs):
+    options = dict(seasons=[2024], workers=2, min_interval=0, backoff=0, client_factory=factory)
+    return download_all(**{**options, **kwargs})
+
+
+def test_downloads_every_file_and_records_manifest(empty_workspace):
+    factory, _ = fake_factory()
+    result = run(factory)
+
+    assert result["failed"] == {}
+    assert len(result["downloaded"]) == len(STAT_FILES)
+    manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    for stat_type in STAT_FILES:
+        path = output_path("laliga", 2024, stat_type)
+        entry = manifest[f"laliga/2024/{stat_type}.csv"]
+        assert entry["sha256"] == file_hash(path)
+        assert entry["rows"] == 2
+    assert not list(empty_workspace.rglob("*.tmp"))
+
+
+def test_retries_until_success(empty_workspace):
+    factory, calls = fake_factory({"passing": 2})
+    result = run(factory, retries=3)
+
+    assert result["failed"] == {}
+    assert calls["passing"] == 3
+    assert output_path("laliga", 2024, "passing").exists()
+
+
+def test_gives_up_after_retries_without_partial_files(empty_workspace):
+    factory, calls = fake_factory({"passing": 5})
+    result = run(factory, retries=2)
+
+    assert list(result["failed"]) == ["laliga/2024/passing.csv"]
+    assert calls["passing"] == 2
+    assert not output_path("laliga", 2024, "passing").exists()
+    manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    assert "laliga/2024/passing.csv" not in manifest
+    assert len(manifest) == len(STAT_FILES) - 1
+
+
+def test_failed_write_keeps_previous_file(empty_workspace, monkeypatch):
+    factory, _ = fake_factory()
+    run(factory)
+    path = output_path("laliga", 2024, "standard")
+    before = path.read_bytes()
+
+    def broken_to_csv(self, target, **kwargs):
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("team,sea")
+        raise OSError("disc ple")
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", broken_to_csv)
+    result = run(factory, force=True)
+
+    assert len(result["failed"]) == len(STAT_FILES)
+    assert path.read_bytes() == before
+    assert not list(empty_workspace.rglob("*.tmp"))
+
+
+def test_resume_skips_completed_and_redownloads_modified(empty_workspace):
+    factory, calls = fake_factory()
+    run(factory)
+    output_path("laliga", 2024, "misc").write_text("malmès\n", encoding="utf-8")
+
+    calls.clear()
+    result = run(factory)
+
+    assert result["downloaded"] == ["laliga/2024/misc.csv"]
+    assert len(result["skipped"]) == len(STAT_FILES) - 1
+    assert calls == {"misc": 1}
+
+
+def test_unknown_league_is_rejected(empty_workspace):
+    factory, _ = fake_factory()
+    with pytest.raises(ValueError):
+        run(factory, leagues=["eredivisie"])
@@ -0,0 +1,30 @@
+# --------------------------------------------------------------
+#   PROVES — política de tipus: float32 → float64 sense soroll
+# --------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from dtypes import as_float64, read_compact_csv
+
+
+def test_as_float64_matches_the_written_decimal():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        rng.normal(0, 5, 10_000), np.round(rng.normal(0, 5, 10_000), 2),
+        rng.uniform(0, 1e-3, 1_000), rng.uniform(1e3, 1e6, 1_000), [np.nan, 0.0, 0.87],
+    ]).astype("float32")
+    df = pd.DataFrame({"xg": values})
+
+    widened = as_float64(df)["xg"]
+    expected = pd.to_numeric(df["xg"].astype(str))
+    pd.testing.assert_series_equal(widened, expected, check_exact=True)
+    assert widened.iloc[-1] == 0.87
+
+
+def test_read_without_float_compaction_keeps_float64(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("season,team_id,xg\n2024-25,1,0.87\n", encoding="utf-8")
+
+    assert read_compact_csv(path)["xg"].dtype == "float32"
+    assert read_compact_csv(path, floats=False)["xg"].iloc[0] == 0.87
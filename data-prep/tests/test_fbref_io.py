@@ -0,0 +1,51 @@
+# --------------------------------------------------------------
+#   PROVES — lectura de taules FBref amb la memòria cau columnar
+# --------------------------------------------------------------
+
+import json
+
+import pandas as pd
+import pytest
+
+import fbref_io
+
+STANDARD = "data_raw/laliga/2022/standard.csv"
+
+
+@pytest.fixture
+def cache_meta(workspace):
+    def read():
+        _, meta_file = fbref_io._cache_paths(workspace / STANDARD)
+        return json.loads(meta_file.read_text(encoding="utf-8"))
+    return read
+
+
+def test_cold_miss_parses_only_the_requested_columns(workspace, cache_meta):
+    df = fbref_io.read_fbref_csv(workspace / STANDARD, columns=["Expected_xG"])
+
+    assert list(df.columns) == ["Expected_xG", "url", "team", "squad_id"]
+    assert cache_meta()["columns"] == ["Expected_xG", "url", "team", "squad_id"]
+
+
+def test_cache_grows_with_new_columns(workspace, cache_meta):
+    path = workspace / STANDARD
+    fbref_io.read_fbref_csv(path, columns=["Expected_xG"])
+    df = fbref_io.read_fbref_csv(path, columns=["Performance_Gls"])
+
+    full = fbref_io.parse_fbref_csv(path)
+    pd.testing.assert_frame_equal(df, full[["Performance_Gls", "url", "team", "squad_id"]])
+    assert {"Expected_xG", "Performance_Gls"} <= set(cache_meta()["columns"])
+
+    # Una lectura sencera deixa la taula completa a la cau
+    pd.testing.assert_frame_equal(fbref_io.read_fbref_csv(path), full)
+    assert cache_meta()["columns"] is None
+
+
+def test_memory_cache_widens_partial_entries(workspace, monkeypatch):
+    monkeypatch.setattr(fbref_io, "_memory_cache", {})
+    path = workspace / STANDARD
+    fbref_io.read_fbref_csv(path, columns=["Expected_xG"])
+    df = fbref_io.read_fbref_csv(path, columns=["Performance_Gls"])
+
+    assert "Performance_Gls" in df.columns
+    assert {"Expected_xG", "Performance_Gls"} <= set(fbref_io._memory_cache[str(path)][2].columns)
@@ -0,0 +1,59 @@
+# --------------------------------------------------------------
+#   PROVES — forma: finestres amb diferències d'acumulats
+# --------------------------------------------------------------
+#
+#   Valors calculats a mà. B descansa la jornada 2, així que la seva
+#   finestra de 2 partits a la jornada 3 inclou la jornada 1; A torna a
+#   començar de zero a la temporada següent.
+#
+
+import pandas as pd
+import pytest
+
+from prepare_form_data import rolling_form
+
+COLUMNS = ["team_id", "team", "season", "matchday",
+           "points", "goals_for", "goals_against", "xg_for", "xg_against"]
+
+TEAM_ROWS = pd.DataFrame([
+    (1, "A", "2024-25", 1, 3, 2, 0, 1.5, 0.5),
+    (2, "B", "2024-25", 1, 0, 0, 2, 0.5, 1.5),
+    (1, "A", "2024-25", 2, 1, 1, 1, 0.5, 1.0),
+    (1, "A", "2024-25", 3, 0, 0, 2, 0.25, 1.25),
+    (2, "B", "2024-25", 3, 3, 1, 0, 1.0, 0.25),
+    (1, "A", "2024-25", 4, 3, 3, 1, 2.0, 0.75),
+    (2, "B", "2024-25", 4, 1, 1, 1, 0.75, 0.5),
+    (1, "A", "2025-26", 1, 1, 1, 1, 1.0, 1.0),
+], columns=COLUMNS)
+
+
+@pytest.fixture
+def form():
+    return rolling_form(TEAM_ROWS, [2, 3]).astype({"team": str, "season": str})
+
+
+def window(form, k):
+    rows = form[form["window"] == k].set_index(["team", "season", "matchday"])
+    return rows.drop(columns=["team_id", "window"])
+
+
+def test_two_match_window(form):
+    expected = pd.DataFrame([
+        ("A", "2024-25", 1, 1, 3, 2, 0, 1.5, 0.5, 0.5),
+        ("A", "2024-25", 2, 2, 4, 3, 1, 2.0, 1.5, 1.0),
+        ("A", "2024-25", 3, 2, 1, 1, 3, 0.75, 2.25, 0.25),
+        ("A", "2024-25", 4, 2, 3, 3, 3, 2.25, 2.0, 0.75),
+        ("B", "2024-25", 1, 1, 0, 0, 2, 0.5, 1.5, -0.5),
+        ("B", "2024-25", 3, 2, 3, 1, 2, 1.5, 1.75, -0.5),
+        ("B", "2024-25", 4, 2, 4, 2, 1, 1.75, 0.75, 0.25),
+        ("A", "2025-26", 1, 1, 1, 1, 1, 1.0, 1.0, 0.0),
+    ], columns=["team", "season", "matchday", "matches", "points", "goals_for",
+                "goals_against", "xg_for", "xg_against", "finishing"])
+    expected = expected.set_index(["team", "season", "matchday"])
+
+    actual = window(form, 2).loc[expected.index]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_index_type=False)
+
+
+def test_first_matchdays_only_count_played_matches(form):
+    assert window(form, 3)["matches"].tolist() == [1, 2, 3, 3, 1, 2, 3, 1]
@@ -0,0 +1,22 @@
+# --------------------------------------------------------------
+#   PROVES — pipeline: codi que forma part de l'empremta de cada etapa
+# --------------------------------------------------------------
+
+import pipeline
+
+
+def test_code_files_follow_imports_transitively():
+    # prepare_teams_data → layout → dtypes
+    assert "dtypes.py" in pipeline.code_files("teams")
+    # prepare_standings_data → prepare_form_data → prepare_section3_data → parallel
+    assert {"prepare_section3_data.py", "parallel.py"} <= set(pipeline.code_files("standings"))
+
+
+def test_code_files_include_config():
+    files = pipeline.code_files("section5")
+    assert files[0] == "prepare_section5_data.py"
+    assert "style_rules.json" in files
+
+
+def test_editing_a_shared_module_invalidates_its_users():
+    assert {"teams", "section5", "bundles"} <= pipeline.stages_for_files(["fbref_io.py"])
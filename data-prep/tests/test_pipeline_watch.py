@@ -0,0 +1,44 @@
+# --------------------------------------------------------------
+#   PROVES — pipeline --watch: recàrrega del codi canviat
+# --------------------------------------------------------------
+#
+#   Mòduls de joguina en un data-prep/ temporal: `stage` importa un nom
+#   de `shared`, com les etapes fan amb teams.py o layout.py.
+#
+
+import importlib
+import sys
+
+import pytest
+
+import pipeline
+
+
+@pytest.fixture
+def modules(empty_workspace, monkeypatch):
+    monkeypatch.setattr(pipeline, "BASE_DIR", empty_workspace)
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(empty_workspace))
+    (empty_workspace / "shared.py").write_text("VALUE = 1\n")
+    (empty_workspace / "stage.py").write_text("from shared import VALUE\n")
+    (empty_workspace / "other.py").write_text("X = 0\n")
+    for name in ("shared", "stage", "other"):
+        importlib.import_module(name)
+    yield empty_workspace
+    for name in ("shared", "stage", "other"):
+        sys.modules.pop(name, None)
+
+
+def test_changed_module_and_its_importers_are_reloaded(modules):
+    (modules / "shared.py").write_text("VALUE = 22\n")
+
+    assert pipeline.reload_modules(["shared.py"]) == ["shared", "stage"]
+    assert sys.modules["stage"].VALUE == 22
+
+
+def test_unrelated_changes_reload_nothing(modules):
+    assert pipeline.reload_modules(["laliga/2022/matches.csv"]) == []
+
+
+def test_code_change_selects_the_stages_that_use_it():
+    assert pipeline.stages_for_files(["styles.py"]) == {"section5"}
@@ -0,0 +1,81 @@
+# --------------------------------------------------------------
+#   PROVES — secció 3: mode per lots contra --workers, --append i --stream
+# --------------------------------------------------------------
+#
+#   Sobre les dades de LaLiga del repo, cada mode alternatiu ha de
+#   publicar la mateixa taula que una reconstrucció completa per lots.
+#
+
+import pandas as pd
+import pytest
+
+import prepare_section3_data as section3
+from layout import league_path
+
+SEASON_DIR = "data_raw/laliga/2022"
+
+
+def build(*argv) -> pd.DataFrame:
+    section3.main(list(argv))
+    return pd.read_csv(league_path("laliga", section3.OUTPUT_NAME))
+
+
+def assert_same_table(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True), expected.reset_index(drop=True), check_exact=False
+    )
+
+
+@pytest.fixture
+def batch(workspace) -> pd.DataFrame:
+    return build()
+
+
+def hold_back(workspace, predicate) -> tuple:
+    """Treu del calendari de 2022 els partits que compleixen predicate; retorna (fitxer, original)."""
+    path = workspace / SEASON_DIR / "matches.csv"
+    original = path.read_bytes()
+    matches = pd.read_csv(path)
+    matches[~predicate(matches)].to_csv(path, index=False)
+    return path, original
+
+
+def test_workers_match_batch(workspace, batch):
+    assert_same_table(build("--workers", "2"), batch)
+
+
+def test_append_in_matchday_order_matches_batch(workspace, batch):
+    path, original = hold_back(workspace, lambda m: m["week"] > 30)
+    build()
+    path.write_bytes(original)
+
+    assert_same_table(build("--append"), batch)
+
+
+def test_append_postponed_match_matches_batch(workspace, batch):
+    # Un partit de la jornada 10 que arriba quan ja hi ha la jornada 20
+    def postponed(m):
+        return (m["week"] > 20) | (m.index == m.index[m["week"] == 10][0])
+
+    path, original = hold_back(workspace, postponed)
+    build()
+    path.write_bytes(original)
+
+    appended = build("--append")
+    assert_same_table(appended, batch)
+    for _, rows in appended.groupby(["season", "team_id"]):
+        assert rows["matchday"].is_monotonic_increasing
+
+
+def test_stream_matches_batch(workspace, batch):
+    assert_same_table(build("--stream", "--chunksize", "37"), batch)
+
+
+def test_stream_postponed_match_matches_batch(workspace):
+    # Un partit de la jornada 10 mogut al final del fitxer, en un altre bloc
+    path = workspace / SEASON_DIR / "matches.csv"
+    matches = pd.read_csv(path)
+    late = matches.index[(matches["week"] == 10) & matches["score"].notna()][0]
+    matches.loc[[*matches.index.drop(late), late]].to_csv(path, index=False)
+
+    assert_same_table(build("--stream", "--chunksize", "37"), build())
@@ -0,0 +1,32 @@
+# --------------------------------------------------------------
+#   PROVES — secció 4: escaladors per temporada
+# --------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepare_section4_data import SCALERS
+
+# 2020: tres equips; 2021: un sol equip; 2022: columna constant
+VALUES = pd.DataFrame({"xg": [1.0, 2.0, 3.0, 1.5, 2.0, 2.0]})
+SEASONS = pd.Series(["2020", "2020", "2020", "2021", "2022", "2022"])
+
+
+@pytest.mark.parametrize("name", list(SCALERS))
+def test_no_nan_for_single_team_or_constant_seasons(name):
+    _, scaler = SCALERS[name]
+    scaled = scaler(VALUES, SEASONS)["xg"]
+    assert not scaled.isna().any()
+
+
+def test_zscore_degenerate_seasons_are_zero():
+    _, scaler = SCALERS["zscore"]
+    scaled = scaler(VALUES, SEASONS)["xg"].to_numpy()
+    np.testing.assert_allclose(scaled, [-1.0, 0.0, 1.0, 0.0, 0.0, 0.0])
+
+
+def test_missing_values_stay_missing():
+    values = pd.DataFrame({"xg": [np.nan]})
+    for name, (_, scaler) in SCALERS.items():
+        assert scaler(values, pd.Series(["2021"]))["xg"].isna().all(), name
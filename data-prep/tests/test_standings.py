@@ -0,0 +1,53 @@
+# --------------------------------------------------------------
+#   PROVES — classificació: desempats i jornades sense jugar
+# --------------------------------------------------------------
+#
+#   Dues jornades calculades a mà. A la primera, Alpha i Gamma empaten
+#   a punts i diferència de gols (decideixen els gols a favor), Beta i
+#   Epsilon empaten en tot (decideix el nom) i Beta queda per sota de
+#   Delta tot i fer més gols. Delta no juga la segona jornada.
+#
+
+import pandas as pd
+import pytest
+
+from prepare_standings_data import Standings, rank_standings
+
+COLUMNS = ["season", "matchday", "team_id", "team", "points", "goals_for", "goals_against"]
+
+TEAM_ROWS = pd.DataFrame([
+    ("2024-25", 1, 1, "Delta", 3, 1, 0),
+    ("2024-25", 1, 2, "Alpha", 3, 3, 1),
+    ("2024-25", 1, 3, "Gamma", 3, 2, 0),
+    ("2024-25", 1, 4, "Beta", 1, 4, 4),
+    ("2024-25", 1, 5, "Epsilon", 1, 4, 4),
+    ("2024-25", 2, 2, "Alpha", 0, 0, 1),
+    ("2024-25", 2, 3, "Gamma", 1, 0, 0),
+    ("2024-25", 2, 4, "Beta", 3, 3, 0),
+    ("2024-25", 2, 5, "Epsilon", 1, 1, 1),
+], columns=COLUMNS)
+
+
+@pytest.fixture
+def standings():
+    return Standings(rank_standings(TEAM_ROWS))
+
+
+def test_tiebreak_order(standings):
+    table = standings.at("2024-25", 1)
+    assert table["team"].tolist() == ["Alpha", "Gamma", "Delta", "Beta", "Epsilon"]
+    assert table["position"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_team_without_match_carries_its_totals(standings):
+    table = standings.at("2024-25", 2)
+    assert table["team"].tolist() == ["Beta", "Gamma", "Alpha", "Delta", "Epsilon"]
+
+    delta = table.set_index("team").loc["Delta"]
+    assert (delta["played"], delta["points"], delta["goal_diff"], delta["goals_for"]) == (1, 3, 1, 1)
+    assert (delta["position"], delta["position_change"]) == (4, -1)
+
+
+def test_unknown_matchday_fails(standings):
+    with pytest.raises(KeyError, match="jornada 3"):
+        standings.at("2024-25", 3)
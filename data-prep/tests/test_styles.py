@@ -0,0 +1,41 @@
+# --------------------------------------------------------------
+#   PROVES — estils k-means: etiquetes estables
+# --------------------------------------------------------------
+
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from layout import league_path
+from styles import classify_clusters
+
+KMEANS = ["--style", "kmeans", "--clusters", "4", "--seed", "0"]
+
+
+@pytest.fixture
+def points() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(rng.random((60, 3)), columns=["a_norm", "b_norm", "c_norm"])
+
+
+def test_same_seed_same_labels(points):
+    labels = classify_clusters(points, k=3, seed=1)
+    assert labels.equals(classify_clusters(points, k=3, seed=1))
+
+    # L'ordre de les files no canvia la inicialització
+    shuffled = points.sample(frac=1, random_state=3)
+    assert classify_clusters(shuffled, k=3, seed=1).sort_index().equals(labels)
+
+
+def test_seasons_run_keeps_published_labels(workspace):
+    for number in range(1, 5):
+        importlib.import_module(f"prepare_section{number}_data").main([])
+    section5 = importlib.import_module("prepare_section5_data")
+    path = league_path("laliga", section5.OUTPUT_FILE)
+
+    section5.main(KMEANS)
+    full = pd.read_csv(path)
+    section5.main([*KMEANS, "--seasons", "2023"])
+    pd.testing.assert_frame_equal(pd.read_csv(path), full)
@@ -0,0 +1,44 @@
+# --------------------------------------------------------------
+#   PROVES — dimensió d'equips: noms repetits entre lligues
+# --------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from teams import TeamDimension, build_teams
+
+# Dos clubs diferents amb el mateix nom normalitzat, un a cada lliga
+STANDARD = pd.DataFrame({
+    "league": ["laliga", "premier"],
+    "season": ["2023", "2023"],
+    "squad_id": ["aaaa0001", "bbbb0002"],
+    "team": ["Sporting", "Sporting"],
+})
+SCHEDULE = pd.DataFrame({
+    "league": ["laliga", "premier"],
+    "season": ["2023", "2023"],
+    "name": ["Sporting", "Sporting"],
+})
+
+
+@pytest.fixture
+def teams():
+    return TeamDimension(build_teams(STANDARD, SCHEDULE))
+
+
+def test_same_name_resolves_within_each_league(teams):
+    names = pd.Series(["Sporting"])
+    laliga = teams.ids_from_names(names, "laliga").item()
+    premier = teams.ids_from_names(names, "premier").item()
+    assert laliga != premier
+    assert teams.ids_from_squads(pd.Series(["aaaa0001"])).item() == laliga
+
+
+def test_ambiguous_name_without_league_fails(teams):
+    with pytest.raises(ValueError, match="ambigu"):
+        teams.ids_from_names(pd.Series(["Sporting"]))
+
+
+def test_name_from_another_league_is_unknown(teams):
+    with pytest.raises(ValueError, match="sense correspondència"):
+        teams.ids_from_names(pd.Series(["Sporting"]), "seriea")
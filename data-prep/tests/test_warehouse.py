@@ -0,0 +1,78 @@
+# --------------------------------------------------------------
+#   PROVES — magatzem SQLite: consultes, particions i seccions
+# --------------------------------------------------------------
+
+import shutil
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+import warehouse
+
+
+def loaded_seasons() -> dict[str, set[str]]:
+    with closing(sqlite3.connect(warehouse.WAREHOUSE_FILE)) as conn:
+        return {
+            table: {season for (season,) in conn.execute(f"SELECT DISTINCT season FROM {table}")}
+            for table in ["team_stats", "matches", "partitions"]
+        }
+
+
+def test_query_without_warehouse_fails_without_creating_it(empty_workspace):
+    with pytest.raises(FileNotFoundError, match="executa abans warehouse.py"):
+        warehouse.main(["--query", "SELECT 1"])
+    assert not warehouse.WAREHOUSE_FILE.exists()
+
+
+def test_removed_season_is_pruned(workspace):
+    warehouse.main([])
+    shutil.rmtree(workspace / "data_raw" / "laliga" / "2022")
+
+    # Una càrrega parcial d'una altra temporada no la toca
+    warehouse.main(["--seasons", "2023"])
+    assert all("2022-23" in seasons for seasons in loaded_seasons().values())
+
+    warehouse.main([])
+    assert all("2022-23" not in seasons for seasons in loaded_seasons().values())
+    assert all("2023-24" in seasons for seasons in loaded_seasons().values())
+
+
+def test_teams_keep_their_leagues_on_an_old_warehouse(workspace):
+    # Magatzem d'abans de la columna leagues
+    warehouse.WAREHOUSE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(warehouse.WAREHOUSE_FILE)) as conn:
+        conn.execute("CREATE TABLE teams (team_id INTEGER PRIMARY KEY, squad_id TEXT UNIQUE, "
+                     "team TEXT NOT NULL, aliases TEXT)")
+
+    warehouse.main([])
+    with closing(sqlite3.connect(warehouse.WAREHOUSE_FILE)) as conn:
+        (leagues,) = conn.execute("SELECT leagues FROM teams WHERE team = 'Barcelona'").fetchone()
+    assert leagues == "laliga"
+
+
+def test_section_reload_rewrites_only_changed_seasons(tmp_path):
+    df = pd.DataFrame({
+        "team_id": [1, 1, 2],
+        "season": ["2022-23", "2023-24", "2023-24"],
+        "goals": [50, 60, 70],
+    })
+    with closing(warehouse.connect(tmp_path / "warehouse.sqlite")) as conn:
+        def rows():
+            return conn.execute(
+                "SELECT season, goals FROM section1_overview ORDER BY season, team_id"
+            ).fetchall()
+
+        assert warehouse.load_section(conn, "section1_overview.csv", "laliga", df) == [
+            "2022-23", "2023-24"
+        ]
+        assert warehouse.load_section(conn, "section1_overview.csv", "laliga", df) == []
+
+        df.loc[1, "goals"] = 61
+        assert warehouse.load_section(conn, "section1_overview.csv", "laliga", df) == ["2023-24"]
+        assert rows() == [("2022-23", 50), ("2023-24", 61), ("2023-24", 70)]
+
+        # Una temporada que ja no hi és s'esborra sense reescriure les altres
+        assert warehouse.load_section(conn, "section1_overview.csv", "laliga", df.iloc[1:]) == []
+        assert rows() == [("2023-24", 61), ("2023-24", 70)]
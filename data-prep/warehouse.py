@@ -0,0 +1,439 @@
+# --------------------------------------------------------------
+#   MAGATZEM SQLITE — data_processed/warehouse.sqlite
+# --------------------------------------------------------------
+#
+#   Carrega en un sol fitxer SQLite, amb índexs, les dades en brut i
+#   les taules de les seccions, per poder fer consultes ad hoc sense
+#   tornar a executar cap script:
+#
+#       teams        → dimensió d'equips (teams.csv)
+#       team_stats   → taules d'equip de FBref en format llarg
+#                      (league, season, team_id, topic, stat, value)
+#       matches      → calendaris, amb els equips resolts a team_id
+#       team_matches → vista amb dues files per partit (local i visitant)
+#       sectionN_*   → taules publicades per cada secció, amb la lliga
+#       form_rolling → forma per finestres (prepare_form_data.py)
+#       standings    → classificació a cada jornada (prepare_standings_data.py)
+#       partitions   → SHA-256 dels fitxers carregats per partició
+#       section_partitions → SHA-256 del contingut de cada (taula de
+#                      secció, lliga, temporada) carregat
+#
+#   Cada partició (lliga, temporada) es substitueix dins d'una sola
+#   transacció, i les que tenen els mateixos fitxers que l'última
+#   càrrega no es tornen a llegir. A les taules de secció només es
+#   reescriuen les temporades amb contingut diferent. Les que ja no són
+#   a data_raw/ (i les lligues que ja no tenen una taula de secció)
+#   s'esborren. Les seccions es continuen calculant amb pandas; aquí se'n
+#   desa el resultat (vistes materialitzades).
+#
+#   Ús (des de data-prep/):
+#       python warehouse.py                           # carrega / refresca
+#       python warehouse.py --seasons 2024            # només aquesta temporada
+#       python warehouse.py --query "SELECT ..."      # consulta ad hoc
+#
+
+import argparse
+import hashlib
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from dtypes import widen
+from fbref_io import file_hash, read_fbref_csv
+from instrumentation import instrument
+from layout import (
+    PROCESSED_DIR, Partition, add_partition_args, discover, processed_leagues,
+    season_label, shared_table,
+)
+from prepare_section3_data import parse_scores
+from teams import shared_teams
+
+# ------------------------------------------------------------
+# PATHS
+# ------------------------------------------------------------
+
+WAREHOUSE_FILE = PROCESSED_DIR / "warehouse.sqlite"
+
+TEAM_TOPICS = ["standard", "passing", "possession", "defense", "shooting", "misc"]
+
+# etapa → taula publicada (i taula SQLite amb el mateix nom, sense .csv)
+SECTIONS = {
+    "section1": "section1_overview.csv",
+    "section2": "section2_efficiency.csv",
+    "section3": "section3_evolution.csv",
+    "section4": "section4_style.csv",
+    "section5": "section5_summary.csv",
+    "form": "form_rolling.csv",
+    "standings": "standings.csv",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_id  INTEGER PRIMARY KEY,
+    squad_id TEXT UNIQUE,
+    team     TEXT NOT NULL,
+    leagues  TEXT,
+    aliases  TEXT
+);
+
+CREATE TABLE IF NOT EXISTS team_stats (
+    league  TEXT    NOT NULL,
+    season  TEXT    NOT NULL,
+    team_id INTEGER NOT NULL,
+    topic   TEXT    NOT NULL,
+    stat    TEXT    NOT NULL,
+    value   REAL,
+    PRIMARY KEY (league, season, team_id, topic, stat)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS team_stats_by_stat ON team_stats (topic, stat, team_id, season);
+
+CREATE TABLE IF NOT EXISTS matches (
+    league       TEXT    NOT NULL,
+    season       TEXT    NOT NULL,
+    game_id      TEXT,
+    matchday     INTEGER NOT NULL,
+    date         TEXT,
+    home_team_id INTEGER NOT NULL,
+    away_team_id INTEGER NOT NULL,
+    home_goals   INTEGER,
+    away_goals   INTEGER,
+    home_xg      REAL,
+    away_xg      REAL
+);
+CREATE INDEX IF NOT EXISTS matches_by_partition ON matches (league, season, matchday);
+CREATE INDEX IF NOT EXISTS matches_by_home ON matches (season, home_team_id, matchday);
+CREATE INDEX IF NOT EXISTS matches_by_away ON matches (season, away_team_id, matchday);
+
+CREATE VIEW IF NOT EXISTS team_matches AS
+    SELECT league, season, game_id, matchday, date, home_team_id AS team_id,
+           away_team_id AS opponent_id, 1 AS home,
+           home_goals AS goals_for, away_goals AS goals_against,
+           home_xg AS xg_for, away_xg AS xg_against
+    FROM matches
+    UNION ALL
+    SELECT league, season, game_id, matchday, date, away_team_id, home_team_id, 0,
+           away_goals, home_goals, away_xg, home_xg
+    FROM matches;
+
+CREATE TABLE IF NOT EXISTS partitions (
+    league    TEXT NOT NULL,
+    season    TEXT NOT NULL,
+    file      TEXT NOT NULL,
+    sha256    TEXT NOT NULL,
+    loaded_at REAL NOT NULL,
+    PRIMARY KEY (league, season, file)
+);
+
+CREATE TABLE IF NOT EXISTS section_partitions (
+    section   TEXT NOT NULL,
+    league    TEXT NOT NULL,
+    season    TEXT NOT NULL,
+    sha256    TEXT NOT NULL,
+    loaded_at REAL NOT NULL,
+    PRIMARY KEY (section, league, season)
+);
+"""
+
+# Índexs de les taules de secció (es creen quan la taula ja existeix)
+SECTION_INDEXES = {
+    "section3_evolution": ["season", "team_id", "matchday"],
+    "form_rolling": ["season", "team_id", "matchday", "window"],
+    "standings": ["league", "season", "matchday", "position"],
+}
+DEFAULT_SECTION_INDEX = ["league", "season", "team_id"]
+
+
+# ------------------------------------------------------------
+# UTILITATS
+# ------------------------------------------------------------
+
+def connect(path: Path = WAREHOUSE_FILE) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    # Magatzems creats abans que teams tingués la columna leagues
+    if "leagues" not in {row[1] for row in conn.execute("PRAGMA table_info(teams)")}:
+        conn.execute("ALTER TABLE teams ADD COLUMN leagues TEXT")
+    return conn
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_type(dtype) -> str:
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def ensure_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame, index_cols) -> bool:
+    """Crea la taula si no existeix (retorna True) o hi afegeix les columnes noves de df."""
+    existing = [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")]
+    if not existing:
+        cols = ", ".join(f"{quote(c)} {sql_type(t)}" for c, t in df.dtypes.items())
+        conn.execute(f"CREATE TABLE {quote(table)} ({cols})")
+        conn.execute(
+            f"CREATE INDEX {quote(table + '_idx')} ON {quote(table)} "
+            f"({', '.join(quote(c) for c in index_cols)})"
+        )
+        return True
+    for col, dtype in df.dtypes.items():
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(col)} {sql_type(dtype)}")
+    return False
+
+
+def insert(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    df = widen(df)
+    df = df.astype(object).where(df.notna(), None)
+    cols = ", ".join(quote(c) for c in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    conn.executemany(
+        f"INSERT INTO {quote(table)} ({cols}) VALUES ({marks})",
+        df.itertuples(index=False, name=None),
+    )
+
+
+def partition_files(p: Partition) -> list[Path]:
+    return [p.raw(t) for t in [*TEAM_TOPICS, "matches"] if p.raw(t).exists()]
+
+
+def is_loaded(conn: sqlite3.Connection, p: Partition, hashes: dict[str, str]) -> bool:
+    """La partició ja és al magatzem amb exactament aquests fitxers."""
+    rows = conn.execute(
+        "SELECT file, sha256 FROM partitions WHERE league = ? AND season = ?",
+        (p.league, p.season),
+    ).fetchall()
+    return dict(rows) == hashes
+
+
+def season_hashes(df: pd.DataFrame) -> dict[str, str]:
+    """SHA-256 de les columnes i els valors de cada temporada d'una taula de secció."""
+    header = ",".join(df.columns).encode("utf-8")
+    hashes = {}
+    for season, rows in df.groupby("season", observed=True, sort=False):
+        digest = hashlib.sha256(header)
+        digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        hashes[str(season)] = digest.hexdigest()
+    return hashes
+
+
+# ------------------------------------------------------------
+# CÀRREGA
+# ------------------------------------------------------------
+
+def team_stats(p: Partition, teams) -> pd.DataFrame:
+    """Columnes numèriques de les taules d'equip d'una partició, en format llarg."""
+    frames = []
+    for topic in TEAM_TOPICS:
+        if not p.raw(topic).exists():
+            continue
+        df = read_fbref_csv(p.raw(topic))
+        values = df.select_dtypes("number")
+        values.insert(0, "team_id", teams.ids_from_squads(df["squad_id"]).astype("int64"))
+        long = values.melt(id_vars="team_id", var_name="stat", value_name="value")
+        frames.append(long.assign(topic=topic))
+    if not frames:
+        return pd.DataFrame(columns=["league", "season", "team_id", "topic", "stat", "value"])
+    out = pd.concat(frames, ignore_index=True).assign(league=p.league, season=p.season)
+    return out[["league", "season", "team_id", "topic", "stat", "value"]]
+
+
+def schedule(p: Partition, teams) -> pd.DataFrame:
+    """Calendari d'una partició amb els equips resolts a team_id."""
+    df = pd.read_csv(p.raw("matches"))
+    goals = parse_scores(df["score"])
+    return pd.DataFrame({
+        "league": p.league,
+        "season": p.season,
+        "game_id": df["game_id"].astype(str) if "game_id" in df.columns else None,
+        "matchday": df["week"].astype("int64"),
+        "date": df["date"].astype(str) if "date" in df.columns else None,
+        "home_team_id": teams.ids_from_names(df["home_team"], p.league).astype("int64"),
+        "away_team_id": teams.ids_from_names(df["away_team"], p.league).astype("int64"),
+        "home_goals": goals["home_goals"].astype("Int64"),
+        "away_goals": goals["away_goals"].astype("Int64"),
+        "home_xg": df["home_xg"],
+        "away_xg": df["away_xg"],
+    })
+
+
+def load_partition(conn: sqlite3.Connection, p: Partition, teams, hashes: dict[str, str]) -> int:
+    """Substitueix la partició sencera en una sola transacció. Retorna les files carregades."""
+    stats = team_stats(p, teams)
+    matches = schedule(p, teams) if p.raw("matches").exists() else None
+
+    with conn:
+        key = (p.league, p.season)
+        conn.execute("DELETE FROM team_stats WHERE league = ? AND season = ?", key)
+        conn.execute("DELETE FROM matches WHERE league = ? AND season = ?", key)
+        conn.execute("DELETE FROM partitions WHERE league = ? AND season = ?", key)
+
+        insert(conn, "team_stats", stats)
+        if matches is not None:
+            insert(conn, "matches", matches)
+        conn.executemany(
+            "INSERT INTO partitions VALUES (?, ?, ?, ?, ?)",
+            [(p.league, p.season, file, sha, time.time()) for file, sha in hashes.items()],
+        )
+
+    return len(stats) + (len(matches) if matches is not None else 0)
+
+
+def prune_partitions(conn: sqlite3.Connection, found: list[Partition],
+                     leagues=None, seasons=None) -> list[tuple[str, str]]:
+    """
+    Esborra les particions carregades que ja no són a data_raw/, dins de
+    l'abast de la càrrega (leagues / seasons). Retorna les esborrades.
+    """
+    labels = {season_label(y) for y in seasons} if seasons else None
+    present = {(p.league, p.season) for p in found}
+    loaded = conn.execute("SELECT DISTINCT league, season FROM partitions").fetchall()
+    stale = sorted(
+        (league, season) for league, season in loaded
+        if (league, season) not in present
+        and (not leagues or league in leagues)
+        and (labels is None or season in labels)
+    )
+
+    with conn:
+        for table in ["team_stats", "matches", "partitions"]:
+            conn.executemany(f"DELETE FROM {table} WHERE league = ? AND season = ?", stale)
+    return stale
+
+
+def prune_sections(conn: sqlite3.Connection, table: str, leagues: list[str]) -> None:
+    """Esborra d'una taula de secció les lligues que ja no la tenen a data_processed/."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+        return
+    marks = ", ".join("?" for _ in leagues)
+    with conn:
+        conn.execute(f"DELETE FROM {quote(table)} WHERE league NOT IN ({marks})", leagues)
+        conn.execute(
+            f"DELETE FROM section_partitions WHERE section = ? AND league NOT IN ({marks})",
+            (table, *leagues),
+        )
+
+
+def load_section(conn: sqlite3.Connection, name: str, league: str,
+                 df: pd.DataFrame, seasons=None) -> list[str]:
+    """
+    Substitueix a la taula d'una secció les temporades de la lliga que
+    han canviat des de l'última càrrega, i n'esborra les que ja no hi són
+    (dins de `seasons`, si s'indiquen). Retorna les temporades reescrites.
+    """
+    table = Path(name).stem
+    df = df.assign(league=league)[["league", *df.columns]]
+    index_cols = SECTION_INDEXES.get(table, DEFAULT_SECTION_INDEX)
+    hashes = season_hashes(df)
+    labels = {season_label(y) for y in seasons} if seasons else None
+
+    with conn:
+        created = ensure_table(conn, table, df, index_cols)
+        loaded = {} if created else dict(conn.execute(
+            "SELECT season, sha256 FROM section_partitions WHERE section = ? AND league = ?",
+            (table, league),
+        ))
+        if not created and not loaded:
+            # Taula carregada sense hashos: es reescriu tota la lliga
+            scope = f" AND season IN ({', '.join('?' for _ in labels)})" if labels else ""
+            conn.execute(
+                f"DELETE FROM {quote(table)} WHERE league = ?{scope}", (league, *(labels or []))
+            )
+
+        changed = [season for season, sha in hashes.items() if loaded.get(season) != sha]
+        stale = [season for season in loaded
+                 if season not in hashes and (labels is None or season in labels)]
+        keys = [(league, season) for season in [*changed, *stale]]
+        conn.executemany(f"DELETE FROM {quote(table)} WHERE league = ? AND season = ?", keys)
+        conn.executemany(
+            "DELETE FROM section_partitions WHERE section = ? AND league = ? AND season = ?",
+            [(table, *key) for key in keys],
+        )
+
+        insert(conn, table, df[df["season"].astype(str).isin(changed)])
+        conn.executemany(
+            "INSERT INTO section_partitions VALUES (?, ?, ?, ?, ?)",
+            [(table, league, season, hashes[season], time.time()) for season in changed],
+        )
+    return changed
+
+
+def load_teams(conn: sqlite3.Connection, teams) -> None:
+    table = teams.table[["team_id", "squad_id", "team", "leagues", "aliases"]]
+    with conn:
+        conn.execute("DELETE FROM teams")
+        insert(conn, "teams", table.assign(team_id=table["team_id"].astype("int64")))
+
+
+# ------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------
+
+def main(argv=None, shared=None):
+    parser = argparse.ArgumentParser(description="Magatzem SQLite de dades i seccions")
+    parser.add_argument("--query", default=None,
+                        help="executa una consulta SQL sobre el magatzem i en mostra el resultat")
+    parser.add_argument("--force", action="store_true",
+                        help="torna a carregar les particions encara que no hagin canviat")
+    add_partition_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.query:
+        if not WAREHOUSE_FILE.exists():
+            raise FileNotFoundError(f"❌ No existeix {WAREHOUSE_FILE}: executa abans warehouse.py")
+        with closing(sqlite3.connect(WAREHOUSE_FILE)) as conn:
+            start = time.perf_counter()
+            result = pd.read_sql_query(args.query, conn)
+            elapsed = time.perf_counter() - start
+        print(result.to_string(index=False))
+        print(f"\n⏱️  {len(result)} files en {elapsed * 1000:.1f} ms")
+        return result
+
+    with instrument("warehouse") as run, closing(connect()) as conn:
+        teams = shared_teams(shared)
+        load_teams(conn, teams)
+
+        # ------------------------------------------------------------
+        # DADES EN BRUT, PARTICIÓ A PARTICIÓ
+        # ------------------------------------------------------------
+        partitions = discover([*TEAM_TOPICS, "matches"], args.leagues, args.seasons)
+        for league, season in prune_partitions(conn, partitions, args.leagues, args.seasons):
+            print(f"🗑️  {league}/{season}: ja no és a data_raw/, s'esborra")
+
+        for p in partitions:
+            files = partition_files(p)
+            hashes = {f.name: file_hash(f) for f in files}
+            if not args.force and is_loaded(conn, p, hashes):
+                print(f"⏭️  {p}: sense canvis")
+                continue
+            rows = load_partition(conn, p, teams, hashes)
+            for f in files:
+                run.input(f)
+            print(f"🗄️  {p}: {rows} files")
+
+        # ------------------------------------------------------------
+        # TAULES DE LES SECCIONS
+        # ------------------------------------------------------------
+        for stage, name in SECTIONS.items():
+            leagues = processed_leagues(name, args.leagues)
+            if not args.leagues:
+                prune_sections(conn, Path(name).stem, leagues)
+            for league in leagues:
+                df = shared_table(shared, stage, name, league, args.seasons, run)
+                load_section(conn, name, league, df, args.seasons)
+
+        conn.execute("PRAGMA optimize")
+        run.output(WAREHOUSE_FILE)
+
+    print(f"✅ {WAREHOUSE_FILE} actualitzat")
+
+
+if __name__ == "__main__":
+    main()
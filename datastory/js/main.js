@@ -27,10 +27,20 @@ const tooltip = d3.select('#tooltip');
 // CÀRREGA DE DADES
 // ============================================
 
-// SECCIÓ 1
-async function loadSection1Data() {
-    const data = await d3.csv('data/section1_overview.csv');
+// Si existeix data/bundles/index.json (export_bundles.py), les dades es
+// carreguen a demanda: per a les seccions 1-3, el fragment de la temporada
+// seleccionada, i per a les seccions 4 i 5, el de l'equip seleccionat.
+// Si no hi és, es llegeixen els CSV sencers.
 
+const BUNDLE_DIR = 'data/bundles';
+
+const Bundles = {
+    index: null,
+    requests: new Map() // ruta del fragment → promesa (cada fragment es demana un sol cop)
+};
+
+// SECCIÓ 1
+function parseSection1(data) {
     data.forEach(d => {
         d.xGPerGame = +d.xGPerGame;
         d.xGAPerGame = +d.xGAPerGame;
@@ -38,42 +48,47 @@ async function loadSection1Data() {
         // La mètrica clau per a l'eix X
         d.performance = d.xGPerGame - d.xGAPerGame;
     });
+    return data;
+}
+
+async function loadSection1Data() {
+    const data = parseSection1(await d3.csv('data/section1_overview.csv'));
 
     AppState.data.allSeasons = data;
     AppState.data.teams = [...new Set(data.map(d => d.team))].sort();
 }
 
 // SECCIÓ 2
-async function loadSection2Data() {
-    const data = await d3.csv('data/section2_efficiency.csv');
-
+function parseSection2(data) {
     data.forEach(d => {
         d.xG = +d.xG;
         d.goals = +d.goals;
         d.efficiency = d.goals - d.xG;
     });
+    return data;
+}
 
-    AppState.data.section2 = data;
+async function loadSection2Data() {
+    AppState.data.section2 = parseSection2(await d3.csv('data/section2_efficiency.csv'));
 }
 
 // SECCIÓ 3
-async function loadSection3Data() {
-    const data = await d3.csv('data/section3_evolution.csv');
-
+function parseSection3(data) {
     data.forEach(d => {
         d.matchday = +d.matchday;
         d.points_cum = +d.points_cum;
         d.goal_diff_cum = +d.goal_diff_cum;
         d.xg_diff_cum = +d.xg_diff_cum;
     });
+    return data;
+}
 
-    AppState.data.section3 = data;
+async function loadSection3Data() {
+    AppState.data.section3 = parseSection3(await d3.csv('data/section3_evolution.csv'));
 }
 
 // SECCIÓ 4
-async function loadSection4Data() {
-    const data = await d3.csv('data/section4_style.csv');
-
+function parseSection4(data) {
     // Es converteixen totes les mètriques a número
     data.forEach(d => {
         Object.keys(d).forEach(k => {
@@ -82,20 +97,115 @@ async function loadSection4Data() {
             }
         });
     });
+    return data;
+}
 
-    AppState.data.section4 = data;
+async function loadSection4Data() {
+    AppState.data.section4 = parseSection4(await d3.csv('data/section4_style.csv'));
 }
 
 // SECCIÓ 5
-async function loadSection5Data() {
-    const data = await d3.csv('data/section5_summary.csv');
-
+function parseSection5(data) {
     data.forEach(d => {
         d.performance_xg = +d.performance_xg;
         d.efficiency = +d.efficiency;
     });
+    return data;
+}
+
+async function loadSection5Data() {
+    AppState.data.section5 = parseSection5(await d3.csv('data/section5_summary.csv'));
+}
+
+// PAQUETS (data/bundles)
+function columnsToRows(table) {
+    const columns = Object.keys(table);
+    const n = columns.length ? table[columns[0]].length : 0;
+    return d3.range(n).map(i => Object.fromEntries(columns.map(c => [c, table[c][i]])));
+}
+
+async function fetchShard(shard) {
+    // El hash al final de l'URL permet desar el fragment a la memòria cau
+    const response = await fetch(`${BUNDLE_DIR}/${shard.path}?v=${shard.hash}`);
+    if (!response.ok) {
+        throw new Error(`No s'ha pogut carregar ${shard.path} (${response.status})`);
+    }
+
+    // Fragments precomprimits: si el servidor no els ha servit amb
+    // Content-Encoding: gzip, es descomprimeixen al navegador
+    let body = response.body;
+    if (response.headers.get('Content-Encoding') !== 'gzip') {
+        body = body.pipeThrough(new DecompressionStream('gzip'));
+    }
+    return new Response(body).json();
+}
+
+function loadShard(shard, append) {
+    if (!Bundles.requests.has(shard.path)) {
+        Bundles.requests.set(shard.path, fetchShard(shard).then(append));
+    }
+    return Bundles.requests.get(shard.path);
+}
+
+async function ensureSeasonData(season) {
+    const shards = Bundles.index && Bundles.index.shards[season];
+    if (!shards) return;
+
+    await Promise.all([
+        loadShard(shards.section1, t => AppState.data.allSeasons.push(...parseSection1(columnsToRows(t)))),
+        loadShard(shards.section2, t => AppState.data.section2.push(...parseSection2(columnsToRows(t)))),
+        loadShard(shards.section3, t => AppState.data.section3.push(...parseSection3(columnsToRows(t))))
+    ]);
+}
+
+async function ensureTeamData(season, team) {
+    const shards = Bundles.index && Bundles.index.shards[season];
+    const shard = shards && shards.teams[team];
+    if (!shard) return;
+
+    await loadShard(shard, t => {
+        AppState.data.section4.push(...parseSection4(columnsToRows(t.section4)));
+        AppState.data.section5.push(...parseSection5(columnsToRows(t.section5)));
+    });
+}
+
+// Dades que necessita la selecció actual (temporada i equip)
+async function ensureSelectionData() {
+    await ensureSeasonData(AppState.selectedSeason);
+    if (AppState.selectedTeam) {
+        await ensureTeamData(AppState.selectedSeason, AppState.selectedTeam);
+    }
+}
+
+async function loadData() {
+    let index = null;
+    if ('DecompressionStream' in window) {
+        try {
+            index = await d3.json(`${BUNDLE_DIR}/index.json`, { cache: 'no-cache' });
+        } catch (e) {
+            index = null;
+        }
+    }
+
+    if (!index) {
+        // Sense paquets: CSV sencers
+        await loadSection1Data();
+        await loadSection2Data();
+        await loadSection3Data();
+        await loadSection4Data();
+        await loadSection5Data();
+        return;
+    }
+
+    Bundles.index = index;
+    AppState.data.teams = index.teams;
+    AppState.data.allSeasons = [];
+    AppState.data.section2 = [];
+    AppState.data.section3 = [];
+    AppState.data.section4 = [];
+    AppState.data.section5 = [];
 
-    AppState.data.section5 = data;
+    await ensureSelectionData();
 }
 
 
@@ -114,8 +224,9 @@ function initializeSelectors() {
         teamSelect.appendChild(option);
     });
 
-    seasonSelect.addEventListener('change', e => {
+    seasonSelect.addEventListener('change', async e => {
         AppState.selectedSeason = e.target.value;
+        await ensureSelectionData();
 
         // Renderitzar la secció activa
         if (AppState.activeSection === 1) {
@@ -130,8 +241,9 @@ function initializeSelectors() {
         renderSection5();
     });
 
-    teamSelect.addEventListener('change', e => {
+    teamSelect.addEventListener('change', async e => {
         AppState.selectedTeam = e.target.value || null;
+        await ensureSelectionData();
         if (AppState.activeSection === 4) {
             renderSection4();
         }
@@ -366,10 +478,11 @@ function handleMouseLeave(d) {
     hideTooltip();
 }
 
-function handleClick(event, d) {
+async function handleClick(event, d) {
     AppState.selectedTeam = (AppState.selectedTeam === d.team) ? null : d.team;
     document.getElementById('team-select').value = AppState.selectedTeam || "";
     updateTeamHighlight();
+    await ensureSelectionData();
     renderSection5();
 }
 
@@ -1486,12 +1599,8 @@ function updateTeamHighlightSection3() {
 // INIT
 // ============================================
 async function init() {
-    // Carrega dades i inicialitza l'estat
-    await loadSection1Data();
-    await loadSection2Data();
-    await loadSection3Data();
-    await loadSection4Data();
-    await loadSection5Data();
+    // Carrega dades (paquets a demanda o CSV sencers) i inicialitza l'estat
+    await loadData();
 
     // Inicialitza els selectors HTML
     initializeSelectors();